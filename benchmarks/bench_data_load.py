@@ -0,0 +1,134 @@
+"""Compare peak memory of loading data.json eagerly, lazily and by streaming its IDs.
+
+Usage: python -m benchmarks.bench_data_load [--videos 30000] [--days 30]
+
+Writes a synthetic data.json with that many videos over that many days, then
+runs each mode in a fresh interpreter and reports wall time and peak RSS
+above the interpreter's baseline:
+
+  eager        load_existing_data + get_existing_video_ids
+  scan         data_stream.scan_video_ids
+  eager merge  eager load, merge 20 new videos into today, write
+  lazy merge   the same with load_existing_data(lazy=True)
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from pipeline import data_manager, data_stream, writer
+from tests.reference_merge import regroup_all
+
+_MODES = ("eager", "scan", "eager merge", "lazy merge")
+_NEW_VIDEOS = 20
+
+
+def _video(video_id, channel, published):
+    return {
+        "id": video_id,
+        "title": f"Video {video_id} about the latest model release",
+        "publishedAt": published.isoformat(),
+        "duration": 754,
+        "thumbnailUrl": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        "videoUrl": f"https://www.youtube.com/watch?v={video_id}",
+        "channelName": channel,
+        "channelUrl": f"https://www.youtube.com/@{channel.replace(' ', '')}",
+        "summary": "The presenter walks through what changed, how it compares and what it costs. " * 5,
+        "transcriptAvailable": True,
+    }
+
+
+def _write_synthetic(path, videos, days):
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    history = [
+        _video(f"old{i:07d}", f"Channel {rng.randrange(200):03d}",
+               now - timedelta(minutes=rng.randrange(1, (days - 1) * 24 * 60)))
+        for i in range(videos)
+    ]
+    writer.write_data(regroup_all({"days": []}, history, days), path)
+
+
+def _new_videos():
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return [_video(f"new{i:04d}", f"Channel {i:03d}", now) for i in range(_NEW_VIDEOS)]
+
+
+def _run_mode(mode, path, days):
+    if mode == "eager":
+        data = data_manager.load_existing_data(path)
+        count = len(data_manager.get_existing_video_ids(data))
+    elif mode == "scan":
+        count = len(data_stream.scan_video_ids(path))
+    else:
+        data = data_manager.load_existing_data(path, lazy=mode == "lazy merge")
+        ids = data_manager.get_existing_video_ids(data)
+        merged = data_manager.merge_and_group(data, _new_videos(), days, existing_ids=ids)
+        writer.write_data(merged, path + f".{mode.replace(' ', '-')}.out")
+        count = len(ids)
+    return count
+
+
+def _rss_kib(field):
+    """Current (VmRSS) or peak (VmHWM) resident set size from /proc, in KiB."""
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ":"))
+
+
+def _measure(mode, path, days):
+    if os.path.exists("/proc/self/clear_refs"):
+        # Reset the high-water mark so only the work below counts
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        baseline = _rss_kib("VmRSS")
+    else:
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    count = _run_mode(mode, path, days)
+    seconds = time.perf_counter() - started
+    if os.path.exists("/proc/self/clear_refs"):
+        peak = _rss_kib("VmHWM")
+    else:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"ids": count, "seconds": seconds, "peakKiB": peak - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=30_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--mode", choices=_MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _measure(args.mode, args.file, args.days)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+        _write_synthetic(path, args.videos, args.days)
+        print(f"data.json: {os.path.getsize(path) / 1024 / 1024:.1f} MiB, {args.videos} videos, {args.days} days")
+        for mode in _MODES:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_data_load", "--mode", mode, "--file", path,
+                 "--days", str(args.days)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"  {mode:<12} {result['seconds'] * 1000:9.1f} ms  {result['peakKiB'] / 1024:8.1f} MiB peak RSS")
+        with open(path + ".eager-merge.out", "rb") as eager, open(path + ".lazy-merge.out", "rb") as lazy:
+            # Skip the first two lines, which hold each run's lastUpdated
+            identical = eager.read().split(b"\n", 2)[2] == lazy.read().split(b"\n", 2)[2]
+            print(f"  lazy merge output identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare the fast YouTube Atom parser with feedparser on recorded feeds.
+
+Usage: python -m benchmarks.bench_feed_parse [--iterations 200] [FEED.xml ...]
+
+Reports mean parse time and peak traced allocations per feed, for a full
+parse and for a parse that stops at a cutoff inside the feed.
+"""
+
+import argparse
+import os
+import timeit
+import tracemalloc
+
+import feedparser
+
+from pipeline.feed_parser import parse_youtube_feed
+
+_DEFAULT_FEED = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "fixtures", "youtube_feed.xml")
+
+
+def _peak_bytes(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _report(label, func, iterations):
+    seconds = timeit.timeit(func, number=iterations) / iterations
+    print(f"  {label:<28} {seconds * 1000:8.3f} ms  {_peak_bytes(func) / 1024:8.1f} KiB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("feeds", nargs="*", default=[_DEFAULT_FEED])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    for path in args.feeds:
+        with open(path, "rb") as f:
+            content = f.read()
+        entries = parse_youtube_feed(content)
+        # Cutoff halfway through the feed, as for a channel that posts often
+        cutoff = entries[len(entries) // 2]["published_dt"] if entries else None
+        print(f"{os.path.basename(path)}: {len(content) / 1024:.1f} KiB, {len(entries)} entries")
+        _report("feedparser", lambda: feedparser.parse(content), args.iterations)
+        _report("fast parser (full)", lambda: parse_youtube_feed(content), args.iterations)
+        _report("fast parser (cutoff)", lambda: parse_youtube_feed(content, cutoff), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
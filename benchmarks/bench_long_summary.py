@@ -0,0 +1,72 @@
+"""Compare single-shot and map-reduce summarization latency for long transcripts.
+
+Usage: python -m benchmarks.bench_long_summary [--hours 3] [--ms-per-1k-tokens 50] [--workers 4]
+
+Uses a local fake model whose latency grows with prompt size (a fixed
+overhead plus a per-token cost) and which times out like a real request
+past --timeout seconds, so the comparison runs offline and is repeatable.
+"""
+
+import argparse
+import time
+from unittest.mock import Mock
+
+from pipeline import summarizer
+from pipeline.gemini_executor import estimate_tokens
+
+_WORDS_PER_MINUTE = 150  # typical speaking rate
+
+
+class _FakeModels:
+    def __init__(self, overhead, seconds_per_token, timeout):
+        self.overhead = overhead
+        self.seconds_per_token = seconds_per_token
+        self.timeout = timeout
+
+    def generate_content(self, model, contents, config=None):
+        latency = self.overhead + estimate_tokens(contents) * self.seconds_per_token
+        if latency > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"request took longer than {self.timeout}s")
+        time.sleep(latency)
+        return Mock(text="• point")
+
+
+def _transcript(hours):
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+    count = int(hours * 60 * _WORDS_PER_MINUTE)
+    return " ".join(words[i % len(words)] for i in range(count))
+
+
+def _timed(label, func):
+    started = time.perf_counter()
+    result = func()
+    ok = "ok" if result != summarizer.FAILURE_MESSAGE else "FAILED"
+    print(f"  {label:<34} {time.perf_counter() - started:7.2f} s  {ok}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=3)
+    parser.add_argument("--overhead-ms", type=float, default=300)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=50)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--chunk-tokens", type=int, default=summarizer.DEFAULT_CHUNK_TOKENS)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    transcript = _transcript(args.hours)
+    chunks = summarizer.split_transcript(transcript, args.chunk_tokens)
+    client = Mock(models=_FakeModels(args.overhead_ms / 1000, args.ms_per_1k_tokens / 1e6, args.timeout))
+    print(f"{args.hours:g}h transcript: ~{estimate_tokens(transcript)} tokens, {len(chunks)} chunks")
+
+    # One attempt each: retries would only repeat the same latency
+    single = summarizer.VIDEO_SUMMARY_PROMPT.format(transcript=transcript)
+    _timed("single-shot", lambda: summarizer._call_with_retry(client, "fake", single, max_retries=1))
+    for workers in args.workers:
+        _timed(f"map-reduce ({workers} workers)", lambda: summarizer.summarize_long_transcript(
+            client, "fake", transcript, chunk_tokens=args.chunk_tokens, workers=workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare the incremental merge with regrouping the whole history each run.
+
+Usage: python -m benchmarks.bench_merge [--sizes 10000 100000] [--new 20] [--iterations 3]
+
+Builds data.json-shaped history of each size within the display window,
+then merges a handful of new videos into it. Reports mean merge time and
+peak traced allocations, and checks both produce identical JSON.
+"""
+
+import argparse
+import json
+import random
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from pipeline.data_manager import get_existing_video_ids, merge_and_group
+from pipeline.video import to_entry_json
+from tests.reference_merge import regroup_all
+
+_DAYS_TO_SHOW = 7
+_VIDEOS_PER_CHANNEL_DAY = 5
+
+
+def _videos(count, prefix, channels, rng):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    videos = []
+    for i in range(count):
+        channel = f"Channel {rng.randrange(channels):05d}"
+        published = now - timedelta(minutes=rng.randrange((_DAYS_TO_SHOW - 1) * 24 * 60))
+        videos.append({
+            "id": f"{prefix}{i:07d}",
+            "title": f"Video {i}",
+            "publishedAt": published.isoformat(),
+            "duration": None,
+            "thumbnailUrl": f"https://i.ytimg.com/vi/{prefix}{i}/hqdefault.jpg",
+            "videoUrl": f"https://www.youtube.com/watch?v={prefix}{i}",
+            "channelName": channel,
+            "channelUrl": f"https://www.youtube.com/@{channel.replace(' ', '')}",
+            "summary": "A short summary of what the video covers. " * 4,
+            "transcriptAvailable": True,
+        })
+    return videos
+
+
+def _peak_bytes(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _report(label, func, iterations):
+    seconds = timeit.timeit(func, number=iterations) / iterations
+    print(f"  {label:<22} {seconds * 1000:10.2f} ms  {_peak_bytes(func) / 1024:10.1f} KiB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--new", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        channels = max(1, size // (_DAYS_TO_SHOW * _VIDEOS_PER_CHANNEL_DAY))
+        existing = regroup_all({"days": []}, _videos(size, "old", channels, rng), _DAYS_TO_SHOW)
+        existing_ids = get_existing_video_ids(existing)
+        new_videos = _videos(args.new, "new", channels, rng)
+
+        full = regroup_all(existing, new_videos, _DAYS_TO_SHOW)
+        incremental = merge_and_group(existing, new_videos, _DAYS_TO_SHOW, existing_ids=existing_ids)
+        identical = json.dumps(full, default=to_entry_json) == json.dumps(incremental, default=to_entry_json)
+
+        print(f"{size} existing videos, {channels} channels, {args.new} new (identical output: {identical})")
+        _report("full regroup", lambda: regroup_all(existing, new_videos, _DAYS_TO_SHOW), args.iterations)
+        _report("incremental merge", lambda: merge_and_group(
+            existing, new_videos, _DAYS_TO_SHOW, existing_ids=existing_ids), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare the sequential and async RSS fetch engines against a local feed server.
+
+Usage: python -m benchmarks.bench_rss_fetch [--channels 50] [--latency 0.2] [--rate 5]
+"""
+
+import argparse
+import logging
+import time
+from unittest.mock import patch
+
+from pipeline import rss_fetcher
+from tests.feed_server import FeedServer
+
+
+def _channels(count):
+    return [
+        {"url": f"https://www.youtube.com/@bench{i}", "channel_id": f"UC{i:022d}", "channel_name": f"bench{i}"}
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated server RTT in seconds")
+    parser.add_argument("--rate", type=float, default=5.0, help="requests per second for both engines")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    channels = _channels(args.channels)
+    with FeedServer(latency=args.latency) as server, \
+            patch.object(rss_fetcher, "RSS_URL_TEMPLATE", server.url_template), \
+            patch.object(rss_fetcher, "_REQUEST_DELAY", 1 / args.rate):
+        results = {}
+        for engine in rss_fetcher.ENGINES:
+            start = time.perf_counter()
+            videos = rss_fetcher.fetch_videos(
+                channels, days_to_show=7, engine=engine,
+                concurrency=args.concurrency, requests_per_second=args.rate,
+            )
+            results[engine] = (time.perf_counter() - start, videos)
+
+    for engine, (elapsed, videos) in results.items():
+        print(f"{engine:>10}: {elapsed:7.2f}s  {len(videos)} videos")
+    same = [v["id"] for v in results["sequential"][1]] == [v["id"] for v in results["async"][1]]
+    print(f"identical output: {same}")
+
+
+if __name__ == "__main__":
+    main()
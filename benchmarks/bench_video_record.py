@@ -0,0 +1,78 @@
+"""Compare Video records with plain dicts for memory per video and merge time.
+
+Usage: python -m benchmarks.bench_video_record [--videos 100000] [--channels 200] [--iterations 3]
+
+Builds feed-shaped videos the way rss_fetcher does, as dicts and as Video
+records, and reports traced bytes per video. Then merges them into an empty
+data.json structure with merge_and_group and with the full regroup.
+merge_and_group converts dict input to Video records, so its dict row
+includes that conversion; the pipeline itself passes Video records.
+"""
+
+import argparse
+import random
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from pipeline import data_manager
+from pipeline.video import Video
+from tests.reference_merge import regroup_all
+
+_DAYS_TO_SHOW = 7
+
+
+def _build(count, channels, make):
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    # Shared per-channel strings, as resolved channels provide them
+    names = [f"Channel {i:03d}" for i in range(channels)]
+    urls = [f"https://www.youtube.com/@Channel{i:03d}" for i in range(channels)]
+    videos = []
+    for i in range(count):
+        c = rng.randrange(channels)
+        video_id = f"vid{i:08d}"
+        videos.append(make({
+            "id": video_id,
+            "title": f"Video {i}",
+            "publishedAt": (now - timedelta(minutes=rng.randrange((_DAYS_TO_SHOW - 1) * 24 * 60))).isoformat(),
+            "duration": None,
+            "thumbnailUrl": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+            "videoUrl": f"https://www.youtube.com/watch?v={video_id}",
+            "channelName": names[c],
+            "channelUrl": urls[c],
+        }))
+    return videos
+
+
+def _traced_bytes(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=100_000)
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.videos} videos, {args.channels} channels")
+    built = {}
+    for label, make in (("dict", dict), ("Video", Video)):
+        size, built[label] = _traced_bytes(lambda: _build(args.videos, args.channels, make))
+        print(f"  {label:<6} {size / args.videos:8.0f} bytes per video (incl. strings)")
+
+    for label, videos in built.items():
+        for merge in (data_manager.merge_and_group, regroup_all):
+            seconds = timeit.timeit(lambda: merge({"days": []}, videos, _DAYS_TO_SHOW),
+                                    number=args.iterations) / args.iterations
+            print(f"  {label:<6} {merge.__name__:<16} {seconds * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
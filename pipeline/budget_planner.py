@@ -0,0 +1,109 @@
+"""Estimate LLM token needs up front and fit summarization work to run and daily budgets."""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from pipeline import summarizer
+from pipeline.gemini_executor import estimate_tokens
+from pipeline.state_file import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKENS_PER_RUN = 500_000
+DEFAULT_TOKENS_PER_DAY = 1_000_000
+DEFERRED_MESSAGE = "Summary deferred — over today's AI budget, will be generated in a later run."
+
+_OUTPUT_TOKENS = 512  # allowance per request for the response
+_SUMMARY_TOKENS = 150  # typical size of one video summary fed into a digest
+_LEDGER_DAYS = 7  # days of usage history kept
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class UsageLedger:
+    """File-backed LLM usage per UTC day: {date: {"tokens", "requests"}}."""
+
+    def __init__(self, path):
+        self.path = path
+        self.days = load_state(path)
+
+    def used_today(self):
+        return self.days.get(_today(), {}).get("tokens", 0)
+
+    def record(self, tokens, requests=0):
+        day = self.days.setdefault(_today(), {"tokens": 0, "requests": 0})
+        day["tokens"] += tokens
+        day["requests"] += requests
+
+    def save(self):
+        oldest = (datetime.now(timezone.utc) - timedelta(days=_LEDGER_DAYS)).strftime("%Y-%m-%d")
+        for date in [d for d in self.days if d < oldest]:
+            del self.days[date]
+        try:
+            save_state(self.days, self.path)
+        except OSError as e:
+            logger.warning("Could not save usage ledger %s: %s", self.path, e)
+
+
+def estimate_summary_tokens(transcript, long_transcript_tokens=summarizer.DEFAULT_LONG_TRANSCRIPT_TOKENS,
+                            chunk_tokens=summarizer.DEFAULT_CHUNK_TOKENS):
+    """Estimate prompt plus response tokens to summarize one transcript."""
+    transcript_tokens = estimate_tokens(transcript)
+    if transcript_tokens <= long_transcript_tokens:
+        return estimate_tokens(summarizer.VIDEO_SUMMARY_PROMPT) + transcript_tokens + _OUTPUT_TOKENS
+    chunks = len(summarizer.split_transcript(transcript, chunk_tokens))
+    map_tokens = chunks * (estimate_tokens(summarizer.CHUNK_SUMMARY_PROMPT) + chunk_tokens + _OUTPUT_TOKENS)
+    reduce_tokens = estimate_tokens(summarizer.REDUCE_SUMMARY_PROMPT) + chunks * _OUTPUT_TOKENS + _OUTPUT_TOKENS
+    return map_tokens + reduce_tokens
+
+
+def _is_important(video, important_channels):
+    return video.get("channelUrl") in important_channels or video.get("channelName") in important_channels
+
+
+def plan_summaries(videos, used_today=0, tokens_per_run=DEFAULT_TOKENS_PER_RUN,
+                   tokens_per_day=DEFAULT_TOKENS_PER_DAY, important_channels=(), **estimate_kwargs):
+    """Choose which videos to summarize this run within the token budgets.
+
+    `videos` need 'transcript'. Videos from important_channels (URLs or
+    names) come first, then newer before older; each is taken if its
+    summary plus its share of digest refreshes still fits the remaining
+    budget, min(tokens_per_run, tokens_per_day - used_today).
+
+    Returns (selected, deferred, plan) where plan is a dict for the status
+    output.
+    """
+    important = set(important_channels)
+    budget = max(0, min(tokens_per_run, tokens_per_day - used_today))
+    ordered = sorted(videos, key=lambda v: v.get("publishedAt", ""), reverse=True)
+    ordered.sort(key=lambda v: not _is_important(v, important))
+
+    digest_overhead = estimate_tokens(summarizer.DAILY_DIGEST_PROMPT) + _OUTPUT_TOKENS
+    selected, deferred = [], []
+    planned = 0
+    days = set()
+    for video in ordered:
+        day = video.get("publishedAt", "")[:10]
+        cost = estimate_summary_tokens(video["transcript"], **estimate_kwargs) + _SUMMARY_TOKENS
+        if day not in days:
+            cost += digest_overhead
+        if planned + cost <= budget:
+            selected.append(video)
+            planned += cost
+            days.add(day)
+        else:
+            deferred.append(video)
+
+    plan = {
+        "budgetTokens": budget,
+        "usedTodayTokens": used_today,
+        "estimatedTokens": planned,
+        "selected": len(selected),
+        "deferred": len(deferred),
+    }
+    if deferred:
+        logger.warning("LLM budget: deferring %d of %d videos (budget %d tokens)",
+                       len(deferred), len(videos), budget)
+    return selected, deferred, plan
@@ -1,36 +1,77 @@
 """Resolve YouTube channel URLs to channel IDs via HTML scraping."""
 
+import codecs
 import logging
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
+from pipeline import http_client
+from pipeline.rate_limiter import HostRateLimiter
+from pipeline.state_file import load_state, save_state
 
 logger = logging.getLogger(__name__)
 
 CHANNEL_ID_PATTERN = re.compile(r"/channel/(UC[\w-]{22})")
-_HEADERS = {
-    "User-Agent": "Mozilla/5.0 (compatible; AI-News-Bot/1.0)",
-    "Accept-Language": "en-US,en;q=0.9",
-}
+_OG_URL_PATTERN = re.compile(r'<meta\s+property="og:url"\s+content="([^"]*)"')
+_CANONICAL_PATTERN = re.compile(r'<link\s+rel="canonical"\s+href="([^"]*)"')
+_HEAD_END_PATTERN = re.compile(r"</head\s*>", re.IGNORECASE)
 _REQUEST_DELAY = 1  # seconds between HTTP requests
+_CHUNK_SIZE = 16 * 1024  # bytes per streamed read of a channel page
+_SCAN_OVERLAP = 1024  # chars carried between chunks so matches can straddle them
+CACHE_TTL_DAYS = 30
+
+
+class ResolutionCache:
+    """File-backed cache of channel URL -> channel ID with a TTL.
+
+    Entries are stored as {url: {"channel_id": ..., "resolvedAt": epoch_seconds}}.
+    """
+
+    def __init__(self, path, ttl_days=CACHE_TTL_DAYS):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.entries = load_state(path)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url):
+        """Return the cached channel ID for url, or None if missing or expired."""
+        entry = self.entries.get(url)
+        if entry and time.time() - entry.get("resolvedAt", 0) < self.ttl_seconds:
+            self.hits += 1
+            return entry["channel_id"]
+        self.misses += 1
+        return None
+
+    def put(self, url, channel_id):
+        self.entries[url] = {"channel_id": channel_id, "resolvedAt": int(time.time())}
+
+    def prune(self, keep_urls):
+        """Drop entries for URLs that are no longer in the config."""
+        keep = set(keep_urls)
+        removed = [url for url in self.entries if url not in keep]
+        for url in removed:
+            del self.entries[url]
+        if removed:
+            logger.info("Removed %d stale channel ID cache entries", len(removed))
+
+    def save(self):
+        try:
+            save_state(self.entries, self.path)
+        except OSError as e:
+            logger.warning("Could not save channel ID cache %s: %s", self.path, e)
 
 
 def _extract_channel_id_from_html(html):
     """Extract channel ID from YouTube page HTML meta tags or canonical URL."""
-    # Try meta og:url
-    match = re.search(r'<meta\s+property="og:url"\s+content="([^"]*)"', html)
-    if match:
-        id_match = CHANNEL_ID_PATTERN.search(match.group(1))
-        if id_match:
-            return id_match.group(1)
-
-    # Try link canonical
-    match = re.search(r'<link\s+rel="canonical"\s+href="([^"]*)"', html)
-    if match:
-        id_match = CHANNEL_ID_PATTERN.search(match.group(1))
-        if id_match:
-            return id_match.group(1)
+    # Try meta og:url, then link canonical
+    for pattern in (_OG_URL_PATTERN, _CANONICAL_PATTERN):
+        match = pattern.search(html)
+        if match:
+            id_match = CHANNEL_ID_PATTERN.search(match.group(1))
+            if id_match:
+                return id_match.group(1)
 
     # Try any /channel/ reference in page
     id_match = CHANNEL_ID_PATTERN.search(html)
@@ -40,6 +81,48 @@ def _extract_channel_id_from_html(html):
     return None
 
 
+def _scan_channel_id(chunks, encoding="utf-8"):
+    """Incrementally scan streamed page bytes for a channel ID.
+
+    Applies the same preference order as _extract_channel_id_from_html, but
+    stops reading as soon as an og:url/canonical ID is found, or once </head>
+    has been seen and any /channel/ reference is known. The last
+    _SCAN_OVERLAP characters of each window are carried over so matches that
+    straddle chunk boundaries are still found.
+
+    Returns (channel_id or None, bytes_read).
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    bytes_read = 0
+    tail = ""
+    fallback_id = None
+    head_closed = False
+
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        window = tail + decoder.decode(chunk)
+
+        if not head_closed:
+            for pattern in (_OG_URL_PATTERN, _CANONICAL_PATTERN):
+                match = pattern.search(window)
+                if match:
+                    id_match = CHANNEL_ID_PATTERN.search(match.group(1))
+                    if id_match:
+                        return id_match.group(1), bytes_read
+            head_closed = _HEAD_END_PATTERN.search(window) is not None
+
+        if fallback_id is None:
+            id_match = CHANNEL_ID_PATTERN.search(window)
+            if id_match:
+                fallback_id = id_match.group(1)
+        if head_closed and fallback_id:
+            return fallback_id, bytes_read
+
+        tail = window[-_SCAN_OVERLAP:]
+
+    return fallback_id, bytes_read
+
+
 def _extract_channel_name(url):
     """Extract a readable channel name from the URL."""
     # @handle format
@@ -57,37 +140,96 @@ def _extract_channel_name(url):
     return url
 
 
-def resolve_channels(channel_urls):
-    """Resolve channel URLs to channel IDs. Returns list of dicts with url, channel_id, channel_name."""
-    resolved = []
-    for url in channel_urls:
+def _fetch_channel_id(url, limiter):
+    """Stream a channel page and extract its ID.
+
+    Returns (channel_id or None, bytes_downloaded); failures yield a None ID.
+    """
+    try:
+        limiter.acquire(url)
+        response = http_client.get(url, stream=True)
+        bytes_read = 0
         try:
-            # Direct /channel/ URL — extract ID without HTTP request
-            direct_match = CHANNEL_ID_PATTERN.search(url)
-            if direct_match:
-                resolved.append({
-                    "url": url,
-                    "channel_id": direct_match.group(1),
-                    "channel_name": _extract_channel_name(url),
-                })
-                logger.info("Resolved %s (direct) -> %s", url, direct_match.group(1))
-                continue
-
-            # Fetch page HTML and extract channel ID
-            time.sleep(_REQUEST_DELAY)
-            response = requests.get(url, headers=_HEADERS, timeout=15)
             response.raise_for_status()
-            channel_id = _extract_channel_id_from_html(response.text)
-            if channel_id:
-                resolved.append({
-                    "url": url,
-                    "channel_id": channel_id,
-                    "channel_name": _extract_channel_name(url),
-                })
-                logger.info("Resolved %s -> %s", url, channel_id)
-            else:
-                logger.warning("Could not extract channel ID from %s", url)
-        except Exception as e:
-            logger.warning("Failed to resolve channel %s: %s", url, e)
+            channel_id, bytes_read = _scan_channel_id(
+                response.iter_content(chunk_size=_CHUNK_SIZE),
+                encoding=response.encoding or "utf-8",
+            )
+        finally:
+            # Closing early drops the unread remainder of the page
+            response.close()
+            http_client.record(url, bytes_read, count=0)
+        if channel_id:
+            logger.info("Resolved %s -> %s (%.1f KB downloaded)", url, channel_id, bytes_read / 1024)
+        else:
+            logger.warning("Could not extract channel ID from %s", url)
+        return channel_id, bytes_read
+    except Exception as e:
+        logger.warning("Failed to resolve channel %s: %s", url, e)
+        return None, 0
+
+
+def resolve_channels(channel_urls, cache=None, stats=None, workers=1, limiter=None):
+    """Resolve channel URLs to channel IDs. Returns list of dicts with url, channel_id, channel_name.
+
+    Channel pages are fetched by a pool of `workers` threads sharing a per-host
+    rate limiter (default: one request per _REQUEST_DELAY seconds). Output keeps
+    the order of `channel_urls`; URLs that fail to resolve are skipped.
+
+    If a ResolutionCache is given it is consulted before any HTTP request, pruned
+    to the given URLs and saved. Cache hit/miss counts and page bytes downloaded
+    are written to `stats`.
+    """
+    if limiter is None:
+        limiter = HostRateLimiter(1 / _REQUEST_DELAY)
+
+    channel_ids = {}
+    to_fetch = []
+    for url in channel_urls:
+        # Direct /channel/ URL — extract ID without HTTP request
+        direct_match = CHANNEL_ID_PATTERN.search(url)
+        if direct_match:
+            channel_ids[url] = direct_match.group(1)
+            logger.info("Resolved %s (direct) -> %s", url, direct_match.group(1))
+            continue
+
+        cached_id = cache.get(url) if cache else None
+        if cached_id:
+            channel_ids[url] = cached_id
+            logger.info("Resolved %s (cached) -> %s", url, cached_id)
+            continue
+
+        to_fetch.append(url)
+
+    bytes_downloaded = 0
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(to_fetch)))) as pool:
+            fetched = pool.map(lambda u: _fetch_channel_id(u, limiter), to_fetch)
+            for url, (channel_id, bytes_read) in zip(to_fetch, fetched):
+                bytes_downloaded += bytes_read
+                if channel_id:
+                    channel_ids[url] = channel_id
+                    if cache:
+                        cache.put(url, channel_id)
+
+    resolved = [
+        {"url": url, "channel_id": channel_ids[url], "channel_name": _extract_channel_name(url)}
+        for url in channel_urls
+        if url in channel_ids
+    ]
+
+    if to_fetch:
+        logger.info("Downloaded %.1f KB for %d channel page(s)", bytes_downloaded / 1024, len(to_fetch))
+    if stats is not None:
+        stats["pagesFetched"] = len(to_fetch)
+        stats["bytesDownloaded"] = bytes_downloaded
+
+    if cache:
+        cache.prune(channel_urls)
+        cache.save()
+        logger.info("Channel ID cache: %d hits, %d misses", cache.hits, cache.misses)
+        if stats is not None:
+            stats["cacheHits"] = cache.hits
+            stats["cacheMisses"] = cache.misses
 
     return resolved
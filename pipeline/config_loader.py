@@ -2,6 +2,7 @@
 
 import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,8 @@ REQUIRED_KEYS = {
     "channels": ("channels",),
 }
 
+DEFAULT_CACHE_DIR = ".cache"
+
 
 def load_config(config_path="config.json"):
     """Load and validate config.json. Returns parsed config dict."""
@@ -45,3 +48,9 @@ def load_config(config_path="config.json"):
 
     logger.info("Config loaded: %d channels, %d days window", len(config["channels"]), config["display"]["daysToShow"])
     return config
+
+
+def cache_path(config, filename):
+    """Return the path of a persistent cache file under the configured cache dir."""
+    cache_dir = config.get("cache", {}).get("dir", DEFAULT_CACHE_DIR)
+    return os.path.join(cache_dir, filename)
@@ -0,0 +1,150 @@
+"""Incremental daily digest generation from per-day digest inputs."""
+
+import logging
+
+from pipeline import summarizer
+from pipeline.data_manager import day_content_hash
+from pipeline.gemini_executor import estimate_tokens
+from pipeline.state_file import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REBUILD_EVERY = 5  # incremental updates before a day is rebuilt in full
+DEFAULT_MAX_DELTA_RATIO = 0.5  # rebuild in full if more of the day than this is new
+
+_NO_SUMMARY_PREFIXES = ("Transcript not available", "Summary generation failed", "Summary deferred")
+
+
+def day_summaries(day):
+    """Return {video_id: summary} for the videos of a day that have a real summary."""
+    return {
+        v["id"]: v["summary"]
+        for channel in day.get("channels", [])
+        for v in channel.get("videos", [])
+        if v.get("summary") and not v["summary"].startswith(_NO_SUMMARY_PREFIXES)
+    }
+
+
+class DigestState:
+    """File-backed record of what each day's digest was built from.
+
+    Entries are stored as {date: {"contentHash": the day's contentHash,
+    "inputs": [video IDs whose summaries went into the digest], "inputsHash":
+    day_content_hash of the day restricted to those videos, "updates":
+    incremental updates since the last full rebuild}}.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.days = load_state(path)
+
+    def prune(self, keep_dates):
+        keep = set(keep_dates)
+        for date in [d for d in self.days if d not in keep]:
+            del self.days[date]
+
+    def save(self):
+        try:
+            save_state(self.days, self.path)
+        except OSError as e:
+            logger.warning("Could not save digest state %s: %s", self.path, e)
+
+
+def refresh_digests(client, model, days, state, cache=None, rebuild_every=DEFAULT_REBUILD_EVERY,
+                    max_delta_ratio=DEFAULT_MAX_DELTA_RATIO, stats=None, executor=None):
+    """Bring each day's "dailyDigest" up to date with its video summaries.
+
+    A day whose "contentHash" matches the one recorded with its digest is
+    left alone without reading its videos (a LazyDay stays undecoded). If
+    videos were only added, the previous digest is updated with just the new
+    summaries. A full rebuild over every summary happens when there is no
+    previous digest, a summary changed or disappeared, the new videos exceed
+    max_delta_ratio of the day, or after rebuild_every incremental updates.
+    A failed call keeps the previous digest and leaves the state unchanged,
+    so the day is retried next run.
+
+    With a GeminiExecutor, digest calls share its RPM/TPM quotas and 429
+    handling with the summaries.
+
+    stats receives call counts, estimated prompt tokens sent, the tokens
+    full rebuilds would have needed instead, and actualTokens: the usage the
+    executor reported for these calls (the estimate without an executor).
+    """
+    counts = {"fullRebuilds": 0, "incrementalUpdates": 0, "failed": 0,
+              "promptTokens": 0, "fullRebuildTokens": 0}
+    tokens_before = executor.stats()["actualTokens"] if executor else 0
+
+    for day in days:
+        content_hash = day.get("contentHash") or day_content_hash(day)
+        recorded = state.days.get(day["date"], {})
+        if content_hash == recorded.get("contentHash") and day.get("dailyDigest"):
+            continue
+        summaries = day_summaries(day)
+        if not summaries:
+            continue
+
+        previous = set(recorded.get("inputs", []))
+        # The videos behind the previous digest are still there with the same summaries and channels
+        inputs_kept = (
+            bool(previous)
+            and previous <= summaries.keys()
+            and _inputs_hash(day, previous) == recorded.get("inputsHash")
+        )
+        added = [video_id for video_id in summaries if video_id not in previous]
+        if inputs_kept and not added and day.get("dailyDigest"):
+            recorded["contentHash"] = content_hash  # only videos without a summary changed
+            continue
+
+        full_tokens = estimate_tokens(summarizer.DAILY_DIGEST_PROMPT + "\n\n".join(summaries.values()))
+        incremental = (
+            day.get("dailyDigest")
+            and inputs_kept
+            and len(added) <= max_delta_ratio * len(summaries)
+            and recorded.get("updates", 0) < rebuild_every
+        )
+
+        if incremental:
+            new_summaries = [summaries[video_id] for video_id in added]
+            digest = summarizer.update_daily_digest(
+                client, model, day["date"], day["dailyDigest"], new_summaries, cache=cache, executor=executor
+            )
+            tokens = estimate_tokens(summarizer.DIGEST_UPDATE_PROMPT + day["dailyDigest"] + "\n\n".join(new_summaries))
+            updates = recorded.get("updates", 0) + 1
+        else:
+            digest = summarizer.generate_daily_digest(
+                client, model, day["date"], list(summaries.values()), cache=cache, executor=executor
+            )
+            tokens = full_tokens
+            updates = 0
+
+        counts["promptTokens"] += tokens
+        counts["fullRebuildTokens"] += full_tokens
+        if digest == summarizer.FAILURE_MESSAGE:
+            counts["failed"] += 1
+            continue
+        counts["incrementalUpdates" if incremental else "fullRebuilds"] += 1
+        day["dailyDigest"] = digest
+        state.days[day["date"]] = {
+            "contentHash": content_hash,
+            "inputs": list(summaries),
+            "inputsHash": _inputs_hash(day, summaries.keys()),
+            "updates": updates,
+        }
+
+    state.prune(day["date"] for day in days)
+    counts["actualTokens"] = executor.stats()["actualTokens"] - tokens_before if executor else counts["promptTokens"]
+    logger.info("Daily digests: %d rebuilt, %d updated incrementally, ~%d prompt tokens (full rebuilds: ~%d)",
+                counts["fullRebuilds"], counts["incrementalUpdates"],
+                counts["promptTokens"], counts["fullRebuildTokens"])
+    if stats is not None:
+        stats.update(counts)
+
+
+def _inputs_hash(day, video_ids):
+    """day_content_hash of the day restricted to the videos in video_ids."""
+    channels = []
+    for channel in day.get("channels", []):
+        videos = [v for v in channel.get("videos", []) if v["id"] in video_ids]
+        if videos:
+            channels.append({"channelName": channel.get("channelName", ""), "videos": videos})
+    return day_content_hash({"channels": channels})
@@ -1,9 +1,14 @@
 """Manage pipeline data: load, merge, group, and window video data."""
 
+import bisect
+import hashlib
 import json
 import logging
-from collections import defaultdict
 from datetime import datetime, timedelta, timezone
+from itertools import groupby
+
+from pipeline.data_stream import LazyDay, load_lazy, read_last_updated
+from pipeline.video import as_video
 
 logger = logging.getLogger(__name__)
 
@@ -13,26 +18,55 @@ def _empty_data():
     return {"lastUpdated": None, "config": {}, "days": []}
 
 
-def load_existing_data(data_path="data.json"):
-    """Load existing data.json. Returns empty structure if missing or invalid."""
+def load_existing_data(data_path="data.json", lazy=False):
+    """Load existing data.json. Returns empty structure if missing or invalid.
+
+    With lazy=True the file is read one day at a time and each day is kept
+    as a LazyDay, decoded only if something reads more than its date, video
+    IDs or channel names; merge_and_group only decodes the days it changes.
+    """
     try:
+        if lazy:
+            return load_lazy(data_path)
         with open(data_path, "r", encoding="utf-8") as f:
             data = json.load(f)
         if "days" not in data:
             return _empty_data()
         return data
-    except (FileNotFoundError, json.JSONDecodeError):
+    except (FileNotFoundError, ValueError):
         return _empty_data()
 
 
+def _channel_groups(day):
+    """Yield (channelName, channelUrl, video IDs) per channel, without decoding a LazyDay."""
+    if isinstance(day, LazyDay):
+        yield from day.channel_index
+        return
+    for ch in day.get("channels", []):
+        yield ch.get("channelName", ""), ch.get("channelUrl", ""), (v["id"] for v in ch.get("videos", []))
+
+
 def get_existing_video_ids(existing_data):
     """Extract all video IDs from existing data for incremental diffing."""
     ids = set()
+    for day in existing_data.get("days", []):
+        for _, _, video_ids in _channel_groups(day):
+            ids.update(video_ids)
+    return ids
+
+
+def index_videos(existing_data):
+    """Return {video_id: video} for existing data, with channel fields restored on each video."""
+    videos = {}
     for day in existing_data.get("days", []):
         for channel in day.get("channels", []):
             for video in channel.get("videos", []):
-                ids.add(video["id"])
-    return ids
+                videos[video["id"]] = {
+                    **video,
+                    "channelName": channel.get("channelName", ""),
+                    "channelUrl": channel.get("channelUrl", ""),
+                }
+    return videos
 
 
 def filter_new_videos(all_videos, existing_ids):
@@ -40,107 +74,212 @@ def filter_new_videos(all_videos, existing_ids):
     return [v for v in all_videos if v["id"] not in existing_ids]
 
 
-def merge_and_group(existing_data, new_videos, days_to_show):
+def merge_and_group(existing_data, new_videos, days_to_show, existing_ids=None):
     """Merge existing + new videos, group by date/channel, window to days_to_show.
 
-    Returns the full data structure matching the Data Model spec.
+    A new video with the same ID as an existing one (e.g. a retried
+    summary) replaces it. Returns the full data structure matching the
+    Data Model spec.
+
+    Works incrementally on data written by this function: new videos are
+    inserted into copies of only the days they touch, days before the
+    window are dropped, and every other day is reused as-is (shared with
+    existing_data, not copied). existing_ids, if already computed, saves a
+    pass over the history. Output is identical to regrouping everything.
+
+    New videos are placed in their day as Video records (plain dicts are
+    converted); the writer encodes them as data.json entries.
+
+    Each rebuilt day gets a fresh "contentHash" (see day_content_hash).
     """
     cutoff_date = (datetime.now(timezone.utc) - timedelta(days=days_to_show)).strftime("%Y-%m-%d")
+    existing_days = existing_data.get("days", [])
+    if existing_ids is None:
+        existing_ids = get_existing_video_ids(existing_data)
+    new_videos = [as_video(v) for v in new_videos]
+    replaced = {v.id for v in new_videos} & existing_ids
 
-    # Collect all existing videos into a flat list
-    all_videos = []
-    for day in existing_data.get("days", []):
-        for channel in day.get("channels", []):
-            for video in channel.get("videos", []):
-                all_videos.append({
-                    **video,
-                    "channelName": channel.get("channelName", ""),
-                    "channelUrl": channel.get("channelUrl", ""),
-                })
+    in_window = {day["date"]: day for day in existing_days if day["date"] >= cutoff_date}
+    touched = {}
+    channels_by_name = {}  # per touched day
+
+    def touch(date_str):
+        if date_str not in touched:
+            day = in_window.get(date_str)
+            if day is None:
+                touched[date_str] = {"date": date_str, "dailyDigest": "", "channels": []}
+            else:
+                channels = [{**ch, "videos": list(ch["videos"])} for ch in day["channels"]]
+                touched[date_str] = {**day, "channels": channels}
+            channels_by_name[date_str] = {ch["channelName"]: ch for ch in touched[date_str]["channels"]}
+        return touched[date_str]
 
-    # Add new videos
-    all_videos.extend(new_videos)
+    # Remove replaced videos, looking first in the day they are published on
+    for video in new_videos:
+        if video.id in replaced:
+            _remove_video(video.id, getattr(video, "publishedAt", "")[:10], in_window, touch)
 
-    # Group by date -> channel
-    days_dict = defaultdict(lambda: defaultdict(list))
-    for video in all_videos:
-        date_str = video.get("publishedAt", "")[:10]  # YYYY-MM-DD
+    for video in new_videos:
+        date_str = getattr(video, "publishedAt", "")[:10]
         if date_str < cutoff_date:
             continue
+        channel_name = video.get("channelName", "Unknown")
+        channels = touch(date_str)["channels"]
+        channel = channels_by_name[date_str].get(channel_name)
+        if channel is None:
+            channel = {
+                "channelName": channel_name,
+                "channelUrl": _first_channel_url(channel_name, existing_days, replaced, new_videos),
+                "videos": [],
+            }
+            bisect.insort(channels, channel, key=lambda ch: ch["channelName"])
+            channels_by_name[date_str][channel_name] = channel
+        _insert_newest_first(channel["videos"], video)
 
-        channel_key = video.get("channelName", "Unknown")
-        # Store video without redundant channel fields at video level
-        video_entry = {
-            "id": video["id"],
-            "title": video.get("title", "Untitled"),
-            "publishedAt": video.get("publishedAt", ""),
-            "duration": video.get("duration"),
-            "thumbnailUrl": video.get("thumbnailUrl", ""),
-            "videoUrl": video.get("videoUrl", ""),
-            "summary": video.get("summary", ""),
-            "transcriptAvailable": video.get("transcriptAvailable", False),
-        }
-        days_dict[date_str][channel_key].append(video_entry)
-
-    # Build channel name -> URL lookup (O(1) per channel)
-    channel_url_map = {}
-    for v in all_videos:
-        name = v.get("channelName", "")
-        if name and name not in channel_url_map:
-            channel_url_map[name] = v.get("channelUrl", "")
-
-    # Build structured days array
     days = []
-    existing_digests = {}
-    for day in existing_data.get("days", []):
-        existing_digests[day["date"]] = day.get("dailyDigest", "")
+    for date_str in sorted(in_window.keys() | touched.keys(), reverse=True):
+        day = touched[date_str] if date_str in touched else in_window[date_str]
+        if date_str in touched:
+            channels = [ch for ch in day["channels"] if ch["videos"]]
+        elif next(_channel_groups(day), None) is None:
+            continue
+        elif "contentHash" in day:
+            days.append(day)
+            continue
+        else:
+            channels = day["channels"]  # written before days had a contentHash
+        if channels:
+            days.append(_build_day(date_str, day.get("dailyDigest", ""), channels))
 
-    for date_str in sorted(days_dict.keys(), reverse=True):
-        channels = []
-        channel_groups = days_dict[date_str]
-        for channel_name in sorted(channel_groups.keys()):
-            videos = channel_groups[channel_name]
+    return {
+        "lastUpdated": existing_data.get("lastUpdated"),
+        "config": {"daysToShow": days_to_show},
+        "days": days,
+    }
+
+
+def sync_history(history, data_path="data.json"):
+    """Import data.json into a HistoryStore that is empty or older than the file.
+
+    The store is kept in a cache that can be restored from an earlier run,
+    while data.json is committed; when data.json's lastUpdated is newer than
+    the store's last export, the file's videos and digests replace the
+    stored ones. Returns True if data.json was imported.
+    """
+    last_updated = read_last_updated(data_path)
+    exported = history.last_export()
+    if len(history) and (last_updated is None or (exported is not None and last_updated <= exported)):
+        return False
+    if len(history):
+        logger.warning("History store last exported %s, older than %s (%s) — importing it",
+                       exported, data_path, last_updated)
+    history.import_data(load_existing_data(data_path))
+    return True
+
+
+def merge_into_history(history, new_videos, days_to_show):
+    """Store new videos in a HistoryStore and return its days_to_show window.
 
+    Same structure and ordering as merge_and_group, but the work depends on
+    the size of the window rather than of the whole history.
+    """
+    history.upsert_videos(new_videos)
+    return window_from_history(history, days_to_show)
+
+
+def window_from_history(history, days_to_show):
+    """Build the data.json structure from the last days_to_show days of a HistoryStore."""
+    cutoff_date = (datetime.now(timezone.utc) - timedelta(days=days_to_show)).strftime("%Y-%m-%d")
+    digests = history.digests_since(cutoff_date)
+    days = []
+    for date_str, day_videos in groupby(history.videos_since(cutoff_date), key=lambda v: v.publishedAt[:10]):
+        channels = []
+        for channel_name, videos in groupby(day_videos, key=lambda v: v.channel.name):
+            videos = list(videos)
             channels.append({
                 "channelName": channel_name,
-                "channelUrl": channel_url_map.get(channel_name, ""),
-                "videos": sorted(videos, key=lambda v: v.get("publishedAt", ""), reverse=True),
+                "channelUrl": videos[0].channel.url,
+                "videos": videos,
             })
-
-        days.append({
-            "date": date_str,
-            "dailyDigest": existing_digests.get(date_str, ""),
-            "channels": channels,
-        })
+        days.append(_build_day(date_str, digests.get(date_str, ""), channels))
 
     return {
-        "lastUpdated": existing_data.get("lastUpdated"),
+        "lastUpdated": None,
         "config": {"daysToShow": days_to_show},
         "days": days,
     }
 
 
-def _day_fingerprint(day):
-    """Build a fingerprint for a day based on video IDs and summary presence."""
-    parts = []
+def day_content_hash(day):
+    """Return a stable hash of a day's channel grouping, video IDs and summaries.
+
+    Stored on each output day as "contentHash"; refresh_digests skips days
+    whose hash matches the one recorded with their digest.
+    It does not cover the digest, titles, thumbnails or transcriptAvailable,
+    so it is not a hash of the day's full JSON and must not be used as one.
+    """
+    digest = hashlib.sha256()
+    # ASCII group/record/unit separators keep the fields unambiguous
     for ch in day.get("channels", []):
-        for v in ch.get("videos", []):
-            summary = v.get("summary", "")
-            has_real_summary = bool(summary) and not summary.startswith("Summary generation failed")
-            parts.append(f"{v['id']}:{has_real_summary}")
-    return frozenset(parts)
+        digest.update(f"\x1d{ch.get('channelName', '')}\x1c".encode("utf-8"))
+        videos = "\x1e".join(f"{v['id']}\x1f{v.get('summary', '')}" for v in ch.get("videos", []))
+        digest.update(videos.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _build_day(date_str, daily_digest, channels):
+    return {
+        "date": date_str,
+        "dailyDigest": daily_digest,
+        "contentHash": day_content_hash({"channels": channels}),
+        "channels": channels,
+    }
+
+
+def _insert_newest_first(videos, video):
+    """Insert after every video published at the same time or later, like a stable sort."""
+    published = getattr(video, "publishedAt", "")
+    # Newest first, so "older than the entry" is False for a prefix and True after it
+    index = bisect.bisect_left(videos, True, key=lambda v: v.get("publishedAt", "") < published)
+    videos.insert(index, video)
+
+
+def _remove_video(video_id, date_hint, in_window, touch):
+    dates = [date_hint] + [d for d in in_window if d != date_hint]
+    for date_str in dates:
+        day = in_window.get(date_str)
+        if day is None or not any(video_id in ids for _, _, ids in _channel_groups(day)):
+            continue
+        for channel in touch(date_str)["channels"]:
+            channel["videos"] = [v for v in channel["videos"] if v["id"] != video_id]
+        return
+
+
+def _first_channel_url(channel_name, existing_days, replaced, new_videos):
+    """URL of the first video with this channel name, existing videos first."""
+    if not channel_name:
+        return ""
+    for day in existing_days:
+        for name, url, video_ids in _channel_groups(day):
+            if name == channel_name and any(video_id not in replaced for video_id in video_ids):
+                return url
+    for video in new_videos:
+        if video.get("channelName", "") == channel_name:
+            return video.get("channelUrl", "")
+    return ""
 
 
 def get_changed_days(existing_data, merged_data):
-    """Return list of date strings for days that have new or updated content."""
-    existing_fingerprints = {}
-    for day in existing_data.get("days", []):
-        existing_fingerprints[day["date"]] = _day_fingerprint(day)
+    """Return list of date strings for days that have new or updated content.
+
+    Compares each day's "contentHash", computing it only for days that lack one.
+    """
+    existing_hashes = {day["date"]: _content_hash(day) for day in existing_data.get("days", [])}
+    return [
+        day["date"] for day in merged_data.get("days", [])
+        if existing_hashes.get(day["date"]) != _content_hash(day)
+    ]
 
-    changed = []
-    for day in merged_data.get("days", []):
-        fp = _day_fingerprint(day)
-        if day["date"] not in existing_fingerprints or existing_fingerprints[day["date"]] != fp:
-            changed.append(day["date"])
 
-    return changed
+def _content_hash(day):
+    return day.get("contentHash") or day_content_hash(day)
@@ -0,0 +1,186 @@
+"""Read data.json one day at a time instead of loading the whole document."""
+
+import json
+import re
+from collections.abc import MutableMapping
+
+_READ_CHARS = 1 << 20
+_WHITESPACE = re.compile(r"\s*")
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffered reader that decodes consecutive JSON values from a text file."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self):
+        """Append more of the file to the buffer, dropping consumed text. False at EOF."""
+        data = self.f.read(max(_READ_CHARS, len(self.buf) - self.pos))
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character ("" at EOF) without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in data.json at {self.buf[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value. Returns (value, its JSON text)."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A number ending at the buffer end may continue in the file
+                if end < len(self.buf) or not self._fill():
+                    break
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+        raw = self.buf[self.pos:end]
+        self.pos = end
+        return value, raw
+
+
+def iter_document(f):
+    """Yield (key, value, raw_json) for each top-level field of a data.json file object.
+
+    The "days" array is not decoded as a whole: it yields ("days", day,
+    raw_json) once per day instead, so only one day is in memory at a time.
+    """
+    reader = _Reader(f)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key, _ = reader.value()
+        reader.expect(":")
+        if key == "days" and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() != "]":
+                while True:
+                    day, raw = reader.value()
+                    yield key, day, raw
+                    if reader.peek() != ",":
+                        break
+                    reader.expect(",")
+            reader.expect("]")
+        else:
+            value, raw = reader.value()
+            yield key, value, raw
+        if reader.peek() != ",":
+            break
+        reader.expect(",")
+    reader.expect("}")
+
+
+def iter_videos(data_path):
+    """Yield (date, channel, video) for every video in data.json, one day in memory at a time."""
+    with open(data_path, "r", encoding="utf-8") as f:
+        for key, day, _ in iter_document(f):
+            if key != "days":
+                continue
+            for channel in day.get("channels", []):
+                for video in channel.get("videos", []):
+                    yield day["date"], channel, video
+
+
+def scan_video_ids(data_path):
+    """Return the set of video IDs in data.json without loading the whole document."""
+    return {video["id"] for _, _, video in iter_videos(data_path)}
+
+
+def read_last_updated(data_path):
+    """Return data.json's "lastUpdated" (None if absent or unreadable), reading no further than it."""
+    try:
+        with open(data_path, "r", encoding="utf-8") as f:
+            for key, value, _ in iter_document(f):
+                if key == "lastUpdated":
+                    return value
+    except (FileNotFoundError, ValueError):
+        pass
+    return None
+
+
+class LazyDay(MutableMapping):
+    """A day of data.json kept as its JSON text until more than its date is needed.
+
+    Reading "date", "contentHash", "dailyDigest", video_ids or channel_index
+    leaves it undecoded; any other access decodes it once. While undecoded, the writer copies `raw`
+    to the output as-is.
+    """
+
+    def __init__(self, day, raw):
+        self.raw = raw
+        self.date = day["date"]
+        self.content_hash = day.get("contentHash")
+        self.daily_digest = day.get("dailyDigest")
+        # (channelName, channelUrl, video IDs) per channel group
+        self.channel_index = [
+            (ch.get("channelName", ""), ch.get("channelUrl", ""), frozenset(v["id"] for v in ch.get("videos", [])))
+            for ch in day.get("channels", [])
+        ]
+        self._day = None
+
+    @property
+    def materialized(self):
+        return self._day is not None
+
+    @property
+    def video_ids(self):
+        return frozenset().union(*(ids for _, _, ids in self.channel_index))
+
+    def _materialize(self):
+        if self._day is None:
+            self._day = json.loads(self.raw)
+            self.raw = None
+        return self._day
+
+    def __getitem__(self, key):
+        if self._day is None:
+            if key == "date":
+                return self.date
+            if key == "contentHash" and self.content_hash is not None:
+                return self.content_hash
+            if key == "dailyDigest" and self.daily_digest is not None:
+                return self.daily_digest
+        return self._materialize()[key]
+
+    def __setitem__(self, key, value):
+        self._materialize()[key] = value
+
+    def __delitem__(self, key):
+        del self._materialize()[key]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __len__(self):
+        return len(self._materialize())
+
+
+def load_lazy(data_path):
+    """Load data.json with every day as an undecoded LazyDay."""
+    data = {}
+    days = []
+    with open(data_path, "r", encoding="utf-8") as f:
+        for key, value, raw in iter_document(f):
+            if key == "days":
+                data.setdefault("days", days).append(LazyDay(value, raw))
+            else:
+                data[key] = value
+    data.setdefault("days", days)
+    return data
@@ -0,0 +1,82 @@
+"""Fast-path incremental parser for YouTube's Atom video feeds."""
+
+from datetime import datetime
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_YT = "{http://www.youtube.com/xml/schemas/2015}"
+_FEED_TAG = _ATOM + "feed"
+_ENTRY_TAG = _ATOM + "entry"
+_CHUNK_SIZE = 8 * 1024  # bytes fed to the pull parser at a time
+
+
+class UnexpectedFeedError(ValueError):
+    """Raised when a feed doesn't match the YouTube Atom schema this parser expects."""
+
+
+def parse_youtube_feed(content, cutoff=None):
+    """Parse a YouTube Atom feed into entry dicts with videoId, title, published, link.
+
+    Only the fields the pipeline uses are extracted, and each <entry> element is
+    discarded once read. YouTube lists entries newest first, so parsing stops
+    at the first entry published before `cutoff` (an aware datetime).
+
+    Raises UnexpectedFeedError on malformed XML, a non-Atom root, or an entry
+    missing a video ID or valid published date; callers should then fall back
+    to a general-purpose parser.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    entries = []
+    root_checked = False
+
+    try:
+        for offset in range(0, len(content), _CHUNK_SIZE):
+            parser.feed(content[offset:offset + _CHUNK_SIZE])
+            for event, elem in parser.read_events():
+                if not root_checked:
+                    if elem.tag != _FEED_TAG:
+                        raise UnexpectedFeedError(f"Unexpected root element: {elem.tag}")
+                    root_checked = True
+                if event != "end" or elem.tag != _ENTRY_TAG:
+                    continue
+
+                entry = _read_entry(elem)
+                elem.clear()
+                if cutoff is not None and entry["published_dt"] < cutoff:
+                    return entries
+                entries.append(entry)
+        parser.close()
+    except ParseError as e:
+        raise UnexpectedFeedError(f"Malformed feed XML: {e}") from e
+
+    if not root_checked:
+        raise UnexpectedFeedError("Empty feed document")
+    return entries
+
+
+def _read_entry(elem):
+    """Extract the fields we use from one <entry> element."""
+    video_id = elem.findtext(_YT + "videoId")
+    published = elem.findtext(_ATOM + "published")
+    if not video_id or not published:
+        raise UnexpectedFeedError("Entry missing yt:videoId or published")
+    try:
+        published_dt = datetime.fromisoformat(published.replace("Z", "+00:00"))
+    except ValueError as e:
+        raise UnexpectedFeedError(f"Unparseable published date: {published}") from e
+    if published_dt.tzinfo is None:
+        raise UnexpectedFeedError(f"Published date without timezone: {published}")
+
+    link = None
+    for link_elem in elem.iterfind(_ATOM + "link"):
+        if link_elem.get("rel", "alternate") == "alternate":
+            link = link_elem.get("href")
+            break
+
+    return {
+        "videoId": video_id,
+        "title": elem.findtext(_ATOM + "title"),
+        "published": published,
+        "published_dt": published_dt,
+        "link": link,
+    }
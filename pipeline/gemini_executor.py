@@ -0,0 +1,152 @@
+"""Concurrent Gemini calls within requests-per-minute and tokens-per-minute quotas."""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline.rate_limiter import TokenBucket
+from pipeline.retry_scheduler import RetryScheduler, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS_PER_MINUTE = 15
+DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+DEFAULT_WORKERS = 4
+CHARS_PER_TOKEN = 4  # rough token estimate for English text
+_OUTPUT_TOKEN_ALLOWANCE = 512  # reserved per request for the response
+_BURST_FRACTION = 0.1  # share of a minute's quota that may be spent at once
+
+
+def estimate_tokens(text):
+    """Rough token count for quota accounting (about 4 characters per token)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def rate_limit_delay(error):
+    """Classify a Gemini error. Returns (is_rate_limit, server_suggested_delay_or_None)."""
+    if getattr(error, "code", None) != 429:
+        return False, None
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        for detail in details.get("error", {}).get("details", []):
+            delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+            if isinstance(delay, str) and delay.endswith("s"):
+                try:
+                    return True, float(delay[:-1])
+                except ValueError:
+                    pass
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    return True, parse_retry_after(headers.get("Retry-After"))
+
+
+class GeminiExecutor:
+    """Run Gemini generate_content calls in parallel within RPM and TPM quotas.
+
+    Each call reserves one request and its estimated prompt-plus-response
+    tokens from two token buckets; the model's reported usage is counted as
+    actualTokens (falling back to the estimate). The buckets refill at 90% of the quota
+    and hold 10% of it, so no sliding minute can exceed the quota. A 429
+    pauses every worker for the server-suggested delay (or a backoff); other
+    errors are retried with jittered exponential backoff. Calls that still
+    fail return None.
+    """
+
+    def __init__(self, client, model, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, workers=DEFAULT_WORKERS,
+                 max_retries=3, max_rate_limit_retries=5):
+        self.client = client
+        self.model = model
+        self.workers = workers
+        self.max_retries = max_retries
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self._requests = _quota_bucket(requests_per_minute)
+        self._tokens = _quota_bucket(tokens_per_minute)
+        self._backoff = RetryScheduler(max_retries=max(max_retries, max_rate_limit_retries),
+                                       base_delay=5, max_delay=60)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._counts = {"requests": 0, "succeeded": 0, "failed": 0, "rateLimited": 0, "errors": 0,
+                        "tokens": 0, "actualTokens": 0}
+        self._busy_seconds = 0.0
+
+    def generate(self, prompt, config=None):
+        """Call the model once (with retries). Returns the response text, or None."""
+        kwargs = {"config": config} if config else {}
+        tokens = estimate_tokens(prompt) + _OUTPUT_TOKEN_ALLOWANCE
+        rate_limited = errors = 0
+
+        while True:
+            self._wait_for_quota(tokens)
+            try:
+                response = self.client.models.generate_content(model=self.model, contents=prompt, **kwargs)
+                usage = getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
+                actual = usage if isinstance(usage, int) else tokens
+                self._count(requests=1, succeeded=1, tokens=tokens, actualTokens=actual)
+                return response.text
+            except Exception as e:
+                is_rate_limit, server_delay = rate_limit_delay(e)
+                if is_rate_limit:
+                    rate_limited += 1
+                    self._count(requests=1, rateLimited=1)
+                    attempts_left = rate_limited <= self.max_rate_limit_retries
+                    delay = self._backoff.delay_for(rate_limited, server_delay) if attempts_left else None
+                    if delay is not None:
+                        logger.warning("Gemini rate limited; pausing all workers for %.1fs", delay)
+                        self._pause(delay)
+                        continue
+                else:
+                    errors += 1
+                    self._count(requests=1, errors=1)
+                    delay = self._backoff.delay_for(errors) if errors < self.max_retries else None
+                    logger.warning("Gemini API attempt %d/%d failed: %s", errors, self.max_retries, e)
+                    if delay is not None:
+                        time.sleep(delay)
+                        continue
+                logger.error("Gemini API call failed: %s", e)
+                self._count(failed=1)
+                return None
+
+    def map(self, prompts, config=None):
+        """Run generate() for every prompt concurrently. Returns texts (or None) in order."""
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda prompt: self.generate(prompt, config), prompts))
+        with self._lock:
+            self._busy_seconds += time.monotonic() - started
+        return results
+
+    def stats(self):
+        """Return call counts and achieved throughput while map() was running."""
+        with self._lock:
+            stats = dict(self._counts)
+            minutes = self._busy_seconds / 60
+        stats["seconds"] = round(self._busy_seconds, 2)
+        stats["requestsPerMinute"] = round(stats["requests"] / minutes, 1) if minutes else 0
+        stats["tokensPerMinute"] = round(stats["tokens"] / minutes) if minutes else 0
+        return stats
+
+    def _wait_for_quota(self, tokens):
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        wait = max(self._requests.reserve(), self._tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+
+    def _pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        time.sleep(seconds)
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self._counts[key] += value
+
+
+def _quota_bucket(per_minute):
+    # Refill at 90% of the quota with a 10% burst, so any 60s window stays within quota
+    return TokenBucket(rate=per_minute * (1 - _BURST_FRACTION) / 60,
+                       capacity=max(1, per_minute * _BURST_FRACTION))
@@ -0,0 +1,189 @@
+"""SQLite store of every video, summary, daily digest and work item the pipeline has seen."""
+
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from pipeline.video import Video, as_video
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION_DAYS = 365
+
+VIDEO_FIELDS = ("id", "title", "publishedAt", "duration", "thumbnailUrl", "videoUrl", "summary",
+                "transcriptAvailable", "channelName", "channelUrl")
+# Stored when a video lacks the field, as merge_and_group does for data.json
+_VIDEO_DEFAULTS = {"title": "Untitled", "publishedAt": "", "thumbnailUrl": "", "videoUrl": "", "summary": "",
+                   "transcriptAvailable": False, "channelName": "Unknown", "channelUrl": ""}
+_SLOT_FIELDS = VIDEO_FIELDS[:-2]  # read from the Video itself; the channel fields from its Channel
+_WORK_FIELDS = ("id", "state", "attempts", "nextEligible", "publishedAt")
+_QUERY_CHUNK = 500  # bound parameters per IN (...) query
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    title TEXT,
+    publishedAt TEXT NOT NULL,
+    duration,
+    thumbnailUrl TEXT,
+    videoUrl TEXT,
+    summary TEXT,
+    transcriptAvailable INTEGER,
+    channelName TEXT NOT NULL,
+    channelUrl TEXT
+);
+CREATE INDEX IF NOT EXISTS videos_by_date ON videos (date, channelName, publishedAt);
+CREATE INDEX IF NOT EXISTS videos_by_channel ON videos (channelName, publishedAt);
+CREATE TABLE IF NOT EXISTS digests (
+    date TEXT PRIMARY KEY,
+    dailyDigest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS work (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    nextEligible INTEGER NOT NULL,
+    publishedAt TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class HistoryStore:
+    """Embedded history of the pipeline's output, with data.json as an export of its window.
+
+    Videos are stored flat (channel fields on each row) and keyed by ID, so
+    dedupe is an indexed lookup and the display window is an indexed range
+    scan, independent of how much history is kept. `in` and len() work as
+    on a set of known video IDs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def __contains__(self, video_id):
+        return self._conn.execute("SELECT 1 FROM videos WHERE id = ?", (video_id,)).fetchone() is not None
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def upsert_videos(self, videos):
+        """Insert videos, replacing any stored video with the same ID."""
+        rows = [_row(as_video(video)) for video in videos]
+        with self._conn:
+            # REPLACE gives a reprocessed video a new rowid, i.e. it sorts as newly added
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO videos (date, {', '.join(VIDEO_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' * len(VIDEO_FIELDS))})",
+                rows,
+            )
+
+    def get_videos(self, video_ids):
+        """Return {video_id: video} for the stored videos among video_ids."""
+        video_ids = list(video_ids)
+        videos = {}
+        for start in range(0, len(video_ids), _QUERY_CHUNK):
+            chunk = video_ids[start:start + _QUERY_CHUNK]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(VIDEO_FIELDS)} FROM videos WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            videos.update((row["id"], _video(row)) for row in rows)
+        return videos
+
+    def videos_since(self, cutoff_date):
+        """Return videos published on or after cutoff_date ("YYYY-MM-DD").
+
+        Ordered newest day first, then by channel name, then newest video
+        first, ties in the order they were stored.
+        """
+        rows = self._conn.execute(
+            f"SELECT {', '.join(VIDEO_FIELDS)} FROM videos WHERE date >= ? "
+            "ORDER BY date DESC, channelName, publishedAt DESC, rowid",
+            (cutoff_date,),
+        )
+        return [_video(row) for row in rows]
+
+    def digests_since(self, cutoff_date):
+        rows = self._conn.execute("SELECT date, dailyDigest FROM digests WHERE date >= ?", (cutoff_date,))
+        return {row["date"]: row["dailyDigest"] for row in rows}
+
+    def save_digests(self, days):
+        """Store the "dailyDigest" of each day that has one."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO digests (date, dailyDigest) VALUES (?, ?)",
+                [(day["date"], day["dailyDigest"]) for day in days if day.get("dailyDigest")],
+            )
+
+    def import_data(self, data):
+        """Load the videos and digests of a data.json structure, e.g. to seed an empty store."""
+        self.upsert_videos(
+            Video(video, channelName=channel.get("channelName", ""), channelUrl=channel.get("channelUrl", ""))
+            for day in data.get("days", [])
+            for channel in day.get("channels", [])
+            for video in channel.get("videos", [])
+        )
+        self.save_digests(data.get("days", []))
+        logger.info("Imported %d videos into history store %s", len(self), self.path)
+
+    def last_export(self):
+        """Return the "lastUpdated" of the last data.json exported from the store, or None."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'lastExport'").fetchone()
+        return row["value"] if row else None
+
+    def record_export(self, last_updated):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('lastExport', ?)", (last_updated,))
+
+    def load_work(self):
+        """Return work queue entries as {video_id: {"state", "attempts", "nextEligible", "publishedAt"}}."""
+        rows = self._conn.execute(f"SELECT {', '.join(_WORK_FIELDS)} FROM work")
+        return {row["id"]: {field: row[field] for field in _WORK_FIELDS[1:]} for row in rows}
+
+    def save_work(self, entries):
+        """Replace the stored work queue entries."""
+        with self._conn:
+            self._conn.execute("DELETE FROM work")
+            self._conn.executemany(
+                f"INSERT INTO work ({', '.join(_WORK_FIELDS)}) VALUES ({', '.join('?' * len(_WORK_FIELDS))})",
+                [(video_id, *(entry[field] for field in _WORK_FIELDS[1:])) for video_id, entry in entries.items()],
+            )
+
+    def prune(self, retention_days=DEFAULT_RETENTION_DAYS):
+        """Delete videos and digests older than retention_days."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        with self._conn:
+            removed = self._conn.execute("DELETE FROM videos WHERE date < ?", (cutoff,)).rowcount
+            self._conn.execute("DELETE FROM digests WHERE date < ?", (cutoff,))
+        if removed:
+            logger.info("Removed %d videos older than %d days from history", removed, retention_days)
+
+    def close(self):
+        self._conn.close()
+
+
+def _row(video):
+    """Row values for a Video: its date, then VIDEO_FIELDS."""
+    channel = getattr(video, "channel", None)
+    name, url = getattr(channel, "name", None), getattr(channel, "url", None)
+    return (
+        getattr(video, "publishedAt", "")[:10],
+        *(getattr(video, field, _VIDEO_DEFAULTS.get(field)) for field in _SLOT_FIELDS),
+        _VIDEO_DEFAULTS["channelName"] if name is None else name,
+        _VIDEO_DEFAULTS["channelUrl"] if url is None else url,
+    )
+
+
+def _video(row):
+    video = Video(dict(row))
+    video.transcriptAvailable = bool(video.transcriptAvailable)
+    return video
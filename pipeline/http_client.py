@@ -0,0 +1,117 @@
+"""Shared pooled HTTP sessions and per-host request metrics for all network stages."""
+
+import logging
+import threading
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+DEFAULT_TIMEOUT = 15  # seconds
+_DEFAULT_POOL_SIZE = 10  # keep-alive connections per host
+
+_lock = threading.Lock()
+_pool_size = _DEFAULT_POOL_SIZE
+_session = None
+_host_stats = defaultdict(lambda: {"requests": 0, "bytes": 0, "latency": 0.0})
+
+
+def configure(pool_size):
+    """Size connection pools for `pool_size` concurrent requests per host.
+
+    Call before the first request; an existing shared session is replaced.
+    """
+    global _pool_size, _session
+    with _lock:
+        _pool_size = max(1, pool_size)
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def new_session():
+    """Create a pooled session with the shared headers and metrics hook.
+
+    Use this instead of get_session() for clients that mutate session state
+    (e.g. youtube-transcript-api sets proxies on the session it is given).
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_pool_size, pool_maxsize=_pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    session.hooks["response"].append(_record_response)
+    return session
+
+
+def get_session():
+    """Return the pipeline-wide keep-alive session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = new_session()
+        return _session
+
+
+def get(url, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """GET through the shared session. `headers` are merged over DEFAULT_HEADERS."""
+    return get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+
+
+def async_client(concurrency):
+    """Create an httpx.AsyncClient with the shared headers, timeout and metrics."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return httpx.AsyncClient(
+        headers=DEFAULT_HEADERS,
+        timeout=DEFAULT_TIMEOUT,
+        limits=limits,
+        follow_redirects=True,
+        event_hooks={"response": [_record_async_response]},
+    )
+
+
+def record(url, nbytes=0, seconds=0.0, count=1):
+    """Add a request (or just downloaded bytes, with count=0) to the host's counters."""
+    host = urlparse(url).netloc.lower()
+    with _lock:
+        stats = _host_stats[host]
+        stats["requests"] += count
+        stats["bytes"] += nbytes
+        stats["latency"] += seconds
+
+
+def stats():
+    """Return {host: {"requests", "bytes", "avgLatencyMs"}} for requests made so far."""
+    with _lock:
+        return {
+            host: {
+                "requests": s["requests"],
+                "bytes": s["bytes"],
+                "avgLatencyMs": round(1000 * s["latency"] / s["requests"]) if s["requests"] else 0,
+            }
+            for host, s in _host_stats.items()
+        }
+
+
+def reset_stats():
+    with _lock:
+        _host_stats.clear()
+
+
+def _record_response(response, *args, **kwargs):
+    # Streamed bodies are not read yet; their callers report bytes via record(count=0)
+    nbytes = 0 if kwargs.get("stream") else len(response.content)
+    record(response.url, nbytes, response.elapsed.total_seconds())
+
+
+async def _record_async_response(response):
+    await response.aread()
+    record(str(response.url), len(response.content), response.elapsed.total_seconds())
@@ -1,13 +1,28 @@
 """Pipeline orchestrator — 8-stage sequential execution."""
 
+import argparse
 import logging
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 from pipeline import (
     config_loader,
     channel_resolver,
+    # budget_planner,
+    # daily_digest,
+    http_client,
+    rate_limiter,
     rss_fetcher,
+    sharding,
+    # gemini_executor,
+    history_store,
+    # proxy_pool,
+    # summary_cache,
+    # transcript_compactor,
     # transcript_fetcher,
+    # transcript_store,
+    # work_queue,
     # summarizer,
     data_manager,
     writer,
@@ -22,75 +37,248 @@ logger = logging.getLogger(__name__)
 
 
 class PipelineStatus:
-    """Track warnings and errors during pipeline execution."""
+    """Track warnings, errors and per-stage metrics during pipeline execution."""
 
     def __init__(self):
         self.issues = []
+        self.metrics = {}
 
     def warn(self, msg):
         self.issues.append(msg)
 
+    def record(self, name, values):
+        """Attach a dict of metrics for a stage (e.g. cache hit counts)."""
+        if values:
+            self.metrics[name] = values
+
     def to_dict(self):
-        if not self.issues:
-            return {"status": "ok", "issues": []}
-        return {"status": "partial", "issues": self.issues}
+        result = {"status": "partial" if self.issues else "ok", "issues": self.issues}
+        if self.metrics:
+            result["metrics"] = self.metrics
+        return result
+
+
+def _ingest_channels(config, status):
+    """Stages 3-4: resolve config["channels"] and fetch their RSS feeds.
+
+    Returns (number of resolved channels, flat list of videos).
+    """
+    resolver_config = config.get("resolver", {})
+    rss_config = config.get("rss", {})
+
+    # Stage 3: Resolve channels
+    logger.info("Stage 3: Resolving %d channel URLs", len(config["channels"]))
+    cache_config = config.get("cache", {})
+    resolution_cache = channel_resolver.ResolutionCache(
+        config_loader.cache_path(config, "channel_ids.json"),
+        ttl_days=cache_config.get("channelIdTtlDays", channel_resolver.CACHE_TTL_DAYS),
+    )
+    resolve_stats = {}
+    channels = channel_resolver.resolve_channels(
+        config["channels"],
+        cache=resolution_cache,
+        stats=resolve_stats,
+        workers=resolver_config.get("workers", 1),
+        limiter=rate_limiter.HostRateLimiter(resolver_config.get("requestsPerSecond", 1)),
+    )
+    status.record("channelResolution", resolve_stats)
+    if not channels:
+        return 0, []
+
+    failed_channels = len(config["channels"]) - len(channels)
+    if failed_channels > 0:
+        status.warn(f"{failed_channels} channel(s) could not be resolved")
+
+    # Stage 4: Fetch RSS feeds
+    logger.info("Stage 4: Fetching RSS feeds")
+    rss_stats = {}
+    all_videos = rss_fetcher.fetch_videos(
+        channels,
+        config["display"]["daysToShow"],
+        engine=rss_config.get("engine", "sequential"),
+        concurrency=rss_config.get("concurrency", 8),
+        requests_per_second=rss_config.get("requestsPerSecond"),
+        feed_cache=rss_fetcher.FeedCache(config_loader.cache_path(config, "feeds.json")),
+        stats=rss_stats,
+        retry_base_delay=rss_config.get("retryBaseDelaySeconds", 30),
+        retry_deadline=rss_config.get("retryDeadlineSeconds", 300),
+    )
+    status.record("rssFetch", rss_stats)
+    logger.info("Found %d total videos in RSS feeds", len(all_videos))
+
+    rss_channels = set(v["channelName"] for v in all_videos)
+    rss_failed = [c["channel_name"] for c in channels if c["channel_name"] not in rss_channels]
+    if rss_failed:
+        status.warn(f"RSS unavailable for: {', '.join(rss_failed)}")
+
+    return len(channels), all_videos
+
+
+def _configure_http(config):
+    resolver_config = config.get("resolver", {})
+    rss_config = config.get("rss", {})
+    http_client.configure(pool_size=max(resolver_config.get("workers", 1), rss_config.get("concurrency", 8)))
+
+
+def run_shard(config_path, shard_index, shard_count, shard_dir):
+    """Run stages 3-4 for one shard of the channel list and write its partial result.
+
+    Used both by worker processes and by separate runner invocations
+    (python -m pipeline.main --shard-index I --shard-count N).
+    """
+    config = sharding.shard_config(config_loader.load_config(config_path), shard_index, shard_count)
+    logger.info("Shard %d/%d: %d channels", shard_index + 1, shard_count, len(config["channels"]))
+    _configure_http(config)
+    status = PipelineStatus()
+    resolved_count, videos = _ingest_channels(config, status) if config["channels"] else (0, [])
+    status.record("http", http_client.stats())
+    return sharding.write_shard_result(
+        shard_dir, shard_index, shard_count, config["channels"], resolved_count, videos, status.to_dict()
+    )
+
 
+def _ingest_sharded(config_path, config, shard_count, shard_dir, status, run_workers):
+    """Collect stages 3-4 output from all shards, running them first if run_workers.
 
-def run_pipeline(config_path="config.json", data_path="data.json"):
-    """Execute the full 8-stage pipeline."""
+    Returns (number of resolved channels, flat list of videos).
+    """
+    if run_workers:
+        logger.info("Running %d ingestion shards in worker processes", shard_count)
+        with ProcessPoolExecutor(max_workers=shard_count) as pool:
+            list(pool.map(run_shard, [config_path] * shard_count, range(shard_count),
+                          [shard_count] * shard_count, [shard_dir] * shard_count))
+
+    resolved_count = 0
+    all_videos = []
+    for result in sharding.load_shard_results(shard_dir, shard_count, config["channels"]):
+        resolved_count += result["resolvedChannels"]
+        all_videos.extend(result["videos"])
+        shard_status = result.get("status", {})
+        for issue in shard_status.get("issues", []):
+            status.warn(issue)
+        for name, values in shard_status.get("metrics", {}).items():
+            status.record(f"shard{result['shardIndex']}.{name}", values)
+    logger.info("Merged %d shard results: %d channels resolved, %d videos",
+                shard_count, resolved_count, len(all_videos))
+    return resolved_count, all_videos
+
+
+def run_pipeline(config_path="config.json", data_path="data.json", shard_count=None, shard_dir=None,
+                 merge_only=False):
+    """Execute the full 8-stage pipeline.
+
+    With shard_count > 1 (default: config sharding.processes), stages 3-4 run
+    in that many worker processes over a stable partition of the channels, and
+    their partial results in shard_dir are merged before stage 5. merge_only
+    skips running the shards and merges results written by separate
+    run_shard invocations.
+    """
     try:
         status = PipelineStatus()
 
         # Stage 1: Load config
         logger.info("Stage 1: Loading config from %s", config_path)
         config = config_loader.load_config(config_path)
+        sharding_config = config.get("sharding", {})
+        shard_count = shard_count or sharding_config.get("processes", 1)
+        _configure_http(config)
 
-        # Stage 2: Load existing data
-        logger.info("Stage 2: Loading existing data from %s", data_path)
-        existing_data = data_manager.load_existing_data(data_path)
-        existing_ids = data_manager.get_existing_video_ids(existing_data)
+        # Stage 2: Load existing data (the history store, brought up to date from data.json if behind)
+        history_config = config.get("history", {})
+        history = None
+        if history_config.get("enabled"):
+            history = history_store.HistoryStore(config_loader.cache_path(config, "history.sqlite"))
+            logger.info("Stage 2: Loading existing data from %s", history.path)
+            data_manager.sync_history(history, data_path)
+            existing_ids = history
+        else:
+            logger.info("Stage 2: Loading existing data from %s", data_path)
+            existing_data = data_manager.load_existing_data(data_path, lazy=True)
+            existing_ids = data_manager.get_existing_video_ids(existing_data)
         logger.info("Found %d existing videos", len(existing_ids))
 
-        # Stage 3: Resolve channels
-        logger.info("Stage 3: Resolving %d channel URLs", len(config["channels"]))
-        channels = channel_resolver.resolve_channels(config["channels"])
-        if not channels:
+        # Stages 3-4: Resolve channels and fetch RSS feeds
+        shard_dir = shard_dir or sharding_config.get("dir")
+        if shard_count > 1 and shard_dir:
+            resolved_count, all_videos = _ingest_sharded(
+                config_path, config, shard_count, shard_dir, status, run_workers=not merge_only
+            )
+        elif shard_count > 1:
+            with tempfile.TemporaryDirectory(prefix="shards-") as tmp_dir:
+                resolved_count, all_videos = _ingest_sharded(
+                    config_path, config, shard_count, tmp_dir, status, run_workers=True
+                )
+        else:
+            resolved_count, all_videos = _ingest_channels(config, status)
+        if not resolved_count:
             logger.warning("No channels resolved — exiting")
             return
 
-        failed_channels = len(config["channels"]) - len(channels)
-        if failed_channels > 0:
-            status.warn(f"{failed_channels} channel(s) could not be resolved")
-
-        # Stage 4: Fetch RSS feeds
-        logger.info("Stage 4: Fetching RSS feeds")
-        all_videos = rss_fetcher.fetch_videos(channels, config["display"]["daysToShow"])
-        logger.info("Found %d total videos in RSS feeds", len(all_videos))
-
-        rss_channels = set(v["channelName"] for v in all_videos)
-        rss_failed = [c["channel_name"] for c in channels if c["channel_name"] not in rss_channels]
-        if rss_failed:
-            status.warn(f"RSS unavailable for: {', '.join(rss_failed)}")
-
         # Stage 5: Filter to new videos only
         new_videos = data_manager.filter_new_videos(all_videos, existing_ids)
+
+        # Work queue: add due retries of failed transcripts/summaries (disabled with stages 6-7)
+        # queue_config = config.get("workQueue", {})
+        # queue = work_queue.WorkQueue(
+        #     config_loader.cache_path(config, "work_queue.json"),
+        #     max_attempts=queue_config.get("maxAttempts", work_queue.DEFAULT_MAX_ATTEMPTS),
+        #     retry_base_hours=queue_config.get("retryBaseHours", work_queue.DEFAULT_RETRY_BASE_HOURS),
+        #     history=history,
+        # )
+        # queue.enqueue(new_videos)
+        # if history is not None:
+        #     known_videos = history.get_videos(queue.due())
+        # else:
+        #     known_videos = data_manager.index_videos(existing_data)
+        # known_videos.update({v["id"]: v for v in all_videos})
+        # new_videos = queue.select(known_videos, limit=queue_config.get("maxItemsPerRun"))
+
         if not new_videos:
             logger.info("No new videos found — keeping existing data.json unchanged")
             # Still update status in existing data
+            if history is not None:
+                existing_data = data_manager.window_from_history(history, config["display"]["daysToShow"])
+            status.record("http", http_client.stats())
             existing_data["pipelineStatus"] = status.to_dict()
             writer.write_data(existing_data, data_path)
+            if history is not None:
+                history.record_export(existing_data["lastUpdated"])
             return
         logger.info("Stage 5: %d new videos to process", len(new_videos))
 
         # Stage 6: Fetch transcripts (disabled — re-enable when proxy is configured)
         # logger.info("Stage 6: Fetching transcripts for %d videos", len(new_videos))
-        # new_videos = transcript_fetcher.fetch_transcripts(new_videos)
+        # transcripts_config = config.get("transcripts", {})
+        # store = transcript_store.TranscriptStore(
+        #     config_loader.cache_path(config, "transcripts"),
+        #     max_bytes=transcripts_config.get("storeMaxMB", 200) * 1024 * 1024,
+        # )
+        # proxies = proxy_pool.configured_proxies(transcripts_config.get("proxies"))
+        # pool = proxy_pool.ProxyPool(
+        #     proxies, cooldown=transcripts_config.get("proxyCooldownSeconds", proxy_pool.DEFAULT_COOLDOWN)
+        # ) if proxies else None
+        # new_videos = transcript_fetcher.fetch_transcripts(
+        #     new_videos, workers=transcripts_config.get("workers", 1), store=store, proxy_pool=pool
+        # )
+        # status.record("transcriptStore", store.stats())
+        # if pool:
+        #     status.record("proxies", pool.stats())
         #
         # transcripts_ok = sum(1 for v in new_videos if v.get("transcriptAvailable"))
         # if transcripts_ok == 0:
-        #     status.warn("Transcripts blocked (cloud IP) — set YOUTUBE_PROXY secret for transcripts")
+        #     status.warn("Transcripts blocked (cloud IP) — set YOUTUBE_PROXY(IES) secret for transcripts")
         # elif transcripts_ok < len(new_videos):
         #     status.warn(f"Transcripts fetched for {transcripts_ok}/{len(new_videos)} videos")
+        # for video in new_videos:
+        #     if queue.state(video["id"]) == work_queue.PENDING_TRANSCRIPT:
+        #         queue.record_transcript(video["id"], video["transcriptAvailable"])
+
+        # Compact transcripts before summarizing (disabled with stages 6-7)
+        # compaction_stats = {}
+        # transcript_compactor.compact_videos(
+        #     new_videos, max_tokens=transcripts_config.get("compactMaxTokens"), stats=compaction_stats
+        # )
+        # status.record("compaction", compaction_stats)
 
         # Stage 7: Generate summaries (disabled — re-enable when transcripts are available)
         # logger.info("Stage 7: Generating summaries")
@@ -99,9 +287,48 @@ def run_pipeline(config_path="config.json", data_path="data.json"):
         #     client = summarizer.init_client(config)
         #     model = config["ai"]["model"]
         #
+        #     executor = gemini_executor.GeminiExecutor(
+        #         client, model,
+        #         requests_per_minute=config["ai"].get("requestsPerMinute", gemini_executor.DEFAULT_REQUESTS_PER_MINUTE),
+        #         tokens_per_minute=config["ai"].get("tokensPerMinute", gemini_executor.DEFAULT_TOKENS_PER_MINUTE),
+        #         workers=config["ai"].get("workers", gemini_executor.DEFAULT_WORKERS),
+        #     )
+        #     cache_config = config.get("cache", {})
+        #     llm_cache = summary_cache.SummaryCache(
+        #         config_loader.cache_path(config, "summaries.json"),
+        #         max_age_days=cache_config.get("summaryMaxAgeDays", summary_cache.DEFAULT_MAX_AGE_DAYS),
+        #         max_entries=cache_config.get("summaryMaxEntries", summary_cache.DEFAULT_MAX_ENTRIES),
+        #     )
+        #     budget_config = config.get("budget", {})
+        #     ledger = budget_planner.UsageLedger(config_loader.cache_path(config, "llm_usage.json"))
+        #     to_summarize, deferred, budget_plan = budget_planner.plan_summaries(
+        #         [v for v in new_videos if v["transcriptAvailable"]],
+        #         used_today=ledger.used_today(),
+        #         tokens_per_run=budget_config.get("tokensPerRun", budget_planner.DEFAULT_TOKENS_PER_RUN),
+        #         tokens_per_day=budget_config.get("tokensPerDay", budget_planner.DEFAULT_TOKENS_PER_DAY),
+        #         important_channels=budget_config.get("importantChannels", []),
+        #         long_transcript_tokens=config["ai"].get("longTranscriptTokens", summarizer.DEFAULT_LONG_TRANSCRIPT_TOKENS),
+        #         chunk_tokens=config["ai"].get("chunkTokens", summarizer.DEFAULT_CHUNK_TOKENS),
+        #     )
+        #     summary_stats = {}
+        #     summaries = summarizer.summarize_videos(
+        #         client, model, to_summarize,
+        #         max_batch_tokens=config["ai"].get("batchTokens", summarizer.DEFAULT_BATCH_TOKENS),
+        #         max_batch_size=config["ai"].get("batchSize", summarizer.DEFAULT_BATCH_SIZE),
+        #         stats=summary_stats, executor=executor, cache=llm_cache,
+        #         long_transcript_tokens=config["ai"].get("longTranscriptTokens", summarizer.DEFAULT_LONG_TRANSCRIPT_TOKENS),
+        #         chunk_tokens=config["ai"].get("chunkTokens", summarizer.DEFAULT_CHUNK_TOKENS),
+        #     )
+        #     summaries.update({v["id"]: budget_planner.DEFERRED_MESSAGE for v in deferred})
+        #     status.record("summaries", summary_stats)
+        #     gemini_stats = executor.stats()
+        #     status.record("gemini", gemini_stats)
+        #     ledger.record(gemini_stats["actualTokens"], gemini_stats["requests"])
+        #     ledger.save()
+        #     status.record("budget", {**budget_plan, "actualTokens": gemini_stats["actualTokens"]})
         #     for video in new_videos:
         #         if video["transcriptAvailable"]:
-        #             video["summary"] = summarizer.summarize_video(client, model, video["transcript"])
+        #             video["summary"] = summaries[video["id"]]
         #             if video["summary"].startswith("Summary generation failed"):
         #                 summary_errors += 1
         #         else:
@@ -118,6 +345,9 @@ def run_pipeline(config_path="config.json", data_path="data.json"):
         #
         # if summary_errors > 0:
         #     status.warn(f"AI summaries failed for {summary_errors} video(s) — check Gemini API quota")
+        # for video in new_videos:
+        #     if queue.state(video["id"]) == work_queue.PENDING_SUMMARY and video["summary"] != budget_planner.DEFERRED_MESSAGE:
+        #         queue.record_summary(video["id"], not video["summary"].startswith("Summary generation failed"))
 
         # Set defaults while transcripts/summaries are disabled
         for video in new_videos:
@@ -126,26 +356,43 @@ def run_pipeline(config_path="config.json", data_path="data.json"):
 
         # Stage 8: Merge, group, and write
         logger.info("Stage 8: Merging data and writing output")
-        merged_data = data_manager.merge_and_group(existing_data, new_videos, config["display"]["daysToShow"])
+        if history is not None:
+            merged_data = data_manager.merge_into_history(history, new_videos, config["display"]["daysToShow"])
+            history.prune(history_config.get("retentionDays", history_store.DEFAULT_RETENTION_DAYS))
+        else:
+            merged_data = data_manager.merge_and_group(
+                existing_data, new_videos, config["display"]["daysToShow"], existing_ids=existing_ids
+            )
 
         # Daily digest generation (disabled — re-enable with summaries)
-        # changed_days = data_manager.get_changed_days(existing_data, merged_data)
-        # if changed_days and summary_errors == 0:
-        #     logger.info("Regenerating daily digests for %d days: %s", len(changed_days), changed_days)
-        #     for day in merged_data["days"]:
-        #         if day["date"] in changed_days:
-        #             video_summaries = []
-        #             for ch in day["channels"]:
-        #                 for v in ch["videos"]:
-        #                     if v.get("summary") and not v["summary"].startswith("Transcript not available"):
-        #                         video_summaries.append(v["summary"])
-        #             if video_summaries:
-        #                 day["dailyDigest"] = summarizer.generate_daily_digest(
-        #                     client, model, day["date"], video_summaries
-        #                 )
+        # if summary_errors == 0:
+        #     digest_config = config.get("digests", {})
+        #     digest_state = daily_digest.DigestState(config_loader.cache_path(config, "digests.json"))
+        #     digest_stats = {}
+        #     daily_digest.refresh_digests(
+        #         client, model, merged_data["days"], digest_state, cache=llm_cache,
+        #         rebuild_every=digest_config.get("rebuildEvery", daily_digest.DEFAULT_REBUILD_EVERY),
+        #         max_delta_ratio=digest_config.get("maxDeltaRatio", daily_digest.DEFAULT_MAX_DELTA_RATIO),
+        #         stats=digest_stats, executor=executor,
+        #     )
+        #     digest_state.save()
+        #     if history is not None:
+        #         history.save_digests(merged_data["days"])
+        #     status.record("digests", digest_stats)
+        #     ledger.record(digest_stats["actualTokens"], digest_stats["fullRebuilds"] + digest_stats["incrementalUpdates"])
+        #     ledger.save()
+        # llm_cache.save()
+        # status.record("summaryCache", llm_cache.stats())
+
+        # queue.prune(data_manager.get_existing_video_ids(merged_data))
+        # queue.save()
+        # status.record("workQueue", queue.stats())
 
+        status.record("http", http_client.stats())
         merged_data["pipelineStatus"] = status.to_dict()
         writer.write_data(merged_data, data_path)
+        if history is not None:
+            history.record_export(merged_data["lastUpdated"])
 
         total_days = len(merged_data["days"])
         logger.info("Pipeline complete. Processed %d new videos across %d days.", len(new_videos), total_days)
@@ -157,5 +404,28 @@ def run_pipeline(config_path="config.json", data_path="data.json"):
         sys.exit(1)
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI News pipeline")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--data", default="data.json")
+    parser.add_argument("--shard-count", type=int, help="number of channel shards (default: config sharding.processes)")
+    parser.add_argument("--shard-index", type=int, help="only ingest this shard and write its partial result")
+    parser.add_argument("--shard-dir", help="directory for partial shard results")
+    parser.add_argument("--merge-shards", action="store_true",
+                        help="merge partial results from --shard-dir instead of ingesting")
+    args = parser.parse_args(argv)
+
+    if args.shard_index is not None:
+        if not args.shard_count or not args.shard_dir or not 0 <= args.shard_index < args.shard_count:
+            parser.error("--shard-index needs --shard-count and --shard-dir, and must be < --shard-count")
+        run_shard(args.config, args.shard_index, args.shard_count, args.shard_dir)
+    elif args.merge_shards:
+        if not args.shard_count or not args.shard_dir:
+            parser.error("--merge-shards needs --shard-count and --shard-dir")
+        run_pipeline(args.config, args.data, args.shard_count, args.shard_dir, merge_only=True)
+    else:
+        run_pipeline(args.config, args.data, args.shard_count, args.shard_dir)
+
+
 if __name__ == "__main__":
-    run_pipeline()
+    main()
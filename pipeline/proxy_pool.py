@@ -0,0 +1,114 @@
+"""Rotating pool of transcript proxies with latency and failure scoring."""
+
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from pipeline.http_client import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COOLDOWN = 300  # seconds a blocked proxy is rested
+_MAX_FAILURES = 3  # consecutive errors before a proxy is rested
+_LATENCY_SMOOTHING = 0.3  # weight of the newest sample in the latency average
+
+
+def configured_proxies(extra=None):
+    """Return proxy URLs from YOUTUBE_PROXIES, YOUTUBE_PROXY and `extra`, deduplicated.
+
+    YOUTUBE_PROXIES holds several URLs separated by commas or whitespace.
+    """
+    urls = re.split(r"[,\s]+", os.environ.get("YOUTUBE_PROXIES", ""))
+    urls.append(os.environ.get("YOUTUBE_PROXY", ""))
+    urls.extend(extra or [])
+    return list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+
+
+def redact(proxy_url):
+    """Strip credentials from a proxy URL so it can be logged or published."""
+    parsed = urlparse(proxy_url)
+    host = parsed.hostname or proxy_url
+    return f"{parsed.scheme}://{host}:{parsed.port}" if parsed.port else f"{parsed.scheme}://{host}"
+
+
+class ProxyPool:
+    """Route each request to the fastest healthy proxy.
+
+    Every proxy keeps a smoothed latency and success ratio; its score is
+    latency divided by success ratio, and untried proxies score zero so they
+    are probed first. A proxy that is blocked, or fails _MAX_FAILURES times in
+    a row, cools down for `cooldown` seconds before it is used again.
+    Safe to share between transcript worker threads.
+    """
+
+    def __init__(self, proxies, cooldown=DEFAULT_COOLDOWN):
+        if not proxies:
+            raise ValueError("ProxyPool needs at least one proxy")
+        self.cooldown = cooldown
+        self._proxies = {
+            url: {"requests": 0, "failures": 0, "blocks": 0, "streak": 0,
+                  "latency": None, "coolUntil": 0.0}
+            for url in proxies
+        }
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._proxies)
+
+    def acquire(self):
+        """Return the best available proxy URL, or None if every proxy is cooling down."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [(self._score(s), url) for url, s in self._proxies.items() if s["coolUntil"] <= now]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda item: item[0])[1]
+
+    def report_success(self, proxy_url, seconds):
+        with self._lock:
+            s = self._proxies[proxy_url]
+            s["requests"] += 1
+            s["streak"] = 0
+            if s["latency"] is None:
+                s["latency"] = seconds
+            else:
+                s["latency"] += _LATENCY_SMOOTHING * (seconds - s["latency"])
+
+    def report_failure(self, proxy_url, blocked=False):
+        """Record a failed request; blocks and repeated failures start a cooldown."""
+        with self._lock:
+            s = self._proxies[proxy_url]
+            s["requests"] += 1
+            s["failures"] += 1
+            s["streak"] += 1
+            if blocked:
+                s["blocks"] += 1
+            if blocked or s["streak"] >= _MAX_FAILURES:
+                s["coolUntil"] = time.monotonic() + self.cooldown
+                s["streak"] = 0
+                logger.warning("Proxy %s cooling down for %ds", redact(proxy_url), self.cooldown)
+
+    def stats(self):
+        """Return {redacted proxy: {"requests", "failures", "blocks", "avgLatencyMs"}}."""
+        with self._lock:
+            return {
+                redact(url): {
+                    "requests": s["requests"],
+                    "failures": s["failures"],
+                    "blocks": s["blocks"],
+                    "avgLatencyMs": round(1000 * s["latency"]) if s["latency"] is not None else None,
+                }
+                for url, s in self._proxies.items()
+            }
+
+    @staticmethod
+    def _score(s):
+        if s["requests"] == 0:
+            return 0.0
+        # A proxy that has only ever failed is scored as if it always timed out
+        latency = s["latency"] if s["latency"] is not None else DEFAULT_TIMEOUT
+        success_ratio = (s["requests"] - s["failures"] + 1) / (s["requests"] + 2)
+        return latency / success_ratio
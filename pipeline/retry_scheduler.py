@@ -0,0 +1,83 @@
+"""Schedule per-item retries with jittered exponential backoff and an overall deadline."""
+
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date). Returns seconds or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryScheduler:
+    """Decide when failed items should be retried, and queue them until due.
+
+    The delay after the n-th failure is base_delay * 2**(n-1), capped at
+    max_delay, with "equal jitter" (half fixed, half random) so many failing
+    items don't retry in lockstep. A server-supplied Retry-After raises the
+    delay. Retries that would land after `deadline` (a time.monotonic()
+    value) are abandoned instead of waited for.
+    """
+
+    def __init__(self, max_retries=3, base_delay=30, max_delay=180, deadline=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._queue = []
+        self._counter = itertools.count()
+
+    def delay_for(self, failures, retry_after=None):
+        """Seconds to wait before retrying after `failures` failed attempts.
+
+        Returns None if the item has used all its retries or the retry would
+        fall past the deadline.
+        """
+        if failures > self.max_retries:
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** (failures - 1))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if self.deadline is not None and time.monotonic() + delay > self.deadline:
+            return None
+        return delay
+
+    def add(self, item, failures, retry_after=None):
+        """Queue item for retry. Returns the delay, or None if it was given up on."""
+        delay = self.delay_for(failures, retry_after)
+        if delay is not None:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._counter), item, failures))
+        return delay
+
+    def pop_due(self):
+        """Remove and return [(item, failures)] for every retry that is due now."""
+        now = time.monotonic()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            _, _, item, failures = heapq.heappop(self._queue)
+            due.append((item, failures))
+        return due
+
+    def pop_next(self):
+        """Remove the earliest retry. Returns (seconds_until_due, item, failures)."""
+        due_at, _, item, failures = heapq.heappop(self._queue)
+        return max(0.0, due_at - time.monotonic()), item, failures
+
+    def __len__(self):
+        return len(self._queue)
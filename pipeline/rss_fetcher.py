@@ -1,11 +1,19 @@
 """Fetch and parse YouTube RSS feeds for video discovery."""
 
+import asyncio
+import hashlib
 import logging
 import time
 from datetime import datetime, timedelta, timezone
 
 import feedparser
-import requests
+
+from pipeline import http_client
+from pipeline.feed_parser import UnexpectedFeedError, parse_youtube_feed
+from pipeline.rate_limiter import TokenBucket
+from pipeline.retry_scheduler import RetryScheduler, parse_retry_after
+from pipeline.state_file import load_state, save_state
+from pipeline.video import Video
 
 logger = logging.getLogger(__name__)
 
@@ -13,28 +21,141 @@ RSS_URL_TEMPLATE = "https://www.youtube.com/feeds/videos.xml?channel_id={channel
 THUMBNAIL_URL_TEMPLATE = "https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
 _REQUEST_DELAY = 1  # seconds between RSS fetches
 _MAX_RETRIES = 3
-_RETRY_INTERVAL = 180  # seconds between retries (3 minutes)
+_RETRY_BASE_DELAY = 30  # seconds before the first retry; doubles per attempt
+_RETRY_MAX_DELAY = 180  # cap on a single retry delay (3 minutes)
+_RETRY_DEADLINE = 300  # seconds after fetching starts when pending retries are abandoned
+_DEFAULT_CONCURRENCY = 8  # simultaneous feed requests for the async engine
+ENGINES = ("sequential", "async")
 _HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
     "Accept": "application/xml, text/xml, application/atom+xml, */*",
-    "Accept-Language": "en-US,en;q=0.9",
 }
 
 
-def fetch_videos(channels, days_to_show):
+class FeedCache:
+    """Persistent per-feed validators and last parsed entries.
+
+    Entries are stored as {channel_id: {"etag", "lastModified", "contentHash", "cutoff", "videos"}},
+    where "videos" holds the entries of the last parsed feed published at or
+    after "cutoff" (the parse cutoff), loaded back as Video records. An entry
+    only serves a run whose cutoff is no earlier than its own; for a wider
+    window (e.g. a raised daysToShow) the feed is fetched unconditionally and
+    parsed again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = load_state(path)
+        for entry in self.entries.values():
+            entry["videos"] = [Video(v) for v in entry.get("videos") or []]
+        self.not_modified = 0
+        self.unchanged = 0
+        self.parsed = 0
+        self.bytes_downloaded = 0
+
+    def _entry(self, channel_id, cutoff):
+        """Return the entry for a feed if it covers cutoff (any entry if cutoff is None)."""
+        entry = self.entries.get(channel_id)
+        if not entry or cutoff is None:
+            return entry
+        if "cutoff" not in entry:  # stored before entries recorded their parse cutoff
+            return None
+        parse_cutoff = self.parse_cutoff(channel_id)
+        return entry if parse_cutoff is None or parse_cutoff <= cutoff else None
+
+    def parse_cutoff(self, channel_id):
+        """Return the cutoff a feed's cached entries were parsed with (None: the whole feed)."""
+        value = self.entries[channel_id].get("cutoff")
+        return datetime.fromisoformat(value) if value else None
+
+    def request_headers(self, channel_id, cutoff=None):
+        """Return conditional GET headers for a feed we have seen before and whose entries cover cutoff."""
+        entry = self._entry(channel_id, cutoff)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("lastModified"):
+            headers["If-Modified-Since"] = entry["lastModified"]
+        return headers
+
+    def cached_videos(self, channel_id, content_hash=None, cutoff=None):
+        """Return the last parsed videos if they cover cutoff, optionally only if the body hash matches."""
+        entry = self._entry(channel_id, cutoff)
+        if not entry or (content_hash is not None and entry.get("contentHash") != content_hash):
+            return None
+        return entry.get("videos")
+
+    def store(self, channel_id, response_headers, content_hash, videos, cutoff=None):
+        self.entries[channel_id] = {
+            "etag": response_headers.get("ETag"),
+            "lastModified": response_headers.get("Last-Modified"),
+            "contentHash": content_hash,
+            "cutoff": cutoff.isoformat() if cutoff else None,
+            "videos": videos,
+        }
+
+    def prune(self, keep_channel_ids):
+        """Drop feeds for channels that are no longer configured."""
+        keep = set(keep_channel_ids)
+        for channel_id in [c for c in self.entries if c not in keep]:
+            del self.entries[channel_id]
+
+    def stats(self):
+        return {
+            "notModified": self.not_modified,
+            "unchanged": self.unchanged,
+            "parsed": self.parsed,
+            "bytesDownloaded": self.bytes_downloaded,
+        }
+
+    def save(self):
+        try:
+            save_state(self.entries, self.path)
+        except OSError as e:
+            logger.warning("Could not save feed cache %s: %s", self.path, e)
+
+
+def fetch_videos(channels, days_to_show, engine="sequential", concurrency=_DEFAULT_CONCURRENCY,
+                 requests_per_second=None, feed_cache=None, stats=None,
+                 retry_base_delay=_RETRY_BASE_DELAY, retry_deadline=_RETRY_DEADLINE):
     """Fetch recent videos from YouTube RSS feeds for all channels.
 
-    Returns a flat list of video dicts within the date window.
+    Requests are limited to `requests_per_second` (default 1 / _REQUEST_DELAY):
+    engine="sequential" fetches one feed at a time, waiting 1 / rate between
+    requests; engine="async" fetches up to `concurrency` feeds at once.
+
+    A failed feed is retried up to _MAX_RETRIES times with jittered exponential
+    backoff starting at `retry_base_delay` seconds (longer if the server sends
+    Retry-After). Retries are interleaved with the remaining fetches rather than
+    holding them up, and any retry that would run more than `retry_deadline`
+    seconds after fetching started is abandoned.
+
+    With a FeedCache, requests are conditional (ETag / Last-Modified) and a 304
+    or an unchanged body reuses the previously parsed entries. Cache counters
+    are written to `stats`.
+
+    Returns a flat list of video dicts within the date window, in channel order.
     """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown RSS fetch engine: {engine}")
     cutoff = datetime.now(timezone.utc) - timedelta(days=days_to_show)
-    all_videos = []
+    rate = requests_per_second or 1 / _REQUEST_DELAY
+    scheduler = RetryScheduler(
+        max_retries=_MAX_RETRIES,
+        base_delay=retry_base_delay,
+        max_delay=_RETRY_MAX_DELAY,
+        deadline=time.monotonic() + retry_deadline,
+    )
 
-    failed_channels = []
+    if engine == "async":
+        results = asyncio.run(_fetch_feeds_async(channels, cutoff, concurrency, rate, feed_cache, scheduler))
+    else:
+        results = _fetch_feeds_sequential(channels, cutoff, feed_cache, scheduler, 1 / rate)
 
-    for i, channel in enumerate(channels):
-        if i > 0:
-            time.sleep(_REQUEST_DELAY)
-        videos = _fetch_channel_feed(channel, cutoff)
+    all_videos = []
+    failed_channels = []
+    for channel, videos in zip(channels, results):
         if videos is not None:
             all_videos.extend(videos)
             logger.info("Fetched %d videos from %s (within %d-day window)",
@@ -42,43 +163,205 @@ def fetch_videos(channels, days_to_show):
         else:
             failed_channels.append(channel)
 
-    # Retry failed channels up to _MAX_RETRIES times
-    for attempt in range(1, _MAX_RETRIES + 1):
-        if not failed_channels:
-            break
-        names = ", ".join(c["channel_name"] for c in failed_channels)
-        logger.info("Retry %d/%d for %d channel(s) in %ds: %s",
-                     attempt, _MAX_RETRIES, len(failed_channels), _RETRY_INTERVAL, names)
-        time.sleep(_RETRY_INTERVAL)
-
-        still_failed = []
-        for channel in failed_channels:
-            videos = _fetch_channel_feed(channel, cutoff)
-            if videos is not None:
-                all_videos.extend(videos)
-                logger.info("Retry succeeded for %s — %d videos", channel["channel_name"], len(videos))
-            else:
-                still_failed.append(channel)
-        failed_channels = still_failed
-
     if failed_channels:
         names = ", ".join(c["channel_name"] for c in failed_channels)
         logger.warning("RSS permanently failed for: %s", names)
 
+    if stats is not None:
+        stats["failedChannels"] = len(failed_channels)
+    if feed_cache:
+        feed_cache.prune(c["channel_id"] for c in channels)
+        feed_cache.save()
+        logger.info("Feed cache: %d not modified, %d unchanged, %d parsed",
+                    feed_cache.not_modified, feed_cache.unchanged, feed_cache.parsed)
+        if stats is not None:
+            stats.update(feed_cache.stats())
+
     return all_videos
 
 
-def _fetch_channel_feed(channel, cutoff):
+def _log_retry(channel, failures, delay):
+    if delay is None:
+        logger.warning("Giving up on RSS for %s after %d failed attempt(s)", channel["channel_name"], failures)
+    else:
+        logger.info("Retry %d/%d for %s in %.0fs", failures, _MAX_RETRIES, channel["channel_name"], delay)
+
+
+def _fetch_feeds_sequential(channels, cutoff, feed_cache, scheduler, request_delay=_REQUEST_DELAY):
+    """Fetch feeds one at a time, running due retries between first attempts.
+
+    Returns a list aligned with channels (videos or None).
+    """
+    results = {}
+
+    def attempt(index, failures):
+        channel = channels[index]
+        videos, retry_after = _fetch_feed_result(channel, cutoff, feed_cache)
+        if videos is not None:
+            results[index] = videos
+            if failures:
+                logger.info("Retry succeeded for %s — %d videos", channel["channel_name"], len(videos))
+        else:
+            _log_retry(channel, failures + 1, scheduler.add(index, failures + 1, retry_after))
+
+    for index in range(len(channels)):
+        if index > 0:
+            time.sleep(request_delay)
+        attempt(index, 0)
+        for retry_index, failures in scheduler.pop_due():
+            time.sleep(request_delay)
+            attempt(retry_index, failures)
+
+    # Only retries are left; wait for each in turn
+    while scheduler:
+        wait, index, failures = scheduler.pop_next()
+        time.sleep(max(wait, request_delay))
+        attempt(index, failures)
+
+    return [results.get(i) for i in range(len(channels))]
+
+
+async def _fetch_feeds_async(channels, cutoff, concurrency, requests_per_second, feed_cache, scheduler):
+    """Fetch feeds concurrently; each failing feed backs off without blocking the others.
+
+    Returns a list aligned with channels (videos or None).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(requests_per_second)
+
+    async with http_client.async_client(concurrency) as client:
+        async def fetch_once(channel):
+            async with semaphore:
+                await asyncio.sleep(bucket.reserve())
+                try:
+                    feed_url = RSS_URL_TEMPLATE.format(channel_id=channel["channel_id"])
+                    headers = _HEADERS
+                    if feed_cache:
+                        headers = {**_HEADERS, **feed_cache.request_headers(channel["channel_id"], cutoff)}
+                    response = await client.get(feed_url, headers=headers)
+                except Exception as e:
+                    logger.warning("Failed to fetch RSS for %s: %s", channel["channel_name"], e)
+                    return None, None
+            # Parse as soon as this feed arrives, outside the concurrency slot
+            videos = _handle_feed_response(
+                channel, response.status_code, response.content, response.headers, cutoff, feed_cache
+            )
+            return videos, _retry_after(response)
+
+        async def fetch_one(channel):
+            failures = 0
+            while True:
+                videos, retry_after = await fetch_once(channel)
+                if videos is not None:
+                    if failures:
+                        logger.info("Retry succeeded for %s — %d videos", channel["channel_name"], len(videos))
+                    return videos
+                failures += 1
+                delay = scheduler.delay_for(failures, retry_after)
+                _log_retry(channel, failures, delay)
+                if delay is None:
+                    return None
+                await asyncio.sleep(delay)
+
+        return await asyncio.gather(*(fetch_one(channel) for channel in channels))
+
+
+def _retry_after(response):
+    """Return the Retry-After delay in seconds for throttling responses, else None."""
+    if response.status_code in (429, 503):
+        return parse_retry_after(response.headers.get("Retry-After"))
+    return None
+
+
+def _fetch_channel_feed(channel, cutoff, feed_cache=None):
     """Fetch a single channel's RSS feed. Returns list of videos or None on failure."""
+    return _fetch_feed_result(channel, cutoff, feed_cache)[0]
+
+
+def _fetch_feed_result(channel, cutoff, feed_cache=None):
+    """Fetch a single channel's RSS feed. Returns (videos or None, retry_after seconds or None)."""
     try:
         feed_url = RSS_URL_TEMPLATE.format(channel_id=channel["channel_id"])
-        response = requests.get(feed_url, headers=_HEADERS, timeout=15)
+        headers = _HEADERS
+        if feed_cache:
+            headers = {**_HEADERS, **feed_cache.request_headers(channel["channel_id"], cutoff)}
+        response = http_client.get(feed_url, headers=headers)
+    except Exception as e:
+        logger.warning("Failed to fetch RSS for %s: %s", channel["channel_name"], e)
+        return None, None
+    videos = _handle_feed_response(
+        channel, response.status_code, response.content, response.headers, cutoff, feed_cache
+    )
+    return videos, _retry_after(response)
+
+
+def _handle_feed_response(channel, status_code, content, response_headers, cutoff, feed_cache=None):
+    """Turn a feed HTTP response into videos within the cutoff, or None on failure.
+
+    A 304, or a 200 whose body hash matches the last parse, reuses the cached
+    entries instead of parsing the feed again.
+    """
+    channel_id = channel["channel_id"]
+    if feed_cache:
+        feed_cache.bytes_downloaded += len(content or b"")
+        if status_code == 304:
+            videos = feed_cache.cached_videos(channel_id, cutoff=cutoff)
+            if videos is not None:
+                feed_cache.not_modified += 1
+                return _within_cutoff(videos, cutoff)
+
+    if status_code != 200:
+        logger.warning("RSS feed HTTP %d for %s", status_code, channel["channel_name"])
+        return None
+
+    if not feed_cache:
+        videos = _parse_feed(channel, content, cutoff)
+        return None if videos is None else _within_cutoff(videos, cutoff)
 
-        if response.status_code != 200:
-            logger.warning("RSS feed HTTP %d for %s", response.status_code, channel["channel_name"])
+    content_hash = hashlib.sha256(content).hexdigest()
+    videos = feed_cache.cached_videos(channel_id, content_hash, cutoff)
+    if videos is not None:
+        feed_cache.unchanged += 1
+        parse_cutoff = feed_cache.parse_cutoff(channel_id)
+    else:
+        videos = _parse_feed(channel, content, cutoff)
+        if videos is None:
             return None
+        feed_cache.parsed += 1
+        parse_cutoff = cutoff
+    feed_cache.store(channel_id, response_headers, content_hash, videos, parse_cutoff)
+    return _within_cutoff(videos, cutoff)
 
-        feed = feedparser.parse(response.content)
+
+def _within_cutoff(videos, cutoff):
+    """Keep only videos published at or after cutoff."""
+    return [
+        v for v in videos
+        if datetime.fromisoformat(v["publishedAt"].replace("Z", "+00:00")) >= cutoff
+    ]
+
+
+def _parse_feed(channel, content, cutoff=None):
+    """Parse a feed into video dicts. Returns None if the feed is unreadable.
+
+    Uses the fast YouTube Atom parser, which stops at the first entry older
+    than `cutoff`; anything it doesn't recognise is re-parsed with feedparser.
+    """
+    try:
+        entries = parse_youtube_feed(content, cutoff)
+    except UnexpectedFeedError as e:
+        logger.debug("Falling back to feedparser for %s: %s", channel["channel_name"], e)
+        return _parse_feed_generic(channel, content)
+    return [
+        _video_record(channel, entry["videoId"], entry["title"], entry["published"], entry["link"])
+        for entry in entries
+    ]
+
+
+def _parse_feed_generic(channel, content):
+    """Parse every entry of a feed with feedparser. Returns None if the feed is unreadable."""
+    try:
+        feed = feedparser.parse(content)
 
         if feed.bozo and not feed.entries:
             logger.warning("Feed parse error for %s: %s", channel["channel_name"], feed.bozo_exception)
@@ -90,12 +373,11 @@ def _fetch_channel_feed(channel, cutoff):
             try:
                 published_dt = datetime.fromisoformat(published_str.replace("Z", "+00:00"))
             except (ValueError, AttributeError):
+                published_dt = None
+            if published_dt is None or published_dt.tzinfo is None:
                 logger.warning("Skipping entry with unparseable date: %s", published_str)
                 continue
 
-            if published_dt < cutoff:
-                continue
-
             entry_id = getattr(entry, "id", None) or ""
             if not entry_id or ":" not in entry_id:
                 logger.warning("Skipping entry with missing/malformed id: %s", entry_id)
@@ -103,19 +385,24 @@ def _fetch_channel_feed(channel, cutoff):
             video_id = entry_id.split(":")[-1]
             if not video_id:
                 continue
-            videos.append({
-                "id": video_id,
-                "title": entry.get("title", "Untitled"),
-                "publishedAt": published_str,
-                "duration": None,  # YouTube RSS doesn't include duration
-                "thumbnailUrl": THUMBNAIL_URL_TEMPLATE.format(video_id=video_id),
-                "videoUrl": entry.get("link", f"https://www.youtube.com/watch?v={video_id}"),
-                "channelName": channel["channel_name"],
-                "channelUrl": channel["url"],
-            })
+            videos.append(_video_record(channel, video_id, entry.get("title"), published_str, entry.get("link")))
 
         return videos
 
     except Exception as e:
-        logger.warning("Failed to fetch RSS for %s: %s", channel["channel_name"], e)
+        logger.warning("Failed to parse RSS for %s: %s", channel["channel_name"], e)
         return None
+
+
+def _video_record(channel, video_id, title, published, link):
+    """Build the pipeline's video record for one feed entry."""
+    return Video(
+        id=video_id,
+        title="Untitled" if title is None else title,
+        publishedAt=published,
+        duration=None,  # YouTube RSS doesn't include duration
+        thumbnailUrl=THUMBNAIL_URL_TEMPLATE.format(video_id=video_id),
+        videoUrl=f"https://www.youtube.com/watch?v={video_id}" if link is None else link,
+        channelName=channel["channel_name"],
+        channelUrl=channel["url"],
+    )
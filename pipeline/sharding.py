@@ -0,0 +1,89 @@
+"""Deterministic channel sharding and partial-result files for sharded ingestion."""
+
+import copy
+import hashlib
+import logging
+import os
+
+from pipeline import config_loader
+from pipeline.state_file import load_state, save_state
+from pipeline.video import Video
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_REQUESTS_PER_SECOND = 1  # resolver and RSS rate when the config sets none
+
+
+def shard_of(channel_url, shard_count):
+    """Return the shard index for a channel URL.
+
+    Uses a content hash rather than hash() so the assignment is identical
+    across processes, runs and machines, keeping per-shard caches warm.
+    """
+    digest = hashlib.sha1(channel_url.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def partition(channel_urls, shard_count):
+    """Split channel URLs into shard_count lists, preserving config order within each."""
+    shards = [[] for _ in range(shard_count)]
+    for url in channel_urls:
+        shards[shard_of(url, shard_count)].append(url)
+    return shards
+
+
+def shard_config(config, shard_index, shard_count):
+    """Return a copy of config restricted to one shard, with its own cache directory.
+
+    The resolver and RSS request rates are divided by shard_count, so the
+    shards together stay within the configured per-host rate.
+    """
+    sharded = copy.deepcopy(config)
+    sharded["channels"] = partition(config["channels"], shard_count)[shard_index]
+    cache_dir = config.get("cache", {}).get("dir", config_loader.DEFAULT_CACHE_DIR)
+    sharded.setdefault("cache", {})["dir"] = os.path.join(cache_dir, f"shard-{shard_index}-of-{shard_count}")
+    for section in ("resolver", "rss"):
+        section_config = sharded.setdefault(section, {})
+        rate = section_config.get("requestsPerSecond") or _DEFAULT_REQUESTS_PER_SECOND
+        section_config["requestsPerSecond"] = rate / shard_count
+    return sharded
+
+
+def shard_result_path(shard_dir, shard_index, shard_count):
+    return os.path.join(shard_dir, f"part-{shard_index}-of-{shard_count}.json")
+
+
+def write_shard_result(shard_dir, shard_index, shard_count, channel_urls, resolved_count, videos, status):
+    """Write one shard's ingestion output (resolved channel count, videos, status)."""
+    path = shard_result_path(shard_dir, shard_index, shard_count)
+    save_state({
+        "shardIndex": shard_index,
+        "shardCount": shard_count,
+        "channels": channel_urls,
+        "resolvedChannels": resolved_count,
+        "videos": videos,
+        "status": status,
+    }, path)
+    logger.info("Wrote shard %d/%d result: %d videos -> %s", shard_index + 1, shard_count, len(videos), path)
+    return path
+
+
+def load_shard_results(shard_dir, shard_count, channel_urls):
+    """Load every shard's partial result for the given config channels.
+
+    Each result's "videos" are returned as Video records. Raises ValueError
+    if a shard file is missing or was produced for a different channel list,
+    so a merge never runs on incomplete input.
+    """
+    expected = partition(channel_urls, shard_count)
+    results = []
+    for index in range(shard_count):
+        path = shard_result_path(shard_dir, index, shard_count)
+        result = load_state(path)
+        if not result:
+            raise ValueError(f"Missing shard result {path}")
+        if result.get("channels") != expected[index]:
+            raise ValueError(f"Shard result {path} does not match the configured channels")
+        result["videos"] = [Video(v) for v in result.get("videos", [])]
+        results.append(result)
+    return results
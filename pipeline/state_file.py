@@ -0,0 +1,37 @@
+"""Load and save small JSON state files kept between pipeline runs."""
+
+import json
+import logging
+import os
+import tempfile
+
+from pipeline.video import to_json
+
+logger = logging.getLogger(__name__)
+
+
+def load_state(path, default=None):
+    """Load a JSON state file. Returns `default` (or {}) if missing or invalid."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning("Ignoring unreadable state file %s: %s", path, e)
+    return {} if default is None else default
+
+
+def save_state(data, path):
+    """Write a JSON state file atomically, creating its directory if needed."""
+    dir_name = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dir_name, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=dir_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"), default=to_json)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -1,11 +1,15 @@
 """AI summarization via Gemini Flash for video transcripts and daily digests."""
 
+import json
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from google import genai
 
+from pipeline.gemini_executor import CHARS_PER_TOKEN, estimate_tokens
+
 logger = logging.getLogger(__name__)
 
 VIDEO_SUMMARY_PROMPT = (
@@ -13,12 +17,51 @@ VIDEO_SUMMARY_PROMPT = (
     "Use \u2022 as bullet character. Be concise.\n\nTranscript:\n{transcript}"
 )
 
+BATCH_SUMMARY_PROMPT = (
+    "Summarize each of the following YouTube video transcripts as 3-5 bullet points of key takeaways. "
+    "Use \u2022 as bullet character. Be concise.\n"
+    "Respond with a JSON array containing one object per video, in the form "
+    '{{"videoId": "<id>", "summary": "<bullet points>"}}. '
+    "Use the video IDs exactly as given.\n\n{transcripts}"
+)
+
+BATCH_ENTRY_TEMPLATE = "=== Video {video_id} ===\n{transcript}\n"
+
+CHUNK_SUMMARY_PROMPT = (
+    "This is part {part} of {parts} of a long YouTube video transcript. "
+    "Summarize the key points of this part as concise bullet points. "
+    "Use \u2022 as bullet character.\n\nTranscript part:\n{transcript}"
+)
+
+REDUCE_SUMMARY_PROMPT = (
+    "These are summaries of consecutive parts of one long YouTube video. "
+    "Combine them into 3-5 bullet points of key takeaways for the whole video. "
+    "Use \u2022 as bullet character. Be concise.\n\n{summaries}"
+)
+
 DAILY_DIGEST_PROMPT = (
     "Write a brief 2-3 sentence news roundup for {day_date} based on these AI video summaries:\n\n{summaries}"
 )
 
+DIGEST_UPDATE_PROMPT = (
+    "Here is the current 2-3 sentence news roundup for {day_date}:\n\n{digest}\n\n"
+    "Rewrite it as a brief 2-3 sentence roundup that also covers these new AI video summaries:\n\n{summaries}"
+)
+
 FAILURE_MESSAGE = "Summary generation failed \u2014 will retry next run."
 
+# Cache template for per-video summaries: they can come from any of these prompts
+_SUMMARY_TEMPLATES = (VIDEO_SUMMARY_PROMPT + BATCH_SUMMARY_PROMPT + BATCH_ENTRY_TEMPLATE
+                      + CHUNK_SUMMARY_PROMPT + REDUCE_SUMMARY_PROMPT)
+
+DEFAULT_BATCH_TOKENS = 60_000  # transcript tokens packed into one batch request
+DEFAULT_BATCH_SIZE = 10  # videos per batch request
+DEFAULT_LONG_TRANSCRIPT_TOKENS = 30_000  # longer transcripts are summarized with map-reduce
+DEFAULT_CHUNK_TOKENS = 8_000  # transcript tokens per map-reduce chunk
+DEFAULT_CHUNK_OVERLAP_TOKENS = 200  # context repeated at the start of the next chunk
+DEFAULT_WORKERS = 4  # concurrent chunk requests when no executor is given
+_JSON_CONFIG = {"response_mime_type": "application/json"}
+
 
 def init_client(config):
     """Create and return a Gemini API client."""
@@ -32,34 +75,274 @@ def init_client(config):
     return genai.Client(api_key=api_key)
 
 
-def summarize_video(client, model, transcript):
+def summarize_video(client, model, transcript, cache=None):
     """Generate a bullet-point summary of a video transcript.
 
     Retries up to 3 times with exponential backoff (5s, 10s, 20s).
-    Returns fallback message on final failure.
+    Returns fallback message on final failure. With a SummaryCache, a
+    transcript already summarized by the same model and prompt is not
+    sent again.
     """
+    if cache:
+        cached = cache.get(model, _SUMMARY_TEMPLATES, transcript)
+        if cached is not None:
+            return cached
     prompt = VIDEO_SUMMARY_PROMPT.format(transcript=transcript)
-    return _call_with_retry(client, model, prompt)
+    summary = _call_with_retry(client, model, prompt)
+    if cache and summary != FAILURE_MESSAGE:
+        cache.put(model, _SUMMARY_TEMPLATES, transcript, summary)
+    return summary
+
+
+def summarize_videos(client, model, videos, max_batch_tokens=DEFAULT_BATCH_TOKENS,
+                     max_batch_size=DEFAULT_BATCH_SIZE, stats=None, executor=None, cache=None,
+                     long_transcript_tokens=DEFAULT_LONG_TRANSCRIPT_TOKENS,
+                     chunk_tokens=DEFAULT_CHUNK_TOKENS, workers=DEFAULT_WORKERS):
+    """Summarize many transcripts with as few Gemini requests as possible.
+
+    `videos` is a list of dicts with 'id' and 'transcript'. Transcripts are
+    packed into batches of up to max_batch_tokens (estimated) and
+    max_batch_size videos, and each batch asks for a JSON array of
+    {"videoId", "summary"} objects. Videos missing or malformed in a batch
+    response are then summarized individually. Transcripts longer than
+    long_transcript_tokens are summarized with map-reduce instead (see
+    summarize_long_transcript). With a GeminiExecutor the requests of each
+    phase run concurrently within its quotas, otherwise on `workers`
+    threads; with a SummaryCache, cached transcripts are not sent at all.
+
+    Returns {video_id: summary}; failed videos get FAILURE_MESSAGE.
+    """
+    summaries = {}
+    if cache:
+        for video in videos:
+            cached = cache.get(model, _SUMMARY_TEMPLATES, video["transcript"])
+            if cached is not None:
+                summaries[video["id"]] = cached
+    to_summarize = [v for v in videos if v["id"] not in summaries]
+    long_videos = [v for v in to_summarize if estimate_tokens(v["transcript"]) > long_transcript_tokens]
+    long_ids = {v["id"] for v in long_videos}
+
+    batches = _pack_batches([v for v in to_summarize if v["id"] not in long_ids], max_batch_tokens, max_batch_size)
+    multi = [batch for batch in batches if len(batch) > 1]
+    individual = [batch[0] for batch in batches if len(batch) == 1]
+    counts = {"videos": len(videos), "cached": len(summaries), "batches": len(batches),
+              "longTranscripts": len(long_videos), "requests": 0, "fallbacks": 0}
+
+    if long_videos:
+        long_summaries, long_requests = _map_reduce(client, model, long_videos, chunk_tokens,
+                                                    DEFAULT_CHUNK_OVERLAP_TOKENS, executor, workers)
+        summaries.update(long_summaries)
+        counts["requests"] += long_requests
+
+    prompts = [
+        BATCH_SUMMARY_PROMPT.format(transcripts="\n".join(
+            BATCH_ENTRY_TEMPLATE.format(video_id=v["id"], transcript=v["transcript"]) for v in batch
+        ))
+        for batch in multi
+    ]
+    for batch, text in zip(multi, _generate_all(client, model, prompts, _JSON_CONFIG, executor, workers)):
+        if text == FAILURE_MESSAGE:
+            for video in batch:
+                summaries[video["id"]] = FAILURE_MESSAGE
+            continue
+        parsed = _parse_batch_response(text, {v["id"] for v in batch})
+        summaries.update(parsed)
+        missing = [v for v in batch if v["id"] not in parsed]
+        if missing:
+            logger.warning("Batch response missing %d of %d summaries; retrying individually",
+                           len(missing), len(batch))
+            counts["fallbacks"] += len(missing)
+            individual.extend(missing)
+
+    prompts_individual = [VIDEO_SUMMARY_PROMPT.format(transcript=v["transcript"]) for v in individual]
+    for video, text in zip(individual, _generate_all(client, model, prompts_individual, None, executor, workers)):
+        summaries[video["id"]] = text
+
+    if cache:
+        for video in to_summarize:
+            if summaries[video["id"]] != FAILURE_MESSAGE:
+                cache.put(model, _SUMMARY_TEMPLATES, video["transcript"], summaries[video["id"]])
+
+    counts["requests"] += len(prompts) + len(prompts_individual)
+    logger.info("Summarized %d videos in %d requests", len(videos), counts["requests"])
+    if stats is not None:
+        stats.update(counts)
+    return summaries
+
 
+def summarize_long_transcript(client, model, transcript, chunk_tokens=DEFAULT_CHUNK_TOKENS,
+                              overlap_tokens=DEFAULT_CHUNK_OVERLAP_TOKENS, executor=None,
+                              workers=DEFAULT_WORKERS):
+    """Summarize a transcript too long for one prompt with map-reduce.
 
-def generate_daily_digest(client, model, day_date, video_summaries):
+    The transcript is split into overlapping chunks of about chunk_tokens,
+    the chunks are summarized concurrently, and the partial summaries are
+    reduced into the final 3-5 bullets. Returns FAILURE_MESSAGE if any
+    step fails, so the video is retried next run.
+    """
+    video = {"id": "transcript", "transcript": transcript}
+    summaries, _ = _map_reduce(client, model, [video], chunk_tokens, overlap_tokens, executor, workers)
+    return summaries["transcript"]
+
+
+def split_transcript(transcript, chunk_tokens, overlap_tokens=DEFAULT_CHUNK_OVERLAP_TOKENS):
+    """Split text into chunks of about chunk_tokens, each starting overlap_tokens early.
+
+    Chunk boundaries are moved back to the nearest whitespace so words are
+    not cut in half.
+    """
+    chunk_chars = chunk_tokens * CHARS_PER_TOKEN
+    overlap_chars = min(overlap_tokens * CHARS_PER_TOKEN, chunk_chars // 2)
+    chunks = []
+    start = 0
+    while start < len(transcript):
+        end = min(len(transcript), start + chunk_chars)
+        if end < len(transcript):
+            space = transcript.rfind(" ", start + overlap_chars + 1, end)
+            if space != -1:
+                end = space
+        chunks.append(transcript[start:end].strip())
+        if end == len(transcript):
+            break
+        next_start = transcript.rfind(" ", start + 1, end - overlap_chars + 1)
+        start = next_start + 1 if next_start > start else end - overlap_chars
+    return chunks
+
+
+def _map_reduce(client, model, videos, chunk_tokens, overlap_tokens, executor, workers):
+    """Map-reduce summaries for several long videos. Returns ({id: summary}, request count)."""
+    chunked = [(video, split_transcript(video["transcript"], chunk_tokens, overlap_tokens)) for video in videos]
+    chunk_prompts = [
+        CHUNK_SUMMARY_PROMPT.format(part=i, parts=len(chunks), transcript=chunk)
+        for _, chunks in chunked
+        for i, chunk in enumerate(chunks, 1)
+    ]
+    partials = iter(_generate_all(client, model, chunk_prompts, None, executor, workers))
+
+    summaries = {}
+    reducible = []
+    for video, chunks in chunked:
+        parts = [next(partials) for _ in chunks]
+        if FAILURE_MESSAGE in parts:
+            logger.warning("Chunk summaries failed for %s; skipping reduce step", video["id"])
+            summaries[video["id"]] = FAILURE_MESSAGE
+        else:
+            reducible.append((video, parts))
+
+    reduce_prompts = [
+        REDUCE_SUMMARY_PROMPT.format(summaries="\n\n".join(
+            f"Part {i}:\n{part}" for i, part in enumerate(parts, 1)
+        ))
+        for _, parts in reducible
+    ]
+    for (video, _), text in zip(reducible, _generate_all(client, model, reduce_prompts, None, executor, workers)):
+        summaries[video["id"]] = text
+    return summaries, len(chunk_prompts) + len(reduce_prompts)
+
+
+def _generate_all(client, model, prompts, config, executor, workers=1):
+    """Return one response text per prompt, FAILURE_MESSAGE for failed calls."""
+    if executor:
+        return [text if text is not None else FAILURE_MESSAGE for text in executor.map(prompts, config)]
+    if workers > 1 and len(prompts) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda prompt: _call_with_retry(client, model, prompt, config=config), prompts))
+    return [_call_with_retry(client, model, prompt, config=config) for prompt in prompts]
+
+
+def _pack_batches(videos, max_tokens, max_size):
+    """Greedily group videos, in order, into batches within the token and size limits."""
+    batches = []
+    current, current_tokens = [], 0
+    for video in videos:
+        tokens = estimate_tokens(video["transcript"])
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(video)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch_response(text, expected_ids):
+    """Return {video_id: summary} for the well-formed entries of a batch JSON response."""
+    try:
+        items = json.loads(text)
+    except (TypeError, ValueError) as e:
+        logger.warning("Batch summary response is not valid JSON: %s", e)
+        return {}
+    if isinstance(items, dict):
+        items = items.get("summaries", items.get("videos", []))
+    if not isinstance(items, list):
+        return {}
+
+    parsed = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        video_id, summary = item.get("videoId"), item.get("summary")
+        if video_id in expected_ids and isinstance(summary, str) and summary.strip():
+            parsed[video_id] = summary.strip()
+    return parsed
+
+
+def generate_daily_digest(client, model, day_date, video_summaries, cache=None, executor=None):
     """Generate a brief daily news roundup from video summaries.
 
-    Retries up to 3 times with exponential backoff.
-    Returns fallback message on final failure.
+    Retries up to 3 times with exponential backoff, or through the
+    GeminiExecutor's quotas if one is given. Returns fallback message on
+    final failure. Cached like summarize_video().
     """
     joined = "\n\n".join(video_summaries)
+    digest_input = f"{day_date}\n{joined}"
+    if cache:
+        cached = cache.get(model, DAILY_DIGEST_PROMPT, digest_input)
+        if cached is not None:
+            return cached
     prompt = DAILY_DIGEST_PROMPT.format(day_date=day_date, summaries=joined)
+    digest = _generate_one(client, model, prompt, executor)
+    if cache and digest != FAILURE_MESSAGE:
+        cache.put(model, DAILY_DIGEST_PROMPT, digest_input, digest)
+    return digest
+
+
+def update_daily_digest(client, model, day_date, previous_digest, new_summaries, cache=None, executor=None):
+    """Update an existing daily roundup with summaries of newly added videos.
+
+    Sends only the previous digest and the new summaries instead of every
+    summary of the day. Returns fallback message on final failure.
+    """
+    joined = "\n\n".join(new_summaries)
+    digest_input = f"{day_date}\n{previous_digest}\n{joined}"
+    if cache:
+        cached = cache.get(model, DIGEST_UPDATE_PROMPT, digest_input)
+        if cached is not None:
+            return cached
+    prompt = DIGEST_UPDATE_PROMPT.format(day_date=day_date, digest=previous_digest, summaries=joined)
+    digest = _generate_one(client, model, prompt, executor)
+    if cache and digest != FAILURE_MESSAGE:
+        cache.put(model, DIGEST_UPDATE_PROMPT, digest_input, digest)
+    return digest
+
+
+def _generate_one(client, model, prompt, executor=None):
+    """Generate one prompt through the executor if given, else with _call_with_retry."""
+    if executor:
+        text = executor.generate(prompt)
+        return text if text is not None else FAILURE_MESSAGE
     return _call_with_retry(client, model, prompt)
 
 
-def _call_with_retry(client, model, prompt, max_retries=3):
+def _call_with_retry(client, model, prompt, max_retries=3, config=None):
     """Call Gemini API with exponential backoff retry."""
     delays = [5, 10, 20]
+    kwargs = {"config": config} if config else {}
 
     for attempt in range(1, max_retries + 1):
         try:
-            response = client.models.generate_content(model=model, contents=prompt)
+            response = client.models.generate_content(model=model, contents=prompt, **kwargs)
             return response.text
         except Exception as e:
             logger.warning("Gemini API attempt %d/%d failed: %s", attempt, max_retries, e)
@@ -0,0 +1,96 @@
+"""Persistent cache of LLM outputs keyed by model, prompt template and input."""
+
+import hashlib
+import logging
+import threading
+import time
+
+from pipeline.state_file import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_DAYS = 90
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """File-backed cache of generated text.
+
+    The key is a hash of (model name, prompt template hash, input hash), so
+    changing the model or the template invalidates old entries without any
+    bookkeeping. Entries are stored as {key: {"text", "storedAt", "lastUsed"}};
+    prune() drops entries older than max_age_days, then the least recently
+    used ones beyond max_entries.
+    """
+
+    def __init__(self, path, max_age_days=DEFAULT_MAX_AGE_DAYS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_age_seconds = max_age_days * 86400
+        self.max_entries = max_entries
+        self.entries = load_state(path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model, template, input_text):
+        return _sha256("\0".join((model, _sha256(template), _sha256(input_text))))
+
+    def get(self, model, template, input_text):
+        """Return the cached output, or None if missing or expired."""
+        key = self.key(model, template, input_text)
+        now = int(time.time())
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and now - entry.get("storedAt", 0) < self.max_age_seconds:
+                entry["lastUsed"] = now
+                self.hits += 1
+                return entry["text"]
+            self.misses += 1
+            return None
+
+    def put(self, model, template, input_text, text):
+        now = int(time.time())
+        with self._lock:
+            self.entries[self.key(model, template, input_text)] = {
+                "text": text, "storedAt": now, "lastUsed": now,
+            }
+
+    def prune(self):
+        """Drop expired entries, then least recently used ones over max_entries."""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, e in self.entries.items() if now - e.get("storedAt", 0) >= self.max_age_seconds]
+            for key in expired:
+                del self.entries[key]
+            excess = len(self.entries) - self.max_entries
+            if excess > 0:
+                by_use = sorted(self.entries, key=lambda k: self.entries[k].get("lastUsed", 0))
+                for key in by_use[:excess]:
+                    del self.entries[key]
+            removed = len(expired) + max(0, excess)
+        if removed:
+            logger.info("Removed %d summary cache entries", removed)
+
+    def stats(self):
+        """Return hits, misses, hit rate and entry count; each hit is one saved API call."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "savedCalls": self.hits,
+            "entries": len(self.entries),
+        }
+
+    def save(self):
+        self.prune()
+        with self._lock:
+            try:
+                save_state(self.entries, self.path)
+            except OSError as e:
+                logger.warning("Could not save summary cache %s: %s", self.path, e)
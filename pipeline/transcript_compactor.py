@@ -0,0 +1,86 @@
+"""Shrink transcripts before summarization without changing what they say."""
+
+import logging
+import re
+
+from pipeline.gemini_executor import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# [Music], [Applause], (laughter), ♪ lyrics ♪ and similar caption annotations
+_ANNOTATION_PATTERN = re.compile(
+    r"\[[^\]]{0,40}\]|\((?:music|applause|laughter|laughs|inaudible|silence)[^)]{0,20}\)|♪[^♪]{0,200}♪|♪",
+    re.IGNORECASE,
+)
+_FILLER_WORDS = {"um", "umm", "uh", "uhh", "uh-huh", "erm", "er", "ah", "hmm", "mm", "mhm"}
+_MAX_REPEAT_WORDS = 40  # longest repeated run (rolling caption overlap) that is collapsed
+_TRIM_MARKER = " … "
+_TRIM_HEAD_SHARE = 0.75  # share of a trimmed transcript kept from the start; the rest from the end
+
+
+def _drop_repeats(words):
+    """Collapse immediately repeated runs of 2+ words ("a b c a b c" -> "a b c").
+
+    Words are compared case- and punctuation-insensitively, so a rolling
+    caption "Hello everyone." still matches "hello everyone".
+    """
+    out, keys = [], []
+    for word in words:
+        out.append(word)
+        keys.append(_normalize(word))
+        # Only runs ending at the new word can have just become repeats
+        for length in range(2, min(_MAX_REPEAT_WORDS, len(keys) // 2) + 1):
+            if keys[-length] == keys[-2 * length] and keys[-length:] == keys[-2 * length:-length]:
+                del out[-length:]
+                del keys[-length:]
+                break
+    return out
+
+
+def _normalize(word):
+    return word.strip(".,!?;:").lower()
+
+
+def trim_to_tokens(text, max_tokens):
+    """Cut text to about max_tokens on word boundaries, keeping its start and its end."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    head_chars = int(max_chars * _TRIM_HEAD_SHARE)
+    tail_chars = max_chars - head_chars - len(_TRIM_MARKER)
+    head = text[:head_chars].rsplit(" ", 1)[0]
+    tail = text[-tail_chars:].split(" ", 1)[-1] if tail_chars > 0 else ""
+    return head + _TRIM_MARKER + tail
+
+
+def compact_transcript(text, max_tokens=None):
+    """Return text without caption annotations, filler words and rolling-caption repeats.
+
+    With max_tokens, the result is then trimmed to about that many tokens.
+    """
+    text = _ANNOTATION_PATTERN.sub(" ", text)
+    words = [w for w in text.split() if _normalize(w) not in _FILLER_WORDS]
+    compacted = " ".join(_drop_repeats(words))
+    if max_tokens:
+        compacted = trim_to_tokens(compacted, max_tokens)
+    return compacted
+
+
+def compact_videos(videos, max_tokens=None, stats=None):
+    """Compact the 'transcript' of every video that has one, in place.
+
+    stats receives the characters before and after and their ratio.
+    """
+    chars_in = chars_out = 0
+    for video in videos:
+        if not video.get("transcript"):
+            continue
+        chars_in += len(video["transcript"])
+        video["transcript"] = compact_transcript(video["transcript"], max_tokens)
+        chars_out += len(video["transcript"])
+
+    ratio = round(chars_out / chars_in, 3) if chars_in else 1.0
+    logger.info("Compacted transcripts from %d to %d characters (%.0f%%)", chars_in, chars_out, ratio * 100)
+    if stats is not None:
+        stats.update({"charsIn": chars_in, "charsOut": chars_out, "ratio": ratio})
+    return videos
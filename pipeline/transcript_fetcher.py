@@ -2,7 +2,9 @@
 
 import logging
 import os
+import threading
 import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
 
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
@@ -13,6 +15,8 @@ from youtube_transcript_api._errors import (
 )
 from youtube_transcript_api.proxies import GenericProxyConfig
 
+from pipeline import http_client
+
 logger = logging.getLogger(__name__)
 
 # Transient errors worth retrying from the same IP
@@ -28,80 +32,170 @@ RETRIABLE_EXCEPTIONS = (
 # IP-level blocks — retrying from same IP won't help
 IP_BLOCKED_EXCEPTIONS = (RequestBlocked,)
 
+TRANSCRIPT_LANGUAGE = "en"  # youtube-transcript-api's default fetch language
+
 
-def _build_api():
-    """Build YouTubeTranscriptApi with optional proxy from env."""
-    proxy_url = os.environ.get("YOUTUBE_PROXY")
+def _build_api(proxy_url=None):
+    """Build YouTubeTranscriptApi through `proxy_url`, or the YOUTUBE_PROXY env var."""
+    proxy_url = proxy_url or os.environ.get("YOUTUBE_PROXY")
     if proxy_url:
         logger.info("Using proxy for transcript fetching")
         return YouTubeTranscriptApi(
             proxy_config=GenericProxyConfig(
                 http_url=proxy_url,
                 https_url=proxy_url,
-            )
+            ),
+            http_client=http_client.new_session(),
         )
-    return YouTubeTranscriptApi()
+    return YouTubeTranscriptApi(http_client=http_client.new_session())
 
 
-def fetch_transcripts(videos, max_retries=3, retry_delay=2):
+def fetch_transcripts(videos, max_retries=3, retry_delay=2, workers=1, store=None, proxy_pool=None):
     """Fetch transcripts for a list of videos with retry logic.
 
     Args:
         videos: List of video dicts (must have 'id' key).
         max_retries: Number of retry attempts per video.
         retry_delay: Seconds between retries.
+        workers: Number of videos fetched in parallel. An IP block seen by any
+            worker trips a shared circuit breaker that cancels queued videos.
+        store: Optional TranscriptStore. Stored transcripts are used without
+            any network request, and newly fetched ones are added to it.
+        proxy_pool: Optional ProxyPool. Each request goes through the pool's
+            best proxy and a blocked proxy is rotated out; the breaker only
+            trips once every proxy is cooling down.
 
     Returns:
         Updated video list with 'transcript' and 'transcriptAvailable' fields.
     """
-    api = _build_api()
-    ip_blocked = False
-
-    for video in videos:
-        video_id = video["id"]
-
-        # If already IP-blocked, skip remaining transcript fetches
-        if ip_blocked:
-            video["transcript"] = None
-            video["transcriptAvailable"] = False
-            continue
-
-        success = False
-
-        for attempt in range(1, max_retries + 1):
-            try:
-                transcript = api.fetch(video_id)
-                full_text = " ".join([snippet.text for snippet in transcript.snippets])
-                video["transcript"] = full_text
+    ip_blocked = threading.Event()
+
+    to_fetch = videos
+    if store:
+        stored = store.get_many([v["id"] for v in videos], TRANSCRIPT_LANGUAGE)
+        for video in videos:
+            if video["id"] in stored:
+                video["transcript"] = stored[video["id"]]
                 video["transcriptAvailable"] = True
-                success = True
-                logger.info("Transcript fetched for %s", video_id)
-                break
-            except IP_BLOCKED_EXCEPTIONS as e:
-                logger.warning(
-                    "YouTube IP blocked — skipping all remaining transcripts. "
-                    "Set YOUTUBE_PROXY env var to use a proxy. Error: %s", type(e).__name__
-                )
-                ip_blocked = True
-                break
-            except RETRIABLE_EXCEPTIONS as e:
-                logger.warning(
-                    "Transcript fetch attempt %d/%d failed for %s: %s",
-                    attempt, max_retries, video_id, e
-                )
-                if attempt < max_retries:
-                    time.sleep(retry_delay)
+        to_fetch = [v for v in videos if v["id"] not in stored]
+        logger.info("Transcript store: %d/%d already stored", len(stored), len(videos))
+        if not to_fetch:
+            store.save()
+            return videos
+
+    if workers <= 1:
+        apis = {}
+        for video in to_fetch:
+            _fetch_one(apis, video, max_retries, retry_delay, ip_blocked, store, proxy_pool)
+    else:
+        local = threading.local()
+
+        def worker(video):
+            # YouTubeTranscriptApi is not thread-safe: one instance per thread
+            if not hasattr(local, "apis"):
+                local.apis = {}
+            _fetch_one(local.apis, video, max_retries, retry_delay, ip_blocked, store, proxy_pool)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(worker, video): video for video in to_fetch}
+            for future in as_completed(futures):
+                if ip_blocked.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        # The pool has shut down, so every future has finished or was cancelled
+        for future, video in futures.items():
+            try:
+                future.result()
+            except CancelledError:  # cancelled by the breaker before it started
+                _mark_unavailable(video)
             except Exception as e:
-                # Non-retriable error (programming bug, unexpected API change)
-                logger.error("Non-retriable transcript error for %s: %s", video_id, e)
-                break
+                logger.error("Transcript worker failed for %s: %s", video["id"], e)
+                _mark_unavailable(video)
 
-        if not success:
-            video["transcript"] = None
-            video["transcriptAvailable"] = False
-            logger.warning("Transcript unavailable for %s", video_id)
+    if store:
+        store.save()
 
     fetched = sum(1 for v in videos if v.get("transcriptAvailable"))
     logger.info("Transcripts: %d/%d fetched successfully", fetched, len(videos))
+    if proxy_pool:
+        for proxy, proxy_stats in proxy_pool.stats().items():
+            logger.info("Proxy %s: %s", proxy, proxy_stats)
 
     return videos
+
+
+def _mark_unavailable(video):
+    video["transcript"] = None
+    video["transcriptAvailable"] = False
+
+
+def _fetch_one(apis, video, max_retries, retry_delay, ip_blocked, store=None, proxy_pool=None):
+    """Fetch one video's transcript, setting 'transcript' and 'transcriptAvailable'.
+
+    `apis` caches this thread's YouTubeTranscriptApi per proxy URL.
+    """
+    video_id = video["id"]
+    attempt = 0
+    rotations = 0
+
+    while attempt < max_retries:
+        # If already IP-blocked, skip remaining transcript fetches
+        if ip_blocked.is_set():
+            break
+        proxy = proxy_pool.acquire() if proxy_pool else None
+        if proxy_pool and proxy is None:
+            _trip_breaker(ip_blocked, "every proxy is cooling down")
+            break
+        if proxy not in apis:
+            apis[proxy] = _build_api(proxy) if proxy else _build_api()
+
+        attempt += 1
+        started = time.monotonic()
+        try:
+            transcript = apis[proxy].fetch(video_id)
+            full_text = " ".join([snippet.text for snippet in transcript.snippets])
+            video["transcript"] = full_text
+            video["transcriptAvailable"] = True
+            logger.info("Transcript fetched for %s", video_id)
+            if proxy_pool:
+                proxy_pool.report_success(proxy, time.monotonic() - started)
+            if store:
+                store.put(video_id, full_text, TRANSCRIPT_LANGUAGE)
+            return
+        except IP_BLOCKED_EXCEPTIONS as e:
+            if proxy_pool:
+                proxy_pool.report_failure(proxy, blocked=True)
+                if rotations < len(proxy_pool):
+                    # Rotate to another proxy without spending a retry
+                    rotations += 1
+                    attempt -= 1
+                    continue
+            _trip_breaker(ip_blocked, type(e).__name__)
+            break
+        except RETRIABLE_EXCEPTIONS as e:
+            logger.warning(
+                "Transcript fetch attempt %d/%d failed for %s: %s",
+                attempt, max_retries, video_id, e
+            )
+            if proxy_pool:
+                proxy_pool.report_failure(proxy)
+            if attempt < max_retries and not ip_blocked.is_set():
+                time.sleep(retry_delay)
+        except Exception as e:
+            # Non-retriable error (programming bug, unexpected API change)
+            logger.error("Non-retriable transcript error for %s: %s", video_id, e)
+            break
+
+    _mark_unavailable(video)
+    logger.warning("Transcript unavailable for %s", video_id)
+
+
+def _trip_breaker(ip_blocked, reason):
+    if not ip_blocked.is_set():
+        ip_blocked.set()
+        logger.warning(
+            "YouTube IP blocked — skipping all remaining transcripts. "
+            "Set YOUTUBE_PROXY or YOUTUBE_PROXIES to use proxies. Reason: %s", reason
+        )
@@ -0,0 +1,131 @@
+"""Compressed, content-addressed local store for fetched video transcripts."""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+
+from pipeline.state_file import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # compressed bytes kept on disk
+_INDEX_FILE = "index.json"
+
+
+class TranscriptStore:
+    """Transcripts on disk, keyed by (video ID, language), with LRU eviction.
+
+    Blobs are zlib-compressed and named by the SHA-256 of the transcript
+    text, so identical transcripts share one file. index.json maps
+    "videoId:lang" to {"hash", "size", "lastUsed"}; when the total compressed
+    size exceeds max_bytes, the least recently used entries are evicted.
+    Safe to share between transcript worker threads.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index = load_state(os.path.join(root, _INDEX_FILE))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(video_id, lang):
+        return f"{video_id}:{lang}"
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.root, content_hash[:2], content_hash + ".z")
+
+    def get(self, video_id, lang="en"):
+        """Return the stored transcript text, or None."""
+        return self.get_many([video_id], lang).get(video_id)
+
+    def get_many(self, video_ids, lang="en"):
+        """Bulk lookup. Returns {video_id: transcript} for the IDs that are stored."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for video_id in video_ids:
+                key = self._key(video_id, lang)
+                entry = self.index.get(key)
+                text = self._read_blob(entry["hash"]) if entry else None
+                if text is None:
+                    if entry:
+                        del self.index[key]
+                    self.misses += 1
+                    continue
+                entry["lastUsed"] = now
+                found[video_id] = text
+                self.hits += 1
+        return found
+
+    def put(self, video_id, text, lang="en"):
+        """Store a transcript, evicting least recently used entries if over the size cap.
+
+        A blob that cannot be written is logged and skipped; the transcript
+        is then fetched again next time.
+        """
+        data = text.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(content_hash)
+        with self._lock:
+            try:
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "wb") as f:
+                        f.write(zlib.compress(data, 6))
+                size = os.path.getsize(path)
+            except OSError as e:
+                logger.warning("Could not store transcript for %s: %s", video_id, e)
+                return
+            self.index[self._key(video_id, lang)] = {
+                "hash": content_hash,
+                "size": size,
+                "lastUsed": time.time(),
+            }
+            self._evict()
+
+    def save(self):
+        """Persist the index (blobs are written on put)."""
+        with self._lock:
+            try:
+                save_state(self.index, os.path.join(self.root, _INDEX_FILE))
+            except OSError as e:
+                logger.warning("Could not save transcript store index: %s", e)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.index)}
+
+    def _read_blob(self, content_hash):
+        try:
+            with open(self._blob_path(content_hash), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error) as e:
+            logger.warning("Dropping unreadable transcript blob %s: %s", content_hash, e)
+            return None
+
+    def _evict(self):
+        # Blobs are shared between keys, so count each one once
+        refs = Counter(e["hash"] for e in self.index.values())
+        sizes = {e["hash"]: e["size"] for e in self.index.values()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["lastUsed"]):
+            if total <= self.max_bytes:
+                break
+            del self.index[key]
+            content_hash = entry["hash"]
+            refs[content_hash] -= 1
+            if refs[content_hash] == 0:
+                total -= sizes[content_hash]
+                try:
+                    os.unlink(self._blob_path(content_hash))
+                except OSError:
+                    pass
+        logger.info("Transcript store evicted entries down to %d bytes", total)
@@ -0,0 +1,157 @@
+"""Compact video record passed between pipeline stages."""
+
+import sys
+import weakref
+from collections.abc import MutableMapping
+
+
+class Channel:
+    """Channel name and URL, shared by every video of the channel."""
+
+    __slots__ = ("name", "url", "__weakref__")
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+
+    def __repr__(self):
+        return f"Channel({self.name!r}, {self.url!r})"
+
+
+# Held weakly, so a channel is dropped once no video of the run refers to it
+_channels = weakref.WeakValueDictionary()
+
+
+def channel(name, url):
+    """Return the shared Channel for (name, url), creating it on first use."""
+    key = (name, url)
+    found = _channels.get(key)
+    if found is None:
+        found = _channels.setdefault(key, Channel(sys.intern(name) if isinstance(name, str) else name, url))
+    return found
+
+
+# Keys in data.json order; channelName and channelUrl live on the shared Channel
+_KEYS = ("id", "title", "publishedAt", "duration", "thumbnailUrl", "videoUrl", "channelName", "channelUrl",
+         "summary", "transcriptAvailable", "transcript")
+_CHANNEL_KEYS = {"channelName": "name", "channelUrl": "url"}
+_FIELDS = frozenset(_KEYS) - _CHANNEL_KEYS.keys()  # stored in the slot of the same name
+# A video's fields in a data.json day (channel fields live on the channel group), with defaults
+_ENTRY_DEFAULTS = (("title", "Untitled"), ("publishedAt", ""), ("duration", None), ("thumbnailUrl", ""),
+                   ("videoUrl", ""), ("summary", ""), ("transcriptAvailable", False))
+_MISSING = object()
+
+
+class Video(MutableMapping):
+    """One video, stored in slots instead of a per-video dict.
+
+    Behaves as the dict the pipeline has always passed around (video["id"],
+    .get(), "summary" in video, == a dict, {**video}), so stages need no
+    changes; hot paths read the slots directly (video.publishedAt). A key
+    that was never set is missing, as in a dict. Keys outside the known
+    fields go to a small overflow dict. JSON encoders need to_json() (state
+    files) or to_entry_json() (data.json days) as their `default`.
+    """
+
+    __slots__ = ("id", "title", "publishedAt", "duration", "thumbnailUrl", "videoUrl", "channel",
+                 "summary", "transcriptAvailable", "transcript", "_extra")
+
+    def __init__(self, fields=(), **kwargs):
+        fields = dict(fields, **kwargs)
+        name, url = fields.pop("channelName", None), fields.pop("channelUrl", None)
+        if name is not None or url is not None:
+            self.channel = channel(name, url)
+        for key, value in fields.items():
+            if key in _FIELDS:
+                setattr(self, key, value)
+            else:
+                self[key] = value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        # Stages call get() per field, so it is implemented directly rather than via __getitem__
+        if key in _FIELDS:
+            return getattr(self, key, default)
+        attribute = _CHANNEL_KEYS.get(key)
+        if attribute is not None:
+            value = getattr(getattr(self, "channel", None), attribute, None)
+            return default if value is None else value
+        extra = getattr(self, "_extra", None)
+        return default if extra is None else extra.get(key, default)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key, value):
+        if key in _FIELDS:
+            setattr(self, key, value)
+        elif key in _CHANNEL_KEYS:
+            name, url = _channel_parts(self)
+            self.channel = channel(value, url) if key == "channelName" else channel(name, value)
+        else:
+            try:
+                self._extra[key] = value
+            except AttributeError:
+                self._extra = {key: value}
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key in _FIELDS:
+            delattr(self, key)
+        elif key in _CHANNEL_KEYS:
+            name, url = _channel_parts(self)
+            self.channel = channel(None, url) if key == "channelName" else channel(name, None)
+        else:
+            del self._extra[key]
+
+    def __iter__(self):
+        for key in _KEYS:
+            if key in self:
+                yield key
+        yield from getattr(self, "_extra", ())
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Video({dict(self)!r})"
+
+    def to_dict(self):
+        return dict(self)
+
+    def to_entry(self):
+        """This video as written in a data.json day, without the channel fields of its group."""
+        entry = {"id": self.id}
+        for key, default in _ENTRY_DEFAULTS:
+            entry[key] = getattr(self, key, default)
+        return entry
+
+
+def as_video(video):
+    """Return video as a Video record, converting a plain dict."""
+    return video if isinstance(video, Video) else Video(video)
+
+
+def _channel_parts(video):
+    current = getattr(video, "channel", None)
+    return (current.name, current.url) if current is not None else (None, None)
+
+
+def to_json(obj):
+    """json `default` hook: encode Video records as plain dicts."""
+    if isinstance(obj, Video):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_entry_json(obj):
+    """json `default` hook for data.json: encode Video records in days as their day entry."""
+    if isinstance(obj, Video):
+        return obj.to_entry()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,135 @@
+"""Persistent per-video work state so failed transcripts and summaries are retried."""
+
+import logging
+import sqlite3
+import threading
+import time
+
+from pipeline.state_file import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+PENDING_TRANSCRIPT = "pendingTranscript"
+PENDING_SUMMARY = "pendingSummary"
+DONE = "done"
+FAILED = "failed"  # gave up after max_attempts
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BASE_HOURS = 1
+_RETRY_MAX_HOURS = 24
+
+# Lower sorts first: finishing a summary is cheaper than fetching a transcript
+_STATE_PRIORITY = {PENDING_SUMMARY: 0, PENDING_TRANSCRIPT: 1}
+
+
+class WorkQueue:
+    """File-backed table of per-video work state.
+
+    Entries are stored as {video_id: {"state", "attempts", "nextEligible",
+    "publishedAt"}}. A failed step stays in its pending state with a
+    doubling delay (retry_base_hours, capped at a day) before it is eligible
+    again, and becomes FAILED after max_attempts failures. With a
+    HistoryStore, entries are kept in its work table instead of at path.
+    """
+
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS, retry_base_hours=DEFAULT_RETRY_BASE_HOURS,
+                 history=None):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_hours * 3600
+        self.history = history
+        self.entries = history.load_work() if history is not None else load_state(path)
+        self._lock = threading.Lock()
+
+    def enqueue(self, videos):
+        """Add videos not seen before as pending transcript work."""
+        added = 0
+        for video in videos:
+            if video["id"] not in self.entries:
+                self.entries[video["id"]] = {
+                    "state": PENDING_TRANSCRIPT,
+                    "attempts": 0,
+                    "nextEligible": 0,
+                    "publishedAt": video.get("publishedAt", ""),
+                }
+                added += 1
+        return added
+
+    def state(self, video_id):
+        entry = self.entries.get(video_id)
+        return entry["state"] if entry else None
+
+    def due(self, now=None):
+        """Return IDs of outstanding work that is eligible now, in priority order.
+
+        Pending summaries come before pending transcripts, then newer videos
+        before older ones, then fewer failed attempts first.
+        """
+        now = time.time() if now is None else now
+        eligible = [
+            (video_id, entry) for video_id, entry in self.entries.items()
+            if entry["state"] in _STATE_PRIORITY and entry["nextEligible"] <= now
+        ]
+        eligible.sort(key=lambda item: item[1]["attempts"])
+        eligible.sort(key=lambda item: item[1]["publishedAt"], reverse=True)
+        eligible.sort(key=lambda item: _STATE_PRIORITY[item[1]["state"]])
+        return [video_id for video_id, _ in eligible]
+
+    def select(self, videos_by_id, limit=None, now=None):
+        """Return the video dicts for due work items, in priority order, up to `limit`."""
+        selected = [videos_by_id[video_id] for video_id in self.due(now) if video_id in videos_by_id]
+        return selected[:limit] if limit else selected
+
+    def record_transcript(self, video_id, ok):
+        """Advance to summary work on success, or schedule a retry."""
+        with self._lock:
+            if ok:
+                self._advance(video_id, PENDING_SUMMARY)
+            else:
+                self._fail(video_id)
+
+    def record_summary(self, video_id, ok):
+        with self._lock:
+            if ok:
+                self._advance(video_id, DONE)
+            else:
+                self._fail(video_id)
+
+    def prune(self, keep_ids):
+        """Drop entries for videos that have left the display window."""
+        keep = set(keep_ids)
+        removed = [video_id for video_id in self.entries if video_id not in keep]
+        for video_id in removed:
+            del self.entries[video_id]
+        if removed:
+            logger.info("Removed %d work queue entries", len(removed))
+
+    def stats(self):
+        """Return the number of entries in each state."""
+        counts = {PENDING_TRANSCRIPT: 0, PENDING_SUMMARY: 0, DONE: 0, FAILED: 0}
+        for entry in self.entries.values():
+            counts[entry["state"]] += 1
+        return counts
+
+    def save(self):
+        try:
+            if self.history is not None:
+                self.history.save_work(self.entries)
+            else:
+                save_state(self.entries, self.path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Could not save work queue %s: %s", self.path, e)
+
+    def _advance(self, video_id, state):
+        entry = self.entries[video_id]
+        entry.update(state=state, attempts=0, nextEligible=0)
+
+    def _fail(self, video_id):
+        entry = self.entries[video_id]
+        entry["attempts"] += 1
+        if entry["attempts"] >= self.max_attempts:
+            entry["state"] = FAILED
+            logger.warning("Giving up on %s after %d attempts", video_id, entry["attempts"])
+            return
+        delay = min(_RETRY_MAX_HOURS * 3600, self.retry_base_seconds * 2 ** (entry["attempts"] - 1))
+        entry["nextEligible"] = int(time.time() + delay)
@@ -3,17 +3,25 @@
 import json
 import logging
 import os
+import re
 import tempfile
 from datetime import datetime, timezone
 
+from pipeline.data_stream import LazyDay
+from pipeline.video import to_entry_json
+
 logger = logging.getLogger(__name__)
 
+_RAW_DAY_PLACEHOLDER = re.compile(r'"\\u0000day(\d+)\\u0000"')
+
 
 def write_data(data, output_path="data.json"):
     """Write the final data structure to data.json atomically.
 
     Writes to a temp file first, then uses os.replace() for an atomic rename.
     This prevents data corruption if the process is killed mid-write.
+    Days still undecoded (LazyDay) are copied from their original JSON text,
+    and Video records in days are written as their data.json entry.
     """
     data["lastUpdated"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
@@ -21,7 +29,8 @@ def write_data(data, output_path="data.json"):
     fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=dir_name)
     try:
         with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            for chunk in _iterencode(data):
+                f.write(chunk)
         os.replace(tmp_path, output_path)
     except Exception:
         # Clean up temp file on failure
@@ -30,3 +39,24 @@ def write_data(data, output_path="data.json"):
         raise
 
     logger.info("Wrote %s (last updated: %s)", output_path, data["lastUpdated"])
+
+
+def _iterencode(data):
+    """Encode data as json.dump(indent=2) would, splicing in the raw text of undecoded days."""
+    raw_days = []
+    days = []
+    for day in data.get("days", []):
+        if isinstance(day, LazyDay):
+            if day.materialized:
+                day = dict(day)
+            else:
+                # Encoded as a placeholder string, then replaced by the day's JSON text
+                raw_days.append(day.raw)
+                day = f"\0day{len(raw_days) - 1}\0"
+        days.append(day)
+
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=to_entry_json)
+    for chunk in encoder.iterencode({**data, "days": days} if "days" in data else data):
+        if raw_days and "\\u0000day" in chunk:
+            chunk = _RAW_DAY_PLACEHOLDER.sub(lambda m: raw_days[int(m.group(1))], chunk)
+        yield chunk
@@ -0,0 +1,115 @@
+"""Local HTTP stand-in for YouTube RSS feeds, shared by tests and benchmarks."""
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_ENTRY_TEMPLATE = """ <entry>
+  <id>yt:video:{video_id}</id>
+  <yt:videoId>{video_id}</yt:videoId>
+  <yt:channelId>{channel_id}</yt:channelId>
+  <title>Synthetic video {index} for {channel_id}</title>
+  <link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>
+  <author>
+   <name>{channel_id}</name>
+   <uri>https://www.youtube.com/channel/{channel_id}</uri>
+  </author>
+  <published>{published}</published>
+  <updated>{published}</updated>
+  <media:group>
+   <media:title>Synthetic video {index} for {channel_id}</media:title>
+   <media:content url="https://www.youtube.com/v/{video_id}?version=3" type="application/x-shockwave-flash" width="640" height="390"/>
+   <media:thumbnail url="https://i4.ytimg.com/vi/{video_id}/hqdefault.jpg" width="480" height="360"/>
+   <media:description>{description}</media:description>
+   <media:community>
+    <media:starRating count="120" average="5.00" min="1" max="5"/>
+    <media:statistics views="4321"/>
+   </media:community>
+  </media:group>
+ </entry>
+"""
+
+
+def synthetic_feed(channel_id, entries=15, now=None, spacing_hours=11):
+    """Build a YouTube-style Atom feed with `entries` videos, newest first."""
+    now = now or datetime.now(timezone.utc)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" '
+        'xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">\n'
+        f" <link rel=\"self\" href=\"http://www.youtube.com/feeds/videos.xml?channel_id={channel_id}\"/>\n"
+        f" <id>yt:channel:{channel_id[2:]}</id>\n"
+        f" <yt:channelId>{channel_id}</yt:channelId>\n"
+        f" <title>{channel_id}</title>\n"
+    ]
+    for i in range(entries):
+        published = (now - timedelta(hours=i * spacing_hours)).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+        parts.append(_ENTRY_TEMPLATE.format(
+            video_id=f"{channel_id[-6:]}v{i:04d}",
+            channel_id=channel_id,
+            index=i,
+            published=published,
+            description="Lorem ipsum dolor sit amet. " * 20,
+        ))
+    parts.append("</feed>\n")
+    return "".join(parts).encode("utf-8")
+
+
+class FeedServer:
+    """Serve synthetic feeds at /feeds/videos.xml?channel_id=... on localhost.
+
+    Each response is delayed by `latency` seconds to simulate network RTT.
+    A feed's body is fixed on first request; with `etags=True` responses carry
+    an ETag and matching If-None-Match requests get 304 Not Modified.
+    Use as a context manager; `url_template` is a drop-in RSS_URL_TEMPLATE.
+    """
+
+    def __init__(self, latency=0.0, entries=15, etags=False):
+        self.latency = latency
+        self.entries = entries
+        self.etags = etags
+        self.requests = 0
+        self.not_modified = 0
+        self._bodies = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                channel_id = parse_qs(urlparse(self.path).query).get("channel_id", [""])[0]
+                time.sleep(server.latency)
+                body = server._bodies.setdefault(channel_id, synthetic_feed(channel_id, server.entries))
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if server.etags and self.headers.get("If-None-Match") == etag:
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/atom+xml; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                if server.etags:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url_template = (
+            f"http://127.0.0.1:{self._httpd.server_address[1]}/feeds/videos.xml?channel_id={{channel_id}}"
+        )
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
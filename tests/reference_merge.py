@@ -0,0 +1,77 @@
+"""Reference full-regroup merge, shared by the data_manager tests and the merge benchmarks."""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from pipeline.data_manager import _build_day, index_videos
+
+
+def regroup_all(existing_data, new_videos, days_to_show):
+    """Regroup every existing and new video from scratch.
+
+    The merge data_manager.merge_and_group replaced: same output, but
+    O(total history) work per run. Tests compare against it and benchmarks
+    time it as the baseline.
+    """
+    cutoff_date = (datetime.now(timezone.utc) - timedelta(days=days_to_show)).strftime("%Y-%m-%d")
+
+    # Collect all existing videos into a flat list, minus those being replaced
+    new_ids = {v["id"] for v in new_videos}
+    all_videos = [v for v in index_videos(existing_data).values() if v["id"] not in new_ids]
+
+    # Add new videos
+    all_videos.extend(new_videos)
+
+    # Group by date -> channel
+    days_dict = defaultdict(lambda: defaultdict(list))
+    for video in all_videos:
+        date_str = video.get("publishedAt", "")[:10]  # YYYY-MM-DD
+        if date_str < cutoff_date:
+            continue
+
+        channel_key = video.get("channelName", "Unknown")
+        # Store video without redundant channel fields at video level
+        video_entry = {
+            "id": video["id"],
+            "title": video.get("title", "Untitled"),
+            "publishedAt": video.get("publishedAt", ""),
+            "duration": video.get("duration"),
+            "thumbnailUrl": video.get("thumbnailUrl", ""),
+            "videoUrl": video.get("videoUrl", ""),
+            "summary": video.get("summary", ""),
+            "transcriptAvailable": video.get("transcriptAvailable", False),
+        }
+        days_dict[date_str][channel_key].append(video_entry)
+
+    # Build channel name -> URL lookup (O(1) per channel)
+    channel_url_map = {}
+    for v in all_videos:
+        name = v.get("channelName", "")
+        if name and name not in channel_url_map:
+            channel_url_map[name] = v.get("channelUrl", "")
+
+    # Build structured days array
+    days = []
+    existing_digests = {}
+    for day in existing_data.get("days", []):
+        existing_digests[day["date"]] = day.get("dailyDigest", "")
+
+    for date_str in sorted(days_dict.keys(), reverse=True):
+        channels = []
+        channel_groups = days_dict[date_str]
+        for channel_name in sorted(channel_groups.keys()):
+            videos = channel_groups[channel_name]
+
+            channels.append({
+                "channelName": channel_name,
+                "channelUrl": channel_url_map.get(channel_name, ""),
+                "videos": sorted(videos, key=lambda v: v.get("publishedAt", ""), reverse=True),
+            })
+
+        days.append(_build_day(date_str, existing_digests.get(date_str, ""), channels))
+
+    return {
+        "lastUpdated": existing_data.get("lastUpdated"),
+        "config": {"daysToShow": days_to_show},
+        "days": days,
+    }
@@ -0,0 +1,90 @@
+"""Tests for budget_planner module."""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from pipeline.budget_planner import UsageLedger, estimate_summary_tokens, plan_summaries
+from pipeline.gemini_executor import estimate_tokens
+
+
+def _video(video_id, day, channel="Ch", words=1000):
+    return {
+        "id": video_id,
+        "publishedAt": f"{day}T10:00:00+00:00",
+        "channelName": channel,
+        "channelUrl": f"https://www.youtube.com/@{channel}",
+        "transcript": " ".join(["word"] * words),
+    }
+
+
+class TestEstimateSummaryTokens:
+    def test_short_transcript_is_prompt_plus_output(self):
+        transcript = "word " * 1000
+        assert estimate_summary_tokens(transcript) > estimate_tokens(transcript)
+        assert estimate_summary_tokens(transcript) < estimate_tokens(transcript) + 1000
+
+    def test_long_transcript_counts_chunk_overhead(self):
+        transcript = "word " * 20000
+        single_shot = estimate_summary_tokens(transcript, long_transcript_tokens=10**9)
+        map_reduce = estimate_summary_tokens(transcript, long_transcript_tokens=1000, chunk_tokens=2000)
+        assert map_reduce > single_shot
+
+
+class TestPlanSummaries:
+    def test_everything_fits_large_budget(self):
+        videos = [_video(f"v{i}", "2026-02-26") for i in range(3)]
+        selected, deferred, plan = plan_summaries(videos, tokens_per_run=10**6, tokens_per_day=10**6)
+        assert len(selected) == 3
+        assert deferred == []
+        assert 0 < plan["estimatedTokens"] <= plan["budgetTokens"]
+
+    def test_newest_videos_first_when_budget_is_short(self):
+        videos = [_video("old", "2026-02-20"), _video("new", "2026-02-26"), _video("mid", "2026-02-23")]
+        one_video = estimate_summary_tokens(videos[0]["transcript"]) + 1000
+        selected, deferred, plan = plan_summaries(videos, tokens_per_run=one_video)
+        assert [v["id"] for v in selected] == ["new"]
+        assert [v["id"] for v in deferred] == ["mid", "old"]
+        assert plan["deferred"] == 2
+
+    def test_important_channels_come_first(self):
+        videos = [_video("new", "2026-02-26"), _video("vip", "2026-02-20", channel="Vip")]
+        one_video = estimate_summary_tokens(videos[0]["transcript"]) + 1000
+        selected, _, _ = plan_summaries(videos, tokens_per_run=one_video,
+                                        important_channels=["https://www.youtube.com/@Vip"])
+        assert [v["id"] for v in selected] == ["vip"]
+
+    def test_daily_budget_accounts_for_earlier_usage(self):
+        videos = [_video("a", "2026-02-26")]
+        selected, deferred, plan = plan_summaries(videos, used_today=999_000, tokens_per_day=1_000_000)
+        assert selected == []
+        assert plan["budgetTokens"] == 1000
+
+    def test_smaller_video_can_fill_remaining_budget(self):
+        videos = [_video("big", "2026-02-26", words=20000), _video("small", "2026-02-25", words=100)]
+        budget = estimate_summary_tokens(videos[1]["transcript"]) + 1000
+        selected, _, _ = plan_summaries(videos, tokens_per_run=budget)
+        assert [v["id"] for v in selected] == ["small"]
+
+
+class TestUsageLedger:
+    def test_records_and_persists_today(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "usage.json")
+            ledger = UsageLedger(path)
+            ledger.record(1000, requests=2)
+            ledger.record(500, requests=1)
+            ledger.save()
+
+            assert UsageLedger(path).used_today() == 1500
+
+    def test_drops_old_days_on_save(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "usage.json")
+            ledger = UsageLedger(path)
+            old = (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%d")
+            ledger.days[old] = {"tokens": 5, "requests": 1}
+            ledger.record(10)
+            ledger.save()
+
+            assert old not in UsageLedger(path).days
@@ -1,8 +1,27 @@
 """Tests for channel_resolver module."""
 
+import os
+import tempfile
+import time
 from unittest.mock import patch, Mock
 
-from pipeline.channel_resolver import resolve_channels, _extract_channel_id_from_html
+from pipeline.channel_resolver import (
+    resolve_channels,
+    _extract_channel_id_from_html,
+    _scan_channel_id,
+    ResolutionCache,
+)
+from pipeline.rate_limiter import HostRateLimiter
+
+
+def _mock_page(html, chunk_size=64):
+    """Create a mock streamed response serving html in fixed-size byte chunks."""
+    body = html.encode("utf-8")
+    response = Mock()
+    response.encoding = "utf-8"
+    response.raise_for_status = Mock()
+    response.iter_content = Mock(return_value=[body[i:i + chunk_size] for i in range(0, len(body), chunk_size)])
+    return response
 
 
 class TestExtractChannelIdFromHtml:
@@ -23,6 +42,50 @@ class TestExtractChannelIdFromHtml:
         assert _extract_channel_id_from_html(html) is None
 
 
+class TestScanChannelId:
+    def _chunks(self, html, size):
+        body = html.encode("utf-8")
+        return [body[i:i + size] for i in range(0, len(body), size)]
+
+    def test_match_straddling_chunk_boundary(self):
+        html = '<head><meta property="og:url" content="https://www.youtube.com/channel/UCbfYPyITQ-7l4upoX8nvctg">'
+        channel_id, _ = _scan_channel_id(self._chunks(html, 7))
+        assert channel_id == "UCbfYPyITQ-7l4upoX8nvctg"
+
+    def test_stops_reading_after_head_match(self):
+        head = '<head><link rel="canonical" href="https://www.youtube.com/channel/UCZHmQk67mSJgfCCTn7xBfew"></head>'
+        chunks = self._chunks(head, 32) + [b"x" * 100000] * 10
+        consumed = []
+
+        def stream():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        channel_id, bytes_read = _scan_channel_id(stream())
+        assert channel_id == "UCZHmQk67mSJgfCCTn7xBfew"
+        assert bytes_read <= len(head)
+        assert len(consumed) < len(chunks)
+
+    def test_prefers_og_url_over_earlier_body_reference(self):
+        html = (
+            '<head><script>"/channel/UCZHmQk67mSJgfCCTn7xBfew"</script>'
+            '<meta property="og:url" content="https://www.youtube.com/channel/UCbfYPyITQ-7l4upoX8nvctg"></head>'
+        )
+        channel_id, _ = _scan_channel_id(self._chunks(html, 16))
+        assert channel_id == "UCbfYPyITQ-7l4upoX8nvctg"
+
+    def test_body_reference_after_head(self):
+        html = '<head></head><body><a href="/channel/UCbfYPyITQ-7l4upoX8nvctg/featured">x</a></body>'
+        channel_id, _ = _scan_channel_id(self._chunks(html, 10))
+        assert channel_id == "UCbfYPyITQ-7l4upoX8nvctg"
+
+    def test_multibyte_characters_split_across_chunks(self):
+        html = '<head><title>ééé</title><link rel="canonical" href="https://www.youtube.com/channel/UCZHmQk67mSJgfCCTn7xBfew">'
+        channel_id, _ = _scan_channel_id(self._chunks(html, 3))
+        assert channel_id == "UCZHmQk67mSJgfCCTn7xBfew"
+
+
 class TestResolveChannels:
     def test_direct_channel_url(self):
         urls = ["https://www.youtube.com/channel/UCbfYPyITQ-7l4upoX8nvctg"]
@@ -30,40 +93,31 @@ class TestResolveChannels:
         assert len(result) == 1
         assert result[0]["channel_id"] == "UCbfYPyITQ-7l4upoX8nvctg"
 
-    @patch("pipeline.channel_resolver.requests.get")
+    @patch("pipeline.http_client.get")
     def test_handle_url_resolved(self, mock_get):
-        mock_response = Mock()
-        mock_response.text = '<meta property="og:url" content="https://www.youtube.com/channel/UCbfYPyITQ-7l4upoX8nvctg">'
-        mock_response.raise_for_status = Mock()
-        mock_get.return_value = mock_response
+        mock_get.return_value = _mock_page('<meta property="og:url" content="https://www.youtube.com/channel/UCbfYPyITQ-7l4upoX8nvctg">')
 
         result = resolve_channels(["https://www.youtube.com/@TwoMinutePapers"])
         assert len(result) == 1
         assert result[0]["channel_id"] == "UCbfYPyITQ-7l4upoX8nvctg"
         assert result[0]["channel_name"] == "TwoMinutePapers"
 
-    @patch("pipeline.channel_resolver.requests.get")
+    @patch("pipeline.http_client.get")
     def test_invalid_url_skipped(self, mock_get):
         mock_get.side_effect = Exception("Connection error")
         result = resolve_channels(["https://www.youtube.com/@InvalidChannel123"])
         assert len(result) == 0
 
-    @patch("pipeline.channel_resolver.requests.get")
+    @patch("pipeline.http_client.get")
     def test_no_channel_id_in_html_skipped(self, mock_get):
-        mock_response = Mock()
-        mock_response.text = "<html><body>No channel ID</body></html>"
-        mock_response.raise_for_status = Mock()
-        mock_get.return_value = mock_response
+        mock_get.return_value = _mock_page("<html><body>No channel ID</body></html>")
 
         result = resolve_channels(["https://www.youtube.com/@SomeChannel"])
         assert len(result) == 0
 
-    @patch("pipeline.channel_resolver.requests.get")
+    @patch("pipeline.http_client.get")
     def test_mixed_urls(self, mock_get):
-        mock_response = Mock()
-        mock_response.text = '<link rel="canonical" href="https://www.youtube.com/channel/UCZHmQk67mSJgfCCTn7xBfew">'
-        mock_response.raise_for_status = Mock()
-        mock_get.return_value = mock_response
+        mock_get.return_value = _mock_page('<link rel="canonical" href="https://www.youtube.com/channel/UCZHmQk67mSJgfCCTn7xBfew">')
 
         urls = [
             "https://www.youtube.com/channel/UCbfYPyITQ-7l4upoX8nvctg",
@@ -73,3 +127,58 @@ class TestResolveChannels:
         assert len(result) == 2
         assert result[0]["channel_id"] == "UCbfYPyITQ-7l4upoX8nvctg"
         assert result[1]["channel_id"] == "UCZHmQk67mSJgfCCTn7xBfew"
+
+    @patch("pipeline.http_client.get")
+    def test_concurrent_workers_preserve_order_and_skip_failures(self, mock_get):
+        ids = {
+            "https://www.youtube.com/@A": "UCaaaaaaaaaaaaaaaaaaaaaa",
+            "https://www.youtube.com/@C": "UCcccccccccccccccccccccc",
+        }
+
+        def fake_get(url, **kwargs):
+            if url not in ids:
+                raise Exception("Connection error")
+            return _mock_page(f'<link rel="canonical" href="https://www.youtube.com/channel/{ids[url]}">')
+
+        mock_get.side_effect = fake_get
+        urls = ["https://www.youtube.com/@A", "https://www.youtube.com/@B", "https://www.youtube.com/@C"]
+        result = resolve_channels(urls, workers=3, limiter=HostRateLimiter(rate=1000))
+        assert [r["channel_name"] for r in result] == ["A", "C"]
+        assert [r["channel_id"] for r in result] == [ids[urls[0]], ids[urls[2]]]
+
+
+class TestResolutionCache:
+    def _cache_path(self):
+        return os.path.join(tempfile.mkdtemp(), "channel_ids.json")
+
+    @patch("pipeline.http_client.get")
+    def test_warm_cache_skips_http(self, mock_get):
+        mock_get.return_value = _mock_page('<meta property="og:url" content="https://www.youtube.com/channel/UCbfYPyITQ-7l4upoX8nvctg">')
+        path = self._cache_path()
+        urls = ["https://www.youtube.com/@TwoMinutePapers"]
+
+        resolve_channels(urls, cache=ResolutionCache(path))
+        stats = {}
+        result = resolve_channels(urls, cache=ResolutionCache(path), stats=stats)
+
+        assert mock_get.call_count == 1
+        assert result[0]["channel_id"] == "UCbfYPyITQ-7l4upoX8nvctg"
+        assert stats["cacheHits"] == 1
+        assert stats["cacheMisses"] == 0
+        assert stats["pagesFetched"] == 0
+
+    def test_expired_entry_is_miss(self):
+        cache = ResolutionCache(self._cache_path(), ttl_days=1)
+        cache.entries["https://www.youtube.com/@Old"] = {
+            "channel_id": "UCbfYPyITQ-7l4upoX8nvctg",
+            "resolvedAt": int(time.time()) - 2 * 86400,
+        }
+        assert cache.get("https://www.youtube.com/@Old") is None
+        assert cache.misses == 1
+
+    def test_prune_drops_urls_removed_from_config(self):
+        cache = ResolutionCache(self._cache_path())
+        cache.put("https://www.youtube.com/@Keep", "UCbfYPyITQ-7l4upoX8nvctg")
+        cache.put("https://www.youtube.com/@Gone", "UCZHmQk67mSJgfCCTn7xBfew")
+        cache.prune(["https://www.youtube.com/@Keep"])
+        assert list(cache.entries) == ["https://www.youtube.com/@Keep"]
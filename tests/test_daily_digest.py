@@ -0,0 +1,172 @@
+"""Tests for daily_digest module."""
+
+import json
+import os
+import tempfile
+from unittest.mock import patch, MagicMock, Mock
+
+from pipeline.daily_digest import DigestState, day_summaries, refresh_digests
+from pipeline.data_manager import _build_day
+from pipeline.data_stream import load_lazy
+from pipeline.gemini_executor import GeminiExecutor
+
+
+def _day(date, summaries, digest=""):
+    videos = [{"id": video_id, "summary": summary} for video_id, summary in summaries.items()]
+    return {"date": date, "dailyDigest": digest, "channels": [{"channelName": "Ch", "videos": videos}]}
+
+
+def _client(*texts):
+    client = MagicMock()
+    client.models.generate_content.side_effect = [Mock(text=t) for t in texts]
+    return client
+
+
+def _prompts(client):
+    return [c.kwargs["contents"] for c in client.models.generate_content.call_args_list]
+
+
+class TestDaySummaries:
+    def test_skips_missing_and_failed_summaries(self):
+        day = _day("2026-02-26", {
+            "a": "• real",
+            "b": "",
+            "c": "Transcript not available for this video.",
+            "d": "Summary generation failed — will retry next run.",
+        })
+        assert day_summaries(day) == {"a": "• real"}
+
+
+class TestRefreshDigests:
+    def test_first_digest_is_full_then_unchanged_day_is_skipped(self):
+        state = DigestState("/nonexistent/digests.json")
+        day = _day("2026-02-26", {"a": "Summary A", "b": "Summary B"})
+        client = _client("digest v1")
+
+        refresh_digests(client, "m", [day], state)
+        refresh_digests(client, "m", [day], state)
+
+        assert day["dailyDigest"] == "digest v1"
+        assert client.models.generate_content.call_count == 1
+
+    def test_added_video_updates_from_previous_digest(self):
+        state = DigestState("/nonexistent/digests.json")
+        summaries = {f"v{i}": f"Summary {i} " + "• takeaway " * 40 for i in range(4)}
+        day = _day("2026-02-26", summaries)
+        client = _client("digest v1", "digest v2")
+        refresh_digests(client, "m", [day], state)
+
+        day = _day("2026-02-26", {**summaries, "v4": "Summary 4"}, digest="digest v1")
+        stats = {}
+        refresh_digests(client, "m", [day], state, stats=stats)
+
+        update_prompt = _prompts(client)[-1]
+        assert "digest v1" in update_prompt
+        assert "Summary 4" in update_prompt
+        assert "Summary 0" not in update_prompt
+        assert day["dailyDigest"] == "digest v2"
+        assert stats["incrementalUpdates"] == 1
+        assert stats["promptTokens"] < stats["fullRebuildTokens"]
+
+    def test_unchanged_content_hash_skips_day_without_decoding(self):
+        state = DigestState("/nonexistent/digests.json")
+        day = _build_day("2026-02-26", "", _day("2026-02-26", {"a": "A"})["channels"])
+        client = _client("digest v1")
+        refresh_digests(client, "m", [day], state)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"days": [day]}, f)
+            lazy_day = load_lazy(path)["days"][0]
+        refresh_digests(client, "m", [lazy_day], state)
+
+        assert client.models.generate_content.call_count == 1
+        assert not lazy_day.materialized
+
+    def test_added_video_without_summary_keeps_digest(self):
+        state = DigestState("/nonexistent/digests.json")
+        client = _client("digest v1")
+        refresh_digests(client, "m", [_day("d", {"a": "A"})], state)
+
+        day = _day("d", {"a": "A", "b": ""}, "digest v1")
+        refresh_digests(client, "m", [day], state)
+        refresh_digests(client, "m", [day], state)
+
+        assert day["dailyDigest"] == "digest v1"
+        assert client.models.generate_content.call_count == 1
+
+    def test_changed_summary_forces_full_rebuild(self):
+        state = DigestState("/nonexistent/digests.json")
+        client = _client("digest v1", "digest v2")
+        refresh_digests(client, "m", [_day("d", {"a": "A", "b": "B", "c": "C"})], state)
+
+        refresh_digests(client, "m", [_day("d", {"a": "A2", "b": "B", "c": "C", "e": "E"}, "digest v1")], state)
+
+        assert "A2" in _prompts(client)[-1]
+        assert "digest v1" not in _prompts(client)[-1]
+
+    def test_large_delta_forces_full_rebuild(self):
+        state = DigestState("/nonexistent/digests.json")
+        client = _client("digest v1", "digest v2")
+        refresh_digests(client, "m", [_day("d", {"a": "A"})], state)
+
+        refresh_digests(client, "m", [_day("d", {"a": "A", "b": "B", "c": "C"}, "digest v1")], state)
+
+        assert "digest v1" not in _prompts(client)[-1]
+
+    def test_periodic_full_rebuild(self):
+        state = DigestState("/nonexistent/digests.json")
+        client = _client(*[f"digest {i}" for i in range(4)])
+        summaries = {f"v{i}": f"S{i}" for i in range(10)}
+        day = _day("d", summaries)
+        refresh_digests(client, "m", [day], state, rebuild_every=2)
+
+        for i in range(10, 13):
+            summaries[f"v{i}"] = f"S{i}"
+            day = _day("d", dict(summaries), day["dailyDigest"])
+            stats = {}
+            refresh_digests(client, "m", [day], state, rebuild_every=2, stats=stats)
+
+        assert stats == {**stats, "fullRebuilds": 1, "incrementalUpdates": 0}
+
+    @patch("pipeline.summarizer.time.sleep")
+    def test_failed_call_keeps_previous_digest(self, mock_sleep):
+        state = DigestState("/nonexistent/digests.json")
+        client = MagicMock()
+        client.models.generate_content.side_effect = Exception("quota")
+        day = _day("d", {"a": "A"}, digest="old digest")
+        stats = {}
+
+        refresh_digests(client, "m", [day], state, stats=stats)
+
+        assert day["dailyDigest"] == "old digest"
+        assert "d" not in state.days
+        assert stats["failed"] == 1
+
+    def test_executor_runs_digest_calls_and_reports_usage(self):
+        state = DigestState("/nonexistent/digests.json")
+        client = MagicMock()
+        client.models.generate_content.side_effect = [
+            Mock(text="digest v1", usage_metadata=Mock(total_token_count=120)),
+            Mock(text="digest v2", usage_metadata=Mock(total_token_count=80)),
+        ]
+        executor = GeminiExecutor(client, "m", requests_per_minute=10_000)
+        stats = {}
+
+        refresh_digests(client, "m", [_day("a", {"v1": "A"}), _day("b", {"v2": "B"})], state,
+                        stats=stats, executor=executor)
+
+        assert stats["actualTokens"] == 200
+        assert executor.stats()["succeeded"] == 2
+
+    def test_state_persists_and_prunes_old_days(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "digests.json")
+            state = DigestState(path)
+            client = _client("d1", "d2")
+            refresh_digests(client, "m", [_day("2026-02-25", {"a": "A"}), _day("2026-02-26", {"b": "B"})], state)
+            refresh_digests(client, "m", [_day("2026-02-26", {"b": "B"}, "d2")], state)
+            state.save()
+
+            assert list(DigestState(path).days) == ["2026-02-26"]
@@ -2,16 +2,30 @@
 
 import json
 import os
+import random
 import tempfile
 from datetime import datetime, timedelta, timezone
 
 from pipeline.data_manager import (
     load_existing_data,
     get_existing_video_ids,
+    index_videos,
     filter_new_videos,
     merge_and_group,
+    merge_into_history,
+    sync_history,
+    window_from_history,
     get_changed_days,
+    day_content_hash,
 )
+from pipeline.history_store import HistoryStore
+from pipeline.video import to_entry_json
+from tests.reference_merge import regroup_all
+
+
+def _as_written(data):
+    """Encode as the writer does (Video records in days as their data.json entry)."""
+    return json.dumps(data, ensure_ascii=False, default=to_entry_json)
 
 
 def _make_video(video_id, channel_name, days_ago=0):
@@ -91,6 +105,14 @@ class TestGetExistingVideoIds:
         assert ids == set()
 
 
+class TestIndexVideos:
+    def test_restores_channel_fields(self):
+        existing = _make_existing_data({"2026-02-26": {"Ch1": [{"id": "v1", "title": "V1"}]}})
+        assert index_videos(existing) == {
+            "v1": {"id": "v1", "title": "V1", "channelName": "Ch1", "channelUrl": "https://www.youtube.com/@Ch1"},
+        }
+
+
 class TestFilterNewVideos:
     def test_filters_existing(self):
         videos = [_make_video("a", "Ch"), _make_video("b", "Ch"), _make_video("c", "Ch")]
@@ -126,6 +148,16 @@ class TestMergeAndGroup:
         ch1_videos = next(ch for ch in today_day["channels"] if ch["channelName"] == "Ch1")
         assert len(ch1_videos["videos"]) == 2
 
+    def test_reprocessed_video_replaces_existing(self):
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        retried = _make_video("v1", "Ch1", days_ago=0)
+        existing = _make_existing_data({today: {"Ch1": [{**retried, "summary": "Summary generation failed"}]}})
+
+        result = merge_and_group(existing, [retried], days_to_show=7)
+
+        videos = [v for d in result["days"] for ch in d["channels"] for v in ch["videos"]]
+        assert [v["summary"] for v in videos] == ["Summary for v1"]
+
     def test_drops_old_days(self):
         new_videos = [_make_video("old", "Ch1", days_ago=10), _make_video("new", "Ch1", days_ago=1)]
         result = merge_and_group({"days": []}, new_videos, days_to_show=7)
@@ -144,6 +176,179 @@ class TestMergeAndGroup:
         assert dates == sorted(dates, reverse=True)
 
 
+def _random_videos(rng, count, prefix, max_days_ago=10):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    videos = []
+    for i in range(count):
+        video = _make_video(f"{prefix}{i}", rng.choice(["Alpha", "Beta", "Gamma", "Delta"]))
+        # Whole hours so that several videos share a timestamp
+        video["publishedAt"] = (now - timedelta(hours=rng.randint(0, max_days_ago * 24))).isoformat()
+        videos.append(video)
+    return videos
+
+
+class TestIncrementalMerge:
+    """merge_and_group must produce exactly what regrouping everything produces."""
+
+    def _assert_equivalent(self, existing, new_videos, days_to_show=7):
+        expected = regroup_all(existing, new_videos, days_to_show)
+        result = merge_and_group(existing, new_videos, days_to_show)
+        assert _as_written(result) == _as_written(expected)
+
+    def test_matches_full_regroup(self):
+        rng = random.Random(21)
+        for _ in range(50):
+            old = _random_videos(rng, rng.randint(0, 40), "old")
+            existing = regroup_all({"days": []}, old, 10)
+            new = _random_videos(rng, rng.randint(0, 10), "new")
+            # Retried videos replace existing ones, possibly on another day or channel
+            retried = [dict(v, summary="retried") for v in rng.sample(old, min(3, len(old)))]
+            for video in retried[:1]:
+                video["channelName"] = rng.choice(["Alpha", "Epsilon"])
+            self._assert_equivalent(existing, new + retried)
+
+    def test_new_channel_and_day(self):
+        existing = regroup_all({"days": []}, [_make_video("v1", "Beta", days_ago=1)], 7)
+        new_videos = [_make_video("v2", "Alpha", days_ago=1), _make_video("v3", "Beta", days_ago=0)]
+        self._assert_equivalent(existing, new_videos)
+
+    def test_untouched_days_are_reused(self):
+        existing = regroup_all({"days": []}, [_make_video("v1", "Ch1", days_ago=2)], 7)
+        result = merge_and_group(existing, [_make_video("v2", "Ch1", days_ago=0)], days_to_show=7)
+        assert result["days"][1] is existing["days"][0]
+        assert len(existing["days"]) == 1
+
+
+class TestLazyMerge:
+    def test_matches_eager_merge_and_decodes_only_changed_days(self):
+        rng = random.Random(23)
+        old = _random_videos(rng, 60, "old")
+        existing = regroup_all({"days": []}, old, 10)
+        new_videos = [_make_video("new1", "Alpha", days_ago=0), dict(old[0], summary="retried")]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(existing, f, indent=2)
+            lazy = load_existing_data(path, lazy=True)
+
+        assert get_existing_video_ids(lazy) == get_existing_video_ids(existing)
+        result = merge_and_group(lazy, new_videos, days_to_show=7)
+
+        changed = {v["publishedAt"][:10] for v in new_videos} & {day["date"] for day in result["days"]}
+        assert {day["date"] for day in lazy["days"] if day.materialized} == changed
+        expected = merge_and_group(existing, new_videos, days_to_show=7)
+        assert _as_written([dict(day) for day in result["days"]]) == _as_written(expected["days"])
+
+
+class TestMergeIntoHistory:
+    def test_matches_merge_and_group(self):
+        rng = random.Random(22)
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(10):
+                old = _random_videos(rng, rng.randint(0, 40), "old")
+                existing = regroup_all({"days": []}, old, 10)
+                existing["days"][:1] = [dict(day, dailyDigest="Digest") for day in existing["days"][:1]]
+                new = _random_videos(rng, rng.randint(0, 10), "new")
+                new += [dict(v, summary="retried") for v in rng.sample(old, min(3, len(old)))]
+
+                history = HistoryStore(os.path.join(tmp, f"history{i}.sqlite"))
+                history.import_data(existing)
+                result = merge_into_history(history, new, days_to_show=7)
+                history.close()
+
+                expected = merge_and_group(existing, new, days_to_show=7)
+                assert _as_written(result) == _as_written(expected | {"lastUpdated": None})
+
+    def test_window_of_empty_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+            assert window_from_history(history, 7)["days"] == []
+
+
+class TestSyncHistory:
+    def _write(self, path, data):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def test_stale_store_imports_newer_data_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "data.json")
+            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+            history.upsert_videos([_make_video("v1", "Ch1", days_ago=0) | {"summary": ""}])
+            history.record_export("2026-02-25T08:00:00Z")
+            newer = _make_existing_data({today: {"Ch1": [
+                {k: v for k, v in _make_video(vid, "Ch1").items() if k not in ("channelName", "channelUrl")}
+                for vid in ("v2", "v1")
+            ]}})
+            self._write(data_path, newer)
+
+            assert sync_history(history, data_path)
+            window = window_from_history(history, 7)
+            assert get_existing_video_ids(window) == {"v1", "v2"}
+            assert history.get_videos(["v1"])["v1"]["summary"] == "Summary for v1"
+            assert window["days"][0]["dailyDigest"] == f"Digest for {today}"
+
+    def test_up_to_date_store_is_kept(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "data.json")
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+            history.upsert_videos([_make_video("v1", "Ch1")])
+            history.record_export("2026-02-26T08:00:00Z")
+            self._write(data_path, _make_existing_data({"2026-02-26": {"Ch1": [_make_video("v2", "Ch1")]}}))
+
+            assert not sync_history(history, data_path)
+            assert "v2" not in history
+
+    def test_empty_store_is_seeded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "data.json")
+            self._write(data_path, _make_existing_data({"2026-02-26": {"Ch1": [_make_video("v1", "Ch1")]}}))
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+
+            assert sync_history(history, data_path)
+            assert "v1" in history
+
+
+class TestDayContentHash:
+    def _day(self, **changes):
+        video = {"id": "v1", "title": "V1", "summary": "Summary"}
+        day = {"date": "2026-02-26", "dailyDigest": "", "channels": [{"channelName": "Ch1", "videos": [video]}]}
+        for key, value in changes.items():
+            if key == "channelName":
+                day["channels"][0]["channelName"] = value
+            elif key in video:
+                video[key] = value
+            else:
+                day[key] = value
+        return day
+
+    def test_covers_ids_summaries_and_grouping(self):
+        base = day_content_hash(self._day())
+        assert day_content_hash(self._day()) == base
+        assert day_content_hash(self._day(dailyDigest="Digest", title="Renamed")) == base
+        assert day_content_hash(self._day(id="v2")) != base
+        assert day_content_hash(self._day(summary="Other")) != base
+        assert day_content_hash(self._day(channelName="Ch2")) != base
+
+    def test_merged_days_carry_hash(self):
+        existing = merge_and_group({"days": []}, [_make_video("v1", "Ch1", days_ago=1)], days_to_show=7)
+        old_hash = existing["days"][0]["contentHash"]
+        result = merge_and_group(existing, [_make_video("v2", "Ch1", days_ago=0)], days_to_show=7)
+
+        assert [day["contentHash"] for day in result["days"]] == [
+            day_content_hash(day) for day in result["days"]
+        ]
+        assert result["days"][1]["contentHash"] == old_hash
+        assert get_changed_days(existing, result) == [result["days"][0]["date"]]
+
+    def test_days_without_hash_get_one(self):
+        existing = merge_and_group({"days": []}, [_make_video("v1", "Ch1", days_ago=1)], days_to_show=7)
+        legacy_day = {k: v for k, v in existing["days"][0].items() if k != "contentHash"}
+        result = merge_and_group({"days": [legacy_day]}, [], days_to_show=7)
+        assert result["days"] == existing["days"]
+
+
 class TestGetChangedDays:
     def test_detects_new_day(self):
         existing = {"days": []}
@@ -157,6 +362,16 @@ class TestGetChangedDays:
         changed = get_changed_days(existing, merged)
         assert "2026-02-26" in changed
 
+    def test_detects_changed_summary(self):
+        existing = {"days": [{"date": "2026-02-26", "channels": [{"videos": [{"id": "v1", "summary": "old"}]}]}]}
+        merged = {"days": [{"date": "2026-02-26", "channels": [{"videos": [{"id": "v1", "summary": "new"}]}]}]}
+        assert get_changed_days(existing, merged) == ["2026-02-26"]
+
+    def test_compares_stored_hashes(self):
+        day = {"date": "2026-02-26", "contentHash": "abc", "channels": [{"videos": [{"id": "v1"}]}]}
+        assert get_changed_days({"days": [day]}, {"days": [{**day, "channels": []}]}) == []
+        assert get_changed_days({"days": [day]}, {"days": [{**day, "contentHash": "def"}]}) == ["2026-02-26"]
+
     def test_unchanged_day_not_returned(self):
         existing = {"days": [{"date": "2026-02-26", "channels": [{"videos": [{"id": "v1"}]}]}]}
         merged = {"days": [{"date": "2026-02-26", "channels": [{"videos": [{"id": "v1"}]}]}]}
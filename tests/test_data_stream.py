@@ -0,0 +1,97 @@
+"""Tests for data_stream module."""
+
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from pipeline.data_stream import LazyDay, iter_document, load_lazy, read_last_updated, scan_video_ids
+
+
+def _day(date, *channels):
+    return {
+        "date": date,
+        "dailyDigest": f"Digest for {date} — é",
+        "contentHash": "abc123",
+        "channels": [
+            {"channelName": name, "channelUrl": f"https://www.youtube.com/@{name}",
+             "videos": [{"id": video_id, "title": f"Video {video_id}", "duration": 612} for video_id in ids]}
+            for name, ids in channels
+        ],
+    }
+
+
+_DATA = {
+    "lastUpdated": "2026-02-20T10:00:00Z",
+    "config": {"daysToShow": 7},
+    "days": [_day("2026-02-20", ("Alpha", ["a1", "a2"]), ("Beta", ["b1"])), _day("2026-02-19", ("Alpha", ["a0"]))],
+    "pipelineStatus": {"status": "ok", "issues": []},
+}
+
+
+def _write(tmp, data):
+    path = os.path.join(tmp, "data.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return path
+
+
+class TestIterDocument:
+    @pytest.mark.parametrize("read_chars", [1, 7, 1 << 16])
+    def test_yields_fields_and_each_day(self, read_chars):
+        text = json.dumps(_DATA, indent=2, ensure_ascii=False)
+        with patch("pipeline.data_stream._READ_CHARS", read_chars):
+            items = list(iter_document(io.StringIO(text)))
+
+        assert [key for key, _, _ in items] == ["lastUpdated", "config", "days", "days", "pipelineStatus"]
+        assert [value for key, value, _ in items if key == "days"] == _DATA["days"]
+        assert [json.loads(raw) for key, _, raw in items if key == "days"] == _DATA["days"]
+
+    def test_compact_and_empty_documents(self):
+        assert list(iter_document(io.StringIO("{}"))) == []
+        assert list(iter_document(io.StringIO('{"days":[],"n":12}'))) == [("n", 12, "12")]
+
+    def test_invalid_json_raises(self):
+        with pytest.raises(ValueError):
+            list(iter_document(io.StringIO('{"days": [{"date": ')))
+
+
+class TestScanVideoIds:
+    def test_collects_all_ids(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            assert scan_video_ids(_write(tmp, _DATA)) == {"a0", "a1", "a2", "b1"}
+
+
+class TestReadLastUpdated:
+    def test_reads_field_or_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            assert read_last_updated(_write(tmp, _DATA)) == "2026-02-20T10:00:00Z"
+            assert read_last_updated(os.path.join(tmp, "missing.json")) is None
+
+
+class TestLazyDay:
+    def test_index_without_decoding(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data = load_lazy(_write(tmp, _DATA))
+
+        day = data["days"][0]
+        assert isinstance(day, LazyDay)
+        assert day["date"] == "2026-02-20"
+        assert day.video_ids == {"a1", "a2", "b1"}
+        assert [name for name, _, _ in day.channel_index] == ["Alpha", "Beta"]
+        assert day.get("contentHash") == "abc123"
+        assert day.get("dailyDigest") == "Digest for 2026-02-20 — é"
+        assert not day.materialized
+        assert data["config"] == {"daysToShow": 7}
+
+    def test_decodes_on_access(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            day = load_lazy(_write(tmp, _DATA))["days"][0]
+
+        assert day["channels"][1]["videos"][0]["id"] == "b1"
+        assert day.materialized
+        day["dailyDigest"] = "Updated"
+        assert dict(day) == {**_DATA["days"][0], "dailyDigest": "Updated"}
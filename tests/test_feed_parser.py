@@ -0,0 +1,57 @@
+"""Tests for feed_parser module."""
+
+import os
+from datetime import datetime, timezone
+
+import feedparser
+import pytest
+
+from pipeline.feed_parser import UnexpectedFeedError, parse_youtube_feed
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "youtube_feed.xml")
+
+
+def _fixture_bytes():
+    with open(FIXTURE, "rb") as f:
+        return f.read()
+
+
+class TestParseYoutubeFeed:
+    def test_extracts_fields_like_feedparser(self):
+        content = _fixture_bytes()
+        entries = parse_youtube_feed(content)
+        reference = feedparser.parse(content).entries
+
+        assert len(entries) == len(reference) == 15
+        for entry, ref in zip(entries, reference):
+            assert entry["videoId"] == ref.id.split(":")[-1]
+            assert entry["title"] == ref.title
+            assert entry["published"] == ref.published
+            assert entry["link"] == ref.link
+
+    def test_unescapes_title_entities(self):
+        entries = parse_youtube_feed(_fixture_bytes())
+        assert entries[0]["title"] == "GPT-5 & Gemini: What's new?"
+
+    def test_stops_at_cutoff(self):
+        cutoff = datetime(2026, 2, 24, 0, 0, tzinfo=timezone.utc)
+        entries = parse_youtube_feed(_fixture_bytes(), cutoff)
+        assert entries
+        assert all(e["published_dt"] >= cutoff for e in entries)
+        assert len(entries) < 15
+
+    def test_non_atom_document_raises(self):
+        with pytest.raises(UnexpectedFeedError):
+            parse_youtube_feed(b"<rss><channel></channel></rss>")
+
+    def test_malformed_xml_raises(self):
+        with pytest.raises(UnexpectedFeedError):
+            parse_youtube_feed(b"<feed xmlns='http://www.w3.org/2005/Atom'><entry>")
+
+    def test_entry_without_video_id_raises(self):
+        content = (
+            b"<feed xmlns='http://www.w3.org/2005/Atom'><entry><title>x</title>"
+            b"<published>2026-02-26T00:00:00+00:00</published></entry></feed>"
+        )
+        with pytest.raises(UnexpectedFeedError):
+            parse_youtube_feed(content)
@@ -0,0 +1,133 @@
+"""Tests for gemini_executor module, run against a local fake model client."""
+
+import threading
+import time
+from unittest.mock import patch, Mock
+
+import pytest
+from google.genai import errors
+
+from pipeline.gemini_executor import GeminiExecutor, estimate_tokens, rate_limit_delay
+
+
+def _rate_limit_error(retry_delay="13s"):
+    return errors.ClientError(429, {"error": {
+        "code": 429,
+        "status": "RESOURCE_EXHAUSTED",
+        "message": "Quota exceeded",
+        "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": retry_delay}],
+    }})
+
+
+def _server_error():
+    return errors.ServerError(500, {"error": {"code": 500, "status": "INTERNAL", "message": "oops"}})
+
+
+class FakeModels:
+    """Stand-in for client.models: echoes prompts, raising queued errors first."""
+
+    def __init__(self, failures=(), latency=0.0):
+        self.failures = list(failures)
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, model, contents, config=None):
+        with self._lock:
+            self.calls += 1
+            if self.failures:
+                raise self.failures.pop(0)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return Mock(text=f"re: {contents}")
+
+
+def _executor(models, **kwargs):
+    kwargs.setdefault("requests_per_minute", 100_000)
+    kwargs.setdefault("tokens_per_minute", 100_000_000)
+    return GeminiExecutor(Mock(models=models), "gemini-2.0-flash", **kwargs)
+
+
+class TestRateLimitDelay:
+    def test_reads_server_retry_delay(self):
+        assert rate_limit_delay(_rate_limit_error("13s")) == (True, 13.0)
+
+    def test_rate_limit_without_retry_info(self):
+        error = errors.ClientError(429, {"error": {"code": 429, "message": "slow down"}})
+        assert rate_limit_delay(error) == (True, None)
+
+    def test_other_errors_are_not_rate_limits(self):
+        assert rate_limit_delay(_server_error()) == (False, None)
+        assert rate_limit_delay(ValueError("bad")) == (False, None)
+
+
+class TestGeminiExecutor:
+    def test_map_runs_concurrently_and_keeps_order(self):
+        models = FakeModels(latency=0.05)
+        executor = _executor(models, workers=4)
+
+        results = executor.map([f"p{i}" for i in range(8)])
+
+        assert results == [f"re: p{i}" for i in range(8)]
+        assert models.max_in_flight > 1
+        stats = executor.stats()
+        assert stats["requests"] == 8
+        assert stats["succeeded"] == 8
+        assert stats["requestsPerMinute"] > 0
+
+    @patch("pipeline.gemini_executor.time.sleep")
+    def test_honors_server_retry_delay_on_429(self, mock_sleep):
+        models = FakeModels(failures=[_rate_limit_error("13s")])
+        executor = _executor(models)
+
+        assert executor.generate("hello") == "re: hello"
+        mock_sleep.assert_any_call(13.0)
+        assert executor.stats()["rateLimited"] == 1
+        assert executor.stats()["errors"] == 0
+
+    @patch("pipeline.gemini_executor.time.sleep")
+    def test_server_errors_back_off_then_give_up(self, mock_sleep):
+        models = FakeModels(failures=[_server_error()] * 5)
+        executor = _executor(models, max_retries=3)
+
+        assert executor.generate("hello") is None
+        assert models.calls == 3
+        assert all(call.args[0] <= 20 for call in mock_sleep.call_args_list)
+        assert executor.stats()["errors"] == 3
+        assert executor.stats()["failed"] == 1
+
+    @patch("pipeline.gemini_executor.time.sleep")
+    def test_gives_up_after_repeated_rate_limits(self, mock_sleep):
+        models = FakeModels(failures=[_rate_limit_error("1s")] * 10)
+        executor = _executor(models, max_rate_limit_retries=2)
+
+        assert executor.generate("hello") is None
+        assert models.calls == 3
+
+    @patch("pipeline.gemini_executor.time.sleep")
+    def test_requests_per_minute_bucket_spaces_calls(self, mock_sleep):
+        executor = _executor(FakeModels(), requests_per_minute=60, workers=1)
+
+        executor.map(["p"] * 10)
+
+        # 6-request burst, then 0.9 requests per second
+        waits = [call.args[0] for call in mock_sleep.call_args_list]
+        assert len(waits) == 4
+        assert max(waits) == pytest.approx(4 / 0.9, rel=0.05)
+
+    @patch("pipeline.gemini_executor.time.sleep")
+    def test_tokens_per_minute_bucket_waits_for_large_prompts(self, mock_sleep):
+        executor = _executor(FakeModels(), tokens_per_minute=10_000)
+        prompt = "x" * 4000
+
+        executor.generate(prompt)
+
+        tokens = estimate_tokens(prompt) + 512
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args.args[0] == pytest.approx((tokens - 1000) / 150, rel=0.05)
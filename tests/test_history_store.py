@@ -0,0 +1,99 @@
+"""Tests for history_store module."""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from pipeline.history_store import HistoryStore
+
+
+def _video(video_id, channel_name="Ch1", days_ago=0, **fields):
+    published = (datetime.now(timezone.utc) - timedelta(days=days_ago)).isoformat()
+    return {"id": video_id, "title": f"Video {video_id}", "publishedAt": published, "duration": None,
+            "thumbnailUrl": "", "videoUrl": "", "summary": f"Summary {video_id}", "transcriptAvailable": True,
+            "channelName": channel_name, "channelUrl": f"https://www.youtube.com/@{channel_name}", **fields}
+
+
+class TestHistoryStore:
+    def test_upsert_and_lookup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = HistoryStore(os.path.join(tmp, "cache", "history.sqlite"))
+            video = _video("v1")
+            history.upsert_videos([video, _video("v2")])
+
+            assert "v1" in history
+            assert "v3" not in history
+            assert len(history) == 2
+            assert history.get_videos(["v1", "v3"]) == {"v1": video}
+
+    def test_upsert_replaces_existing_video(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+            history.upsert_videos([_video("v1", summary="Summary generation failed")])
+            history.upsert_videos([_video("v1", summary="Real summary")])
+
+            assert len(history) == 1
+            assert history.get_videos(["v1"])["v1"]["summary"] == "Real summary"
+
+    def test_videos_since_orders_for_display(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+            history.upsert_videos([
+                _video("old", days_ago=30),
+                _video("b1", "Beta", days_ago=1),
+                _video("a1", "Alpha", days_ago=1),
+                _video("b0", "Beta", days_ago=0),
+            ])
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d")
+
+            assert [v["id"] for v in history.videos_since(cutoff)] == ["b0", "a1", "b1"]
+
+    def test_persists_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.sqlite")
+            history = HistoryStore(path)
+            history.upsert_videos([_video("v1")])
+            history.save_digests([{"date": "2026-02-20", "dailyDigest": "Digest"}, {"date": "2026-02-21"}])
+            entry = {"state": "done", "attempts": 0, "nextEligible": 0, "publishedAt": ""}
+            history.save_work({"v1": entry})
+            history.close()
+
+            reopened = HistoryStore(path)
+            assert "v1" in reopened
+            assert reopened.digests_since("2026-01-01") == {"2026-02-20": "Digest"}
+            assert reopened.load_work() == {"v1": entry}
+
+    def test_records_last_export(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.sqlite")
+            history = HistoryStore(path)
+            assert history.last_export() is None
+            history.record_export("2026-02-26T08:00:00Z")
+            history.close()
+
+            assert HistoryStore(path).last_export() == "2026-02-26T08:00:00Z"
+
+    def test_import_data_restores_channel_fields(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+            video = {k: v for k, v in _video("v1").items() if k not in ("channelName", "channelUrl")}
+            history.import_data({"days": [{
+                "date": video["publishedAt"][:10],
+                "dailyDigest": "Digest",
+                "channels": [{"channelName": "Ch1", "channelUrl": "https://www.youtube.com/@Ch1", "videos": [video]}],
+            }]})
+
+            stored = history.get_videos(["v1"])["v1"]
+            assert stored["channelName"] == "Ch1"
+            assert stored["channelUrl"] == "https://www.youtube.com/@Ch1"
+            assert history.digests_since("2000-01-01") == {video["publishedAt"][:10]: "Digest"}
+
+    def test_prune_drops_videos_past_retention(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+            history.upsert_videos([_video("recent", days_ago=10), _video("old", days_ago=400)])
+
+            history.prune(retention_days=365)
+
+            assert "recent" in history
+            assert "old" not in history
@@ -0,0 +1,59 @@
+"""Tests for http_client module."""
+
+import asyncio
+
+from pipeline import http_client
+from tests.feed_server import FeedServer
+
+
+def _feed_url(server, channel_id="UC_http_test"):
+    return server.url_template.format(channel_id=channel_id)
+
+
+class TestSharedSession:
+    def setup_method(self):
+        http_client.reset_stats()
+
+    def test_session_is_shared_and_sized(self):
+        http_client.configure(pool_size=16)
+        session = http_client.get_session()
+        assert http_client.get_session() is session
+        assert session.get_adapter("https://www.youtube.com")._pool_maxsize == 16
+
+    def test_new_session_is_independent(self):
+        assert http_client.new_session() is not http_client.get_session()
+
+    def test_get_records_per_host_counters(self):
+        with FeedServer(entries=1) as server:
+            first = http_client.get(_feed_url(server))
+            http_client.get(_feed_url(server), headers={"Accept": "application/atom+xml"})
+        host = first.url.split("/")[2]
+        stats = http_client.stats()[host]
+        assert stats["requests"] == 2
+        assert stats["bytes"] == 2 * len(first.content)
+
+    def test_default_headers_sent(self):
+        with FeedServer(entries=1) as server:
+            response = http_client.get(_feed_url(server))
+        assert response.request.headers["User-Agent"] == http_client.DEFAULT_HEADERS["User-Agent"]
+
+    def test_streamed_bytes_recorded_separately(self):
+        with FeedServer(entries=1) as server:
+            response = http_client.get(_feed_url(server), stream=True)
+            body = response.raw.read()
+            response.close()
+            http_client.record(response.url, len(body), count=0)
+        stats = http_client.stats()[response.url.split("/")[2]]
+        assert stats["requests"] == 1
+        assert stats["bytes"] == len(body)
+
+    def test_async_client_records_counters(self):
+        async def fetch(url):
+            async with http_client.async_client(concurrency=2) as client:
+                return await client.get(url)
+
+        with FeedServer(entries=1) as server:
+            response = asyncio.run(fetch(_feed_url(server)))
+        stats = http_client.stats()[str(response.url).split("/")[2]]
+        assert stats["requests"] == 1
+        assert stats["bytes"] == len(response.content)
@@ -0,0 +1,38 @@
+"""Tests for rate_limiter module."""
+
+from unittest.mock import patch
+
+import pytest
+
+from pipeline.rate_limiter import TokenBucket, HostRateLimiter
+
+
+class TestTokenBucket:
+    @patch("pipeline.rate_limiter.time.monotonic", return_value=100.0)
+    def test_reservations_queue_up_when_empty(self, mock_time):
+        bucket = TokenBucket(rate=2, capacity=1)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    @patch("pipeline.rate_limiter.time.monotonic")
+    def test_refills_over_time_up_to_capacity(self, mock_time):
+        mock_time.return_value = 100.0
+        bucket = TokenBucket(rate=1, capacity=2)
+        bucket.reserve(2)
+        mock_time.return_value = 110.0
+        assert bucket.reserve(2) == 0
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestHostRateLimiter:
+    @patch("pipeline.rate_limiter.time.monotonic", return_value=100.0)
+    def test_buckets_are_per_host(self, mock_time):
+        limiter = HostRateLimiter(rate=1)
+        assert limiter.reserve("https://www.youtube.com/@A") == 0
+        assert limiter.reserve("https://example.com/feed") == 0
+        assert limiter.reserve("https://WWW.youtube.com/@B") == pytest.approx(1.0)
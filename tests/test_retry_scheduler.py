@@ -0,0 +1,59 @@
+"""Tests for retry_scheduler module."""
+
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from pipeline.retry_scheduler import RetryScheduler, parse_retry_after
+
+
+class TestParseRetryAfter:
+    def test_delta_seconds(self):
+        assert parse_retry_after("120") == 120
+
+    def test_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=60)
+        assert parse_retry_after(format_datetime(when, usegmt=True)) == pytest.approx(60, abs=2)
+
+    def test_missing_or_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestRetryScheduler:
+    @patch("pipeline.retry_scheduler.random.uniform", side_effect=lambda a, b: b)
+    def test_exponential_backoff_capped(self, mock_uniform):
+        scheduler = RetryScheduler(max_retries=5, base_delay=10, max_delay=30)
+        assert [scheduler.delay_for(n) for n in range(1, 5)] == [10, 20, 30, 30]
+
+    @patch("pipeline.retry_scheduler.random.uniform", side_effect=lambda a, b: a)
+    def test_jitter_keeps_at_least_half_the_delay(self, mock_uniform):
+        scheduler = RetryScheduler(base_delay=10)
+        assert scheduler.delay_for(1) == 5
+
+    def test_retry_after_raises_delay(self):
+        scheduler = RetryScheduler(base_delay=1)
+        assert scheduler.delay_for(1, retry_after=90) == 90
+
+    def test_gives_up_after_max_retries(self):
+        scheduler = RetryScheduler(max_retries=2, base_delay=0)
+        assert scheduler.delay_for(2) is not None
+        assert scheduler.delay_for(3) is None
+
+    def test_gives_up_past_deadline(self):
+        scheduler = RetryScheduler(base_delay=60, deadline=time.monotonic() + 10)
+        assert scheduler.add("feed", 1) is None
+        assert len(scheduler) == 0
+
+    def test_queue_orders_by_due_time(self):
+        scheduler = RetryScheduler(base_delay=0)
+        scheduler.add("a", 1, retry_after=100)
+        scheduler.add("b", 1)
+        assert scheduler.pop_due() == [("b", 1)]
+        wait, item, failures = scheduler.pop_next()
+        assert item == "a"
+        assert 99 < wait <= 100
+        assert len(scheduler) == 0
@@ -1,9 +1,15 @@
 """Tests for rss_fetcher module."""
 
+import os
+import tempfile
 from datetime import datetime, timedelta, timezone
 from unittest.mock import patch, MagicMock, call
 
-from pipeline.rss_fetcher import fetch_videos, _fetch_channel_feed
+import pytest
+
+from pipeline.rss_fetcher import fetch_videos, _fetch_channel_feed, FeedCache
+from pipeline.video import Video
+from tests.feed_server import FeedServer, synthetic_feed
 
 
 def _make_entry(video_id, title, published_dt):
@@ -46,7 +52,7 @@ def _mock_feed(entries):
 
 class TestFetchChannelFeed:
     @patch("pipeline.rss_fetcher.feedparser.parse")
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_returns_videos_on_success(self, mock_get, mock_parse):
         mock_get.return_value = _mock_response(200)
         now = datetime.now(timezone.utc)
@@ -59,14 +65,30 @@ class TestFetchChannelFeed:
         assert len(result) == 1
         assert result[0]["id"] == "vid1"
 
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.rss_fetcher.feedparser.parse")
+    @patch("pipeline.http_client.get")
+    def test_youtube_feed_uses_fast_parser(self, mock_get, mock_parse):
+        resp = _mock_response(200)
+        resp.content = synthetic_feed("UC_test123456789012345", entries=20)
+        mock_get.return_value = resp
+        cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+
+        result = _fetch_channel_feed(_make_channel(), cutoff)
+
+        mock_parse.assert_not_called()
+        assert len(result) == 16  # entries are 11h apart
+        assert result[0]["id"] == "012345v0000"
+        assert result[0]["videoUrl"] == "https://www.youtube.com/watch?v=012345v0000"
+        assert result[0]["channelName"] == "TestChannel"
+
+    @patch("pipeline.http_client.get")
     def test_returns_none_on_http_error(self, mock_get):
         mock_get.return_value = _mock_response(404)
         cutoff = datetime.now(timezone.utc) - timedelta(days=7)
         result = _fetch_channel_feed(_make_channel(), cutoff)
         assert result is None
 
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_returns_none_on_exception(self, mock_get):
         mock_get.side_effect = Exception("Network error")
         cutoff = datetime.now(timezone.utc) - timedelta(days=7)
@@ -77,7 +99,7 @@ class TestFetchChannelFeed:
 class TestFetchVideos:
     @patch("pipeline.rss_fetcher.time.sleep")
     @patch("pipeline.rss_fetcher.feedparser.parse")
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_returns_recent_videos(self, mock_get, mock_parse, mock_sleep):
         mock_get.return_value = _mock_response(200)
         now = datetime.now(timezone.utc)
@@ -94,7 +116,7 @@ class TestFetchVideos:
 
     @patch("pipeline.rss_fetcher.time.sleep")
     @patch("pipeline.rss_fetcher.feedparser.parse")
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_filters_old_videos(self, mock_get, mock_parse, mock_sleep):
         mock_get.return_value = _mock_response(200)
         now = datetime.now(timezone.utc)
@@ -108,7 +130,7 @@ class TestFetchVideos:
         assert result[0]["id"] == "new"
 
     @patch("pipeline.rss_fetcher.time.sleep")
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_channel_error_retries_then_fails(self, mock_get, mock_sleep):
         """A channel that always errors should be retried 3 times then skipped."""
         mock_get.side_effect = Exception("Network error")
@@ -119,7 +141,7 @@ class TestFetchVideos:
 
     @patch("pipeline.rss_fetcher.time.sleep")
     @patch("pipeline.rss_fetcher.feedparser.parse")
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_retry_succeeds_on_second_attempt(self, mock_get, mock_parse, mock_sleep):
         """A channel that fails initially but succeeds on retry."""
         now = datetime.now(timezone.utc)
@@ -138,7 +160,7 @@ class TestFetchVideos:
 
     @patch("pipeline.rss_fetcher.time.sleep")
     @patch("pipeline.rss_fetcher.feedparser.parse")
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_video_metadata_fields(self, mock_get, mock_parse, mock_sleep):
         mock_get.return_value = _mock_response(200)
         now = datetime.now(timezone.utc)
@@ -156,7 +178,7 @@ class TestFetchVideos:
 
     @patch("pipeline.rss_fetcher.time.sleep")
     @patch("pipeline.rss_fetcher.feedparser.parse")
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_multiple_channels(self, mock_get, mock_parse, mock_sleep):
         mock_get.return_value = _mock_response(200)
         now = datetime.now(timezone.utc)
@@ -167,7 +189,7 @@ class TestFetchVideos:
         assert len(result) == 2
 
     @patch("pipeline.rss_fetcher.time.sleep")
-    @patch("pipeline.rss_fetcher.requests.get")
+    @patch("pipeline.http_client.get")
     def test_http_error_retried(self, mock_get, mock_sleep):
         """When RSS returns non-200, the channel should be retried."""
         mock_get.return_value = _mock_response(404)
@@ -176,3 +198,208 @@ class TestFetchVideos:
         assert len(result) == 0
         # 1 initial + 3 retries = 4 total calls
         assert mock_get.call_count == 4
+
+
+class TestRetryScheduling:
+    @patch("pipeline.rss_fetcher.time.sleep")
+    @patch("pipeline.rss_fetcher.feedparser.parse")
+    @patch("pipeline.http_client.get")
+    def test_due_retry_runs_before_remaining_channels(self, mock_get, mock_parse, mock_sleep):
+        now = datetime.now(timezone.utc)
+        mock_parse.return_value = _mock_feed([_make_entry("v1", "Video 1", now)])
+        mock_get.side_effect = [_mock_response(500), _mock_response(200), _mock_response(200)]
+        channels = [_make_channel("A", "UC_a"), _make_channel("B", "UC_b")]
+
+        result = fetch_videos(channels, days_to_show=7, retry_base_delay=0)
+
+        requested = [c.args[0].split("=")[-1] for c in mock_get.call_args_list]
+        assert requested == ["UC_a", "UC_a", "UC_b"]
+        assert [v["channelName"] for v in result] == ["A", "B"]
+
+    @patch("pipeline.rss_fetcher.time.sleep")
+    @patch("pipeline.http_client.get")
+    def test_deadline_abandons_retries(self, mock_get, mock_sleep):
+        mock_get.return_value = _mock_response(500)
+        result = fetch_videos([_make_channel()], days_to_show=7, retry_deadline=0)
+        assert result == []
+        assert mock_get.call_count == 1
+
+    @patch("pipeline.rss_fetcher.time.sleep")
+    @patch("pipeline.rss_fetcher.feedparser.parse")
+    @patch("pipeline.http_client.get")
+    def test_honors_retry_after(self, mock_get, mock_parse, mock_sleep):
+        now = datetime.now(timezone.utc)
+        mock_parse.return_value = _mock_feed([_make_entry("v1", "Video 1", now)])
+        throttled = _mock_response(429)
+        throttled.headers = {"Retry-After": "120"}
+        mock_get.side_effect = [throttled, _mock_response(200)]
+
+        result = fetch_videos([_make_channel()], days_to_show=7, retry_base_delay=1)
+
+        assert len(result) == 1
+        assert max(c.args[0] for c in mock_sleep.call_args_list) >= 119
+
+
+class TestFeedCache:
+    def _cache(self):
+        return FeedCache(os.path.join(tempfile.mkdtemp(), "feeds.json"))
+
+    def _response(self, status_code, content=b"<xml>feed</xml>", headers=None):
+        resp = _mock_response(status_code)
+        resp.content = content
+        resp.headers = headers or {}
+        return resp
+
+    @patch("pipeline.rss_fetcher.feedparser.parse")
+    @patch("pipeline.http_client.get")
+    def test_not_modified_reuses_cached_entries(self, mock_get, mock_parse):
+        now = datetime.now(timezone.utc)
+        mock_parse.return_value = _mock_feed([_make_entry("vid1", "Video 1", now)])
+        cutoff = now - timedelta(days=7)
+        cache = self._cache()
+
+        mock_get.return_value = self._response(200, headers={"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2026 00:00:00 GMT"})
+        _fetch_channel_feed(_make_channel(), cutoff, cache)
+
+        mock_get.return_value = self._response(304, content=b"")
+        result = _fetch_channel_feed(_make_channel(), cutoff, cache)
+
+        sent_headers = mock_get.call_args.kwargs["headers"]
+        assert sent_headers["If-None-Match"] == '"abc"'
+        assert sent_headers["If-Modified-Since"] == "Mon, 01 Jan 2026 00:00:00 GMT"
+        assert [v["id"] for v in result] == ["vid1"]
+        assert mock_parse.call_count == 1
+        assert cache.not_modified == 1
+
+    @patch("pipeline.rss_fetcher.feedparser.parse")
+    @patch("pipeline.http_client.get")
+    def test_unchanged_body_without_validators_skips_parse(self, mock_get, mock_parse):
+        now = datetime.now(timezone.utc)
+        mock_parse.return_value = _mock_feed([_make_entry("vid1", "Video 1", now)])
+        mock_get.return_value = self._response(200)
+        cache = self._cache()
+        cutoff = now - timedelta(days=7)
+
+        _fetch_channel_feed(_make_channel(), cutoff, cache)
+        result = _fetch_channel_feed(_make_channel(), cutoff, cache)
+
+        assert [v["id"] for v in result] == ["vid1"]
+        assert mock_parse.call_count == 1
+        assert cache.unchanged == 1
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+
+    @patch("pipeline.rss_fetcher.feedparser.parse")
+    @patch("pipeline.http_client.get")
+    def test_cached_entries_are_refiltered_by_cutoff(self, mock_get, mock_parse):
+        now = datetime.now(timezone.utc)
+        mock_parse.return_value = _mock_feed([
+            _make_entry("new", "New", now - timedelta(days=1)),
+            _make_entry("old", "Old", now - timedelta(days=5)),
+        ])
+        mock_get.return_value = self._response(200, headers={"ETag": '"v1"'})
+        cache = self._cache()
+        _fetch_channel_feed(_make_channel(), now - timedelta(days=7), cache)
+
+        mock_get.return_value = self._response(304, content=b"")
+        result = _fetch_channel_feed(_make_channel(), now - timedelta(days=3), cache)
+        assert [v["id"] for v in result] == ["new"]
+
+    @patch("pipeline.http_client.get")
+    def test_widened_cutoff_refetches_entries_older_than_first_parse(self, mock_get):
+        content = synthetic_feed("UC_test123456789012345", entries=15)
+        cache = self._cache()
+        now = datetime.now(timezone.utc)
+        mock_get.return_value = self._response(200, content=content, headers={"ETag": '"v1"'})
+        first = _fetch_channel_feed(_make_channel(), now - timedelta(days=2), cache)
+        assert mock_get.call_args.kwargs["headers"].get("If-None-Match") is None
+
+        # The cached entries stop at the old cutoff: fetch unconditionally and parse again
+        widened = now - timedelta(days=7)
+        refetched = _fetch_channel_feed(_make_channel(), widened, cache)
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+
+        mock_get.return_value = self._response(304, content=b"")
+        not_modified = _fetch_channel_feed(_make_channel(), widened, cache)
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+        mock_get.return_value = self._response(200, content=content)
+        uncached = _fetch_channel_feed(_make_channel(), widened)
+
+        assert len(first) < len(uncached) == 15
+        assert refetched == not_modified == uncached
+        assert (cache.parsed, cache.not_modified) == (2, 1)
+
+    @patch("pipeline.http_client.get")
+    def test_narrower_cutoff_reuses_entries(self, mock_get):
+        content = synthetic_feed("UC_test123456789012345", entries=15)
+        cache = self._cache()
+        now = datetime.now(timezone.utc)
+        mock_get.return_value = self._response(200, content=content)
+        _fetch_channel_feed(_make_channel(), now - timedelta(days=7), cache)
+        result = _fetch_channel_feed(_make_channel(), now - timedelta(days=2), cache)
+
+        assert len(result) == 5
+        assert cache.unchanged == 1
+        assert cache.parse_cutoff("UC_test123456789012345") < now - timedelta(days=6)
+
+    @patch("pipeline.rss_fetcher.time.sleep")
+    @patch("pipeline.rss_fetcher.feedparser.parse")
+    @patch("pipeline.http_client.get")
+    def test_fetch_videos_persists_cache_and_reports_stats(self, mock_get, mock_parse, mock_sleep):
+        now = datetime.now(timezone.utc)
+        mock_parse.return_value = _mock_feed([_make_entry("vid1", "Video 1", now)])
+        mock_get.return_value = self._response(200, headers={"ETag": '"abc"'})
+        cache = self._cache()
+        stats = {}
+
+        fetch_videos([_make_channel()], days_to_show=7, feed_cache=cache, stats=stats)
+
+        assert stats["parsed"] == 1
+        reloaded = FeedCache(cache.path)
+        assert reloaded.request_headers("UC_test123456789012345") == {"If-None-Match": '"abc"'}
+        assert reloaded.cached_videos("UC_test123456789012345") == cache.cached_videos("UC_test123456789012345")
+        assert all(isinstance(v, Video) for v in reloaded.cached_videos("UC_test123456789012345"))
+
+
+class TestAsyncEngine:
+    def _channels(self, count):
+        return [_make_channel(f"Ch{i}", f"UC_async_{i:015d}") for i in range(count)]
+
+    def test_matches_sequential_output_against_local_server(self):
+        channels = self._channels(4)
+        with FeedServer(entries=5) as server, \
+                patch("pipeline.rss_fetcher.RSS_URL_TEMPLATE", server.url_template), \
+                patch("pipeline.rss_fetcher._REQUEST_DELAY", 0.01):
+            sequential = fetch_videos(channels, days_to_show=7)
+            concurrent = fetch_videos(channels, days_to_show=7, engine="async",
+                                      concurrency=4, requests_per_second=100)
+        assert len(concurrent) == 20
+        assert [v["id"] for v in concurrent] == [v["id"] for v in sequential]
+        assert concurrent[0]["channelName"] == "Ch0"
+
+    @patch("pipeline.rss_fetcher.time.sleep")
+    def test_failed_feeds_are_retried(self, mock_sleep):
+        channels = self._channels(2)
+        with FeedServer(entries=1) as server, \
+                patch("pipeline.rss_fetcher.RSS_URL_TEMPLATE", server.url_template), \
+                patch("pipeline.rss_fetcher._parse_feed", return_value=None):
+            result = fetch_videos(channels, days_to_show=7, engine="async", requests_per_second=1000,
+                                  retry_base_delay=0.01)
+        assert result == []
+        # 2 channels x (1 initial + 3 retries)
+        assert server.requests == 8
+
+    def test_conditional_requests_with_feed_cache(self):
+        channels = self._channels(3)
+        cache = FeedCache(os.path.join(tempfile.mkdtemp(), "feeds.json"))
+        with FeedServer(entries=2, etags=True) as server, \
+                patch("pipeline.rss_fetcher.RSS_URL_TEMPLATE", server.url_template):
+            first = fetch_videos(channels, days_to_show=7, engine="async",
+                                 requests_per_second=1000, feed_cache=cache)
+            second = fetch_videos(channels, days_to_show=7, engine="async",
+                                  requests_per_second=1000, feed_cache=cache)
+        assert server.not_modified == 3
+        assert [v["id"] for v in second] == [v["id"] for v in first]
+
+    def test_unknown_engine_raises(self):
+        with pytest.raises(ValueError, match="engine"):
+            fetch_videos([_make_channel()], days_to_show=7, engine="threads")
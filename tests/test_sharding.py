@@ -0,0 +1,108 @@
+"""Tests for sharding module and sharded pipeline runs."""
+
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import pytest
+
+from pipeline import main, sharding
+
+
+def _urls(count):
+    return [f"https://www.youtube.com/@channel{i}" for i in range(count)]
+
+
+def _video(video_id, channel_name):
+    return {
+        "id": video_id,
+        "title": f"Video {video_id}",
+        "publishedAt": datetime.now(timezone.utc).isoformat(),
+        "duration": None,
+        "thumbnailUrl": "",
+        "videoUrl": "",
+        "channelName": channel_name,
+        "channelUrl": f"https://www.youtube.com/@{channel_name}",
+    }
+
+
+class TestPartition:
+    def test_assignment_is_stable(self):
+        assert sharding.shard_of("https://www.youtube.com/@ColeMedin", 4) == \
+            sharding.shard_of("https://www.youtube.com/@ColeMedin", 4)
+        assert sharding.shard_of("https://www.youtube.com/@ColeMedin", 4) == 0
+
+    def test_partition_covers_all_urls_in_order(self):
+        urls = _urls(50)
+        shards = sharding.partition(urls, 3)
+        assert sorted(u for shard in shards for u in shard) == sorted(urls)
+        for shard in shards:
+            assert shard == [u for u in urls if u in shard]
+        assert all(shards)
+
+    def test_adding_a_channel_does_not_move_others(self):
+        before = sharding.partition(_urls(20), 4)
+        after = sharding.partition(_urls(21), 4)
+        for old, new in zip(before, after):
+            assert old == [u for u in new if u in old]
+
+    def test_shard_config_uses_own_cache_dir(self):
+        config = {"channels": _urls(10), "cache": {"dir": ".cache"}}
+        sharded = sharding.shard_config(config, 1, 2)
+        assert sharded["channels"] == sharding.partition(config["channels"], 2)[1]
+        assert sharded["cache"]["dir"] == os.path.join(".cache", "shard-1-of-2")
+        assert config["cache"]["dir"] == ".cache"
+
+    def test_shard_config_splits_request_rates(self):
+        config = {"channels": _urls(10), "resolver": {"workers": 4, "requestsPerSecond": 2}, "rss": {}}
+        sharded = sharding.shard_config(config, 0, 4)
+        assert sharded["resolver"] == {"workers": 4, "requestsPerSecond": 0.5}
+        assert sharded["rss"]["requestsPerSecond"] == 0.25
+        assert config["resolver"]["requestsPerSecond"] == 2
+
+
+class TestShardResults:
+    def test_missing_shard_raises(self):
+        shard_dir = tempfile.mkdtemp()
+        urls = _urls(4)
+        shards = sharding.partition(urls, 2)
+        sharding.write_shard_result(shard_dir, 0, 2, shards[0], len(shards[0]), [], {})
+        with pytest.raises(ValueError, match="Missing"):
+            sharding.load_shard_results(shard_dir, 2, urls)
+
+    def test_result_for_other_channels_raises(self):
+        shard_dir = tempfile.mkdtemp()
+        sharding.write_shard_result(shard_dir, 0, 1, ["https://www.youtube.com/@old"], 1, [], {})
+        with pytest.raises(ValueError, match="does not match"):
+            sharding.load_shard_results(shard_dir, 1, _urls(2))
+
+
+class TestMergeShards:
+    def test_merges_partial_results_into_data_json(self):
+        work_dir = tempfile.mkdtemp()
+        urls = _urls(6)
+        config_path = os.path.join(work_dir, "config.json")
+        data_path = os.path.join(work_dir, "data.json")
+        with open(config_path, "w") as f:
+            json.dump({
+                "ai": {"provider": "gemini", "model": "gemini-2.0-flash", "apiKeyEnvVar": "GEMINI_API_KEY"},
+                "display": {"daysToShow": 7},
+                "cache": {"dir": os.path.join(work_dir, "cache")},
+                "channels": urls,
+            }, f)
+
+        shard_dir = os.path.join(work_dir, "shards")
+        for index, shard_urls in enumerate(sharding.partition(urls, 3)):
+            videos = [_video(f"v{index}", f"channel{index}")]
+            status = {"status": "partial", "issues": [f"issue from shard {index}"]}
+            sharding.write_shard_result(shard_dir, index, 3, shard_urls, len(shard_urls), videos, status)
+
+        main.main(["--config", config_path, "--data", data_path,
+                   "--shard-count", "3", "--shard-dir", shard_dir, "--merge-shards"])
+
+        with open(data_path) as f:
+            data = json.load(f)
+        ids = {v["id"] for d in data["days"] for ch in d["channels"] for v in ch["videos"]}
+        assert ids == {"v0", "v1", "v2"}
+        assert len(data["pipelineStatus"]["issues"]) == 3
@@ -1,9 +1,17 @@
 """Tests for summarizer module."""
 
+import json
+import os
+import tempfile
 from unittest.mock import patch, Mock, MagicMock
 
+from pipeline.gemini_executor import GeminiExecutor
+from pipeline.summary_cache import SummaryCache
 from pipeline.summarizer import (
+    split_transcript,
+    summarize_long_transcript,
     summarize_video,
+    summarize_videos,
     generate_daily_digest,
     init_client,
     FAILURE_MESSAGE,
@@ -86,3 +94,242 @@ class TestGenerateDailyDigest:
         assert "2026-02-26" in prompt
         assert "Summary A" in prompt
         assert "Summary B" in prompt
+
+    @patch("pipeline.gemini_executor.time.sleep")
+    def test_executor_failure_returns_fallback(self, mock_sleep):
+        client = MagicMock()
+        client.models.generate_content.side_effect = Exception("boom")
+        executor = GeminiExecutor(client, "m", requests_per_minute=10_000, max_retries=2)
+
+        result = generate_daily_digest(client, "m", "2026-02-26", ["A"], executor=executor)
+
+        assert result == FAILURE_MESSAGE
+        assert executor.stats()["errors"] == 2
+
+
+def _videos(count, words=10):
+    return [{"id": f"vid{i}", "transcript": " ".join(["word"] * words)} for i in range(count)]
+
+
+def _batch_reply(prompt):
+    """Answer a batch prompt with a summary for every video it contains."""
+    ids = [line.split()[2] for line in prompt.splitlines() if line.startswith("=== Video ")]
+    return Mock(text=json.dumps([{"videoId": i, "summary": f"\u2022 about {i}"} for i in ids]))
+
+
+class TestSummarizeVideos:
+    def test_packs_videos_into_one_request(self):
+        client = MagicMock()
+        client.models.generate_content.side_effect = lambda model, contents, **kw: _batch_reply(contents)
+        stats = {}
+
+        result = summarize_videos(client, "gemini-2.0-flash", _videos(5), stats=stats)
+
+        assert result == {f"vid{i}": f"\u2022 about vid{i}" for i in range(5)}
+        assert client.models.generate_content.call_count == 1
+        kwargs = client.models.generate_content.call_args.kwargs
+        assert kwargs["config"]["response_mime_type"] == "application/json"
+        assert stats == {"videos": 5, "cached": 0, "batches": 1, "longTranscripts": 0,
+                         "requests": 1, "fallbacks": 0}
+
+    def test_splits_batches_by_token_budget_and_size(self):
+        client = MagicMock()
+        client.models.generate_content.side_effect = lambda model, contents, **kw: _batch_reply(contents)
+
+        summarize_videos(client, "m", _videos(6, words=100), max_batch_tokens=300)
+        assert client.models.generate_content.call_count == 3
+
+        client.models.generate_content.reset_mock()
+        summarize_videos(client, "m", _videos(6), max_batch_size=4)
+        assert client.models.generate_content.call_count == 2
+
+    def test_single_video_uses_plain_prompt(self):
+        client = MagicMock()
+        client.models.generate_content.return_value = Mock(text="\u2022 solo")
+
+        assert summarize_videos(client, "m", _videos(1)) == {"vid0": "\u2022 solo"}
+        assert "config" not in client.models.generate_content.call_args.kwargs
+
+    def test_missing_and_malformed_items_fall_back_per_video(self):
+        client = MagicMock()
+        batch = Mock(text=json.dumps([
+            {"videoId": "vid0", "summary": "\u2022 zero"},
+            {"videoId": "vid1", "summary": ""},
+            {"videoId": "unknown", "summary": "\u2022 stray"},
+        ]))
+        client.models.generate_content.side_effect = [batch, Mock(text="\u2022 one"), Mock(text="\u2022 two")]
+        stats = {}
+
+        result = summarize_videos(client, "m", _videos(3), stats=stats)
+
+        assert result == {"vid0": "\u2022 zero", "vid1": "\u2022 one", "vid2": "\u2022 two"}
+        assert stats["fallbacks"] == 2
+        assert stats["requests"] == 3
+
+    def test_invalid_json_falls_back_for_whole_batch(self):
+        client = MagicMock()
+        client.models.generate_content.side_effect = [Mock(text="not json"), Mock(text="a"), Mock(text="b")]
+
+        assert summarize_videos(client, "m", _videos(2)) == {"vid0": "a", "vid1": "b"}
+
+    @patch("pipeline.summarizer.time.sleep")
+    def test_failed_batch_marks_videos_failed_without_fallback(self, mock_sleep):
+        client = MagicMock()
+        client.models.generate_content.side_effect = Exception("quota")
+
+        result = summarize_videos(client, "m", _videos(3))
+
+        assert result == {f"vid{i}": FAILURE_MESSAGE for i in range(3)}
+        assert client.models.generate_content.call_count == 3
+
+    def test_executor_runs_batches_concurrently(self):
+        client = MagicMock()
+        client.models.generate_content.side_effect = lambda model, contents, **kw: _batch_reply(contents)
+        executor = GeminiExecutor(client, "m", requests_per_minute=10_000, workers=3)
+
+        result = summarize_videos(client, "m", _videos(9), max_batch_size=3, executor=executor)
+
+        assert len(result) == 9
+        assert executor.stats()["requests"] == 3
+
+    @patch("pipeline.gemini_executor.time.sleep")
+    def test_executor_failures_become_failure_message(self, mock_sleep):
+        client = MagicMock()
+        client.models.generate_content.side_effect = Exception("down")
+        executor = GeminiExecutor(client, "m", requests_per_minute=10_000)
+
+        result = summarize_videos(client, "m", _videos(2), executor=executor)
+
+        assert result == {"vid0": FAILURE_MESSAGE, "vid1": FAILURE_MESSAGE}
+
+
+class TestSummaryCaching:
+    def test_identical_transcript_hits_api_once(self):
+        client = MagicMock()
+        client.models.generate_content.return_value = Mock(text="\u2022 cached")
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SummaryCache(os.path.join(tmp, "summaries.json"))
+            assert summarize_video(client, "m", "transcript", cache=cache) == "\u2022 cached"
+            assert summarize_video(client, "m", "transcript", cache=cache) == "\u2022 cached"
+
+        assert client.models.generate_content.call_count == 1
+        assert cache.stats()["savedCalls"] == 1
+
+    def test_model_change_misses_cache(self):
+        client = MagicMock()
+        client.models.generate_content.return_value = Mock(text="summary")
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SummaryCache(os.path.join(tmp, "summaries.json"))
+            summarize_video(client, "model-a", "transcript", cache=cache)
+            summarize_video(client, "model-b", "transcript", cache=cache)
+
+        assert client.models.generate_content.call_count == 2
+
+    @patch("pipeline.summarizer.time.sleep")
+    def test_failures_are_not_cached(self, mock_sleep):
+        client = MagicMock()
+        client.models.generate_content.side_effect = Exception("down")
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SummaryCache(os.path.join(tmp, "summaries.json"))
+            assert summarize_video(client, "m", "transcript", cache=cache) == FAILURE_MESSAGE
+            assert cache.entries == {}
+
+    def test_batch_only_sends_uncached_videos(self):
+        client = MagicMock()
+        client.models.generate_content.side_effect = lambda model, contents, **kw: _batch_reply(contents)
+        videos = [{"id": f"vid{i}", "transcript": f"transcript {i}"} for i in range(4)]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SummaryCache(os.path.join(tmp, "summaries.json"))
+            summarize_videos(client, "m", videos[:2], cache=cache)
+            stats = {}
+            result = summarize_videos(client, "m", videos, cache=cache, stats=stats)
+
+        assert len(result) == 4
+        assert stats["cached"] == 2
+        last_prompt = client.models.generate_content.call_args.kwargs["contents"]
+        assert "transcript 0" not in last_prompt
+        assert "transcript 3" in last_prompt
+
+    def test_daily_digest_is_cached(self):
+        client = MagicMock()
+        client.models.generate_content.return_value = Mock(text="digest")
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SummaryCache(os.path.join(tmp, "summaries.json"))
+            generate_daily_digest(client, "m", "2026-02-26", ["A", "B"], cache=cache)
+            generate_daily_digest(client, "m", "2026-02-26", ["A", "B"], cache=cache)
+            generate_daily_digest(client, "m", "2026-02-26", ["A", "C"], cache=cache)
+
+        assert client.models.generate_content.call_count == 2
+
+
+def _map_reduce_reply(contents):
+    if contents.startswith("This is part"):
+        return Mock(text=f"\u2022 {contents.split()[3]}")  # "part N of M"
+    return Mock(text="\u2022 combined")
+
+
+class TestLongTranscripts:
+    def test_split_covers_text_with_overlap(self):
+        words = [f"w{i}" for i in range(2000)]
+        chunks = split_transcript(" ".join(words), chunk_tokens=500, overlap_tokens=50)
+
+        assert len(chunks) > 1
+        assert all(len(c) <= 500 * 4 for c in chunks)
+        assert chunks[0].split()[0] == "w0"
+        assert chunks[-1].split()[-1] == "w1999"
+        for previous, current in zip(chunks, chunks[1:]):
+            # Each chunk starts inside the previous one, on a word boundary
+            assert current.split()[0] in previous.split()
+            assert current.split()[0] != previous.split()[0]
+
+    def test_short_text_is_one_chunk(self):
+        assert split_transcript("just a few words", chunk_tokens=100) == ["just a few words"]
+
+    def test_map_reduce_summarizes_chunks_then_reduces(self):
+        client = MagicMock()
+        client.models.generate_content.side_effect = lambda model, contents, **kw: _map_reduce_reply(contents)
+        transcript = " ".join(["word"] * 4000)
+
+        result = summarize_long_transcript(client, "m", transcript, chunk_tokens=1000, workers=3)
+
+        prompts = [c.kwargs["contents"] for c in client.models.generate_content.call_args_list]
+        chunk_prompts = [p for p in prompts if p.startswith("This is part")]
+        assert result == "\u2022 combined"
+        assert len(chunk_prompts) == len(split_transcript(transcript, 1000))
+        assert "Part 1:\n\u2022 1" in prompts[-1]
+
+    @patch("pipeline.summarizer.time.sleep")
+    def test_failed_chunk_fails_the_video(self, mock_sleep):
+        client = MagicMock()
+
+        def reply(model, contents, **kw):
+            if contents.startswith("This is part 2"):
+                raise Exception("timeout")
+            return _map_reduce_reply(contents)
+
+        client.models.generate_content.side_effect = reply
+        transcript = " ".join(["word"] * 4000)
+
+        assert summarize_long_transcript(client, "m", transcript, chunk_tokens=1000) == FAILURE_MESSAGE
+        assert not any(c.kwargs["contents"].startswith("These are summaries")
+                       for c in client.models.generate_content.call_args_list)
+
+    def test_summarize_videos_routes_long_transcripts(self):
+        client = MagicMock()
+
+        def reply(model, contents, **kw):
+            if contents.startswith("Summarize each"):
+                return _batch_reply(contents)
+            return _map_reduce_reply(contents)
+
+        client.models.generate_content.side_effect = reply
+        videos = _videos(2) + [{"id": "long", "transcript": " ".join(["word"] * 4000)}]
+        stats = {}
+
+        result = summarize_videos(client, "m", videos, long_transcript_tokens=2000,
+                                  chunk_tokens=1000, stats=stats)
+
+        assert result["long"] == "\u2022 combined"
+        assert result["vid0"] == "\u2022 about vid0"
+        assert stats["longTranscripts"] == 1
+        assert stats["requests"] == client.models.generate_content.call_count
@@ -0,0 +1,56 @@
+"""Tests for summary_cache module."""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+from pipeline.summary_cache import SummaryCache
+
+
+class TestSummaryCache:
+    def test_round_trip_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "summaries.json")
+            cache = SummaryCache(path)
+            cache.put("gemini", "template {x}", "input", "output")
+            cache.save()
+
+            assert SummaryCache(path).get("gemini", "template {x}", "input") == "output"
+
+    def test_key_covers_model_template_and_input(self):
+        cache = SummaryCache("/nonexistent/summaries.json")
+        cache.put("gemini", "template", "input", "output")
+
+        assert cache.get("other-model", "template", "input") is None
+        assert cache.get("gemini", "new template", "input") is None
+        assert cache.get("gemini", "template", "other input") is None
+        assert cache.get("gemini", "template", "input") == "output"
+        assert cache.stats() == {"hits": 1, "misses": 3, "hitRate": 0.25, "savedCalls": 1, "entries": 1}
+
+    @patch("pipeline.summary_cache.time.time")
+    def test_expired_entries_miss_and_are_pruned(self, mock_time):
+        mock_time.return_value = 1_000_000
+        cache = SummaryCache("/nonexistent/summaries.json", max_age_days=1)
+        cache.put("m", "t", "old", "x")
+        mock_time.return_value += 2 * 86400
+        cache.put("m", "t", "new", "y")
+
+        assert cache.get("m", "t", "old") is None
+        cache.prune()
+        assert len(cache.entries) == 1
+
+    @patch("pipeline.summary_cache.time.time")
+    def test_prune_keeps_most_recently_used(self, mock_time):
+        mock_time.return_value = 1_000_000
+        cache = SummaryCache("/nonexistent/summaries.json", max_entries=2)
+        for i in range(3):
+            mock_time.return_value += 1
+            cache.put("m", "t", f"in{i}", f"out{i}")
+        mock_time.return_value += 1
+        cache.get("m", "t", "in0")
+
+        cache.prune()
+
+        assert cache.get("m", "t", "in0") == "out0"
+        assert cache.get("m", "t", "in1") is None
+        assert cache.get("m", "t", "in2") == "out2"
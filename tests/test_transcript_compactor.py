@@ -0,0 +1,51 @@
+"""Tests for transcript_compactor module."""
+
+from pipeline.transcript_compactor import compact_transcript, compact_videos, trim_to_tokens
+
+
+class TestCompactTranscript:
+    def test_removes_annotations(self):
+        text = "[Music] welcome back (applause) to the show ♪ la la la ♪ today [Laughter] we start"
+        assert compact_transcript(text) == "welcome back to the show today we start"
+
+    def test_removes_filler_words(self):
+        assert compact_transcript("so um we uh built this, erm, thing") == "so we built this, thing"
+
+    def test_collapses_rolling_caption_overlap(self):
+        text = "hello everyone and welcome hello everyone and welcome to the channel to the channel"
+        assert compact_transcript(text) == "hello everyone and welcome to the channel"
+
+    def test_repeat_matching_ignores_case_and_punctuation(self):
+        assert compact_transcript("Let's get started. let's get started now") == "Let's get started. now"
+
+    def test_keeps_single_word_repetition(self):
+        assert compact_transcript("I know that that works") == "I know that that works"
+
+    def test_trims_to_max_tokens(self):
+        text = " ".join(f"w{i}" for i in range(1000))
+        result = compact_transcript(text, max_tokens=100)
+        assert len(result) <= 100 * 4
+        assert result.startswith("w0 ")
+        assert result.endswith(" w999")
+        assert " … " in result
+
+
+class TestTrimToTokens:
+    def test_short_text_unchanged(self):
+        assert trim_to_tokens("short text", 100) == "short text"
+
+
+class TestCompactVideos:
+    def test_compacts_in_place_and_reports_ratio(self):
+        videos = [
+            {"id": "a", "transcript": "[Music] um hello hello world hello world"},
+            {"id": "b", "transcript": None},
+        ]
+        stats = {}
+        compact_videos(videos, stats=stats)
+
+        assert videos[0]["transcript"] == "hello hello world"
+        assert videos[1]["transcript"] is None
+        assert stats["charsIn"] == 40
+        assert stats["charsOut"] == 17
+        assert stats["ratio"] == round(17 / 40, 3)
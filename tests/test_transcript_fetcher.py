@@ -1,9 +1,11 @@
 """Tests for transcript_fetcher module."""
 
+import time
 from unittest.mock import patch, MagicMock, Mock
 
 from youtube_transcript_api._errors import RequestBlocked
 
+from pipeline.proxy_pool import ProxyPool
 from pipeline.transcript_fetcher import fetch_transcripts
 
 
@@ -11,6 +13,14 @@ def _make_video(video_id):
     return {"id": video_id, "title": f"Video {video_id}"}
 
 
+def _transcript(text):
+    snippet = Mock()
+    snippet.text = text
+    transcript = Mock()
+    transcript.snippets = [snippet]
+    return transcript
+
+
 class TestFetchTranscripts:
     @patch("pipeline.transcript_fetcher._build_api")
     def test_successful_fetch(self, mock_build):
@@ -119,3 +129,121 @@ class TestFetchTranscripts:
             https_url="http://proxy:8080",
         )
         mock_api_cls.assert_called_once()
+
+
+class TestConcurrentFetch:
+    @patch("pipeline.transcript_fetcher._build_api")
+    def test_parallel_fields_match_sequential(self, mock_build):
+        api_instance = MagicMock()
+        mock_build.return_value = api_instance
+
+        def fetch(video_id):
+            if video_id == "bad":
+                raise ConnectionError("Temp")
+            return _transcript(f"text {video_id}")
+
+        api_instance.fetch.side_effect = fetch
+        ids = ["a", "bad", "b", "c", "d"]
+        sequential = fetch_transcripts([_make_video(i) for i in ids], max_retries=2, retry_delay=0)
+        parallel = fetch_transcripts([_make_video(i) for i in ids], max_retries=2, retry_delay=0, workers=3)
+
+        assert parallel == sequential
+        assert [v["id"] for v in parallel] == ids
+        assert parallel[1]["transcriptAvailable"] is False
+
+    @patch("pipeline.transcript_fetcher._build_api")
+    def test_ip_block_trips_breaker_for_all_workers(self, mock_build):
+        api_instance = MagicMock()
+        mock_build.return_value = api_instance
+
+        def fetch(video_id):
+            if video_id == "v0":
+                raise RequestBlocked(video_id)
+            time.sleep(0.05)
+            return _transcript("ok")
+
+        api_instance.fetch.side_effect = fetch
+        videos = [_make_video(f"v{i}") for i in range(20)]
+        result = fetch_transcripts(videos, max_retries=3, retry_delay=0, workers=2)
+
+        assert result[0]["transcriptAvailable"] is False
+        assert api_instance.fetch.call_count <= 3
+        assert sum(1 for v in result if not v["transcriptAvailable"]) >= 18
+        assert all("transcript" in v for v in result)
+
+
+    @patch("pipeline.transcript_fetcher._build_api")
+    def test_cancelled_retry_is_marked_unavailable(self, mock_build):
+        api_instance = MagicMock()
+        mock_build.return_value = api_instance
+
+        def fetch(video_id):
+            if video_id == "v0":
+                raise RequestBlocked(video_id)
+            time.sleep(0.05)
+            return _transcript("ok")
+
+        api_instance.fetch.side_effect = fetch
+        # Work-queue retries arrive with the fields of their previous attempt
+        videos = [_make_video(f"v{i}") | {"transcript": "stale", "transcriptAvailable": True} for i in range(20)]
+        result = fetch_transcripts(videos, max_retries=3, retry_delay=0, workers=2)
+
+        fetched = api_instance.fetch.call_count
+        assert sum(1 for v in result if v["transcriptAvailable"]) <= fetched
+        assert all(v["transcript"] is None for v in result if not v["transcriptAvailable"])
+
+    @patch("pipeline.transcript_fetcher._fetch_one")
+    def test_worker_exception_is_logged_and_marked(self, mock_fetch_one, caplog):
+        def fetch_one(apis, video, *args):
+            if video["id"] == "b":
+                raise RuntimeError("boom")
+            video.update(transcript="ok", transcriptAvailable=True)
+
+        mock_fetch_one.side_effect = fetch_one
+        result = fetch_transcripts([_make_video(i) for i in "abc"], workers=2)
+
+        assert [v["transcriptAvailable"] for v in result] == [True, False, True]
+        assert "Transcript worker failed for b: boom" in caplog.text
+
+
+class TestProxyRotation:
+    @staticmethod
+    def _stand_in_proxies(blocked):
+        """Fake one API per proxy URL; proxies in `blocked` always raise RequestBlocked."""
+        apis = {}
+
+        def build(proxy_url=None):
+            api = MagicMock()
+            if proxy_url in blocked:
+                api.fetch.side_effect = RequestBlocked("vid")
+            else:
+                api.fetch.side_effect = lambda video_id: _transcript(f"{video_id} via {proxy_url}")
+            apis[proxy_url] = api
+            return api
+
+        return build, apis
+
+    @patch("pipeline.transcript_fetcher._build_api")
+    def test_rotates_away_from_blocked_proxy(self, mock_build):
+        mock_build.side_effect, apis = self._stand_in_proxies(blocked={"http://p1"})
+        pool = ProxyPool(["http://p1", "http://p2"])
+
+        videos = [_make_video("a"), _make_video("b"), _make_video("c")]
+        result = fetch_transcripts(videos, max_retries=1, retry_delay=0, proxy_pool=pool)
+
+        assert all(v["transcriptAvailable"] for v in result)
+        assert result[0]["transcript"] == "a via http://p2"
+        assert apis["http://p1"].fetch.call_count == 1
+        assert pool.stats()["http://p1"]["blocks"] == 1
+        assert pool.stats()["http://p2"]["requests"] == 3
+
+    @patch("pipeline.transcript_fetcher._build_api")
+    def test_breaker_trips_when_every_proxy_is_blocked(self, mock_build):
+        mock_build.side_effect, apis = self._stand_in_proxies(blocked={"http://p1", "http://p2"})
+        pool = ProxyPool(["http://p1", "http://p2"])
+
+        videos = [_make_video(f"v{i}") for i in range(5)]
+        result = fetch_transcripts(videos, max_retries=3, retry_delay=0, workers=2, proxy_pool=pool)
+
+        assert all(v["transcriptAvailable"] is False for v in result)
+        assert sum(api.fetch.call_count for api in apis.values()) <= 4
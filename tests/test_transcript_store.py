@@ -0,0 +1,129 @@
+"""Tests for transcript_store module."""
+
+import os
+import tempfile
+import time
+from unittest.mock import patch, MagicMock, Mock
+
+from pipeline.transcript_fetcher import fetch_transcripts
+from pipeline.transcript_store import TranscriptStore
+
+
+def _blob_files(root):
+    return [f for _, _, files in os.walk(root) for f in files if f.endswith(".z")]
+
+
+class TestTranscriptStore:
+    def test_round_trip_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TranscriptStore(tmp)
+            store.put("abc", "hello world")
+            store.save()
+
+            reloaded = TranscriptStore(tmp)
+            assert reloaded.get("abc") == "hello world"
+            assert reloaded.get("abc", lang="de") is None
+
+    def test_get_many_returns_only_stored_ids(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TranscriptStore(tmp)
+            store.put("a", "text a")
+            store.put("b", "text b")
+
+            assert store.get_many(["a", "x", "b"]) == {"a": "text a", "b": "text b"}
+            assert store.stats() == {"hits": 2, "misses": 1, "entries": 2}
+
+    def test_blobs_are_compressed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TranscriptStore(tmp)
+            text = "the quick brown fox " * 500
+            store.put("a", text)
+
+            (blob,) = _blob_files(tmp)
+            path = next(os.path.join(d, blob) for d, _, files in os.walk(tmp) if blob in files)
+            assert os.path.getsize(path) < len(text) / 10
+
+    def test_identical_transcripts_share_a_blob(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TranscriptStore(tmp)
+            store.put("a", "same text")
+            store.put("b", "same text")
+
+            assert len(_blob_files(tmp)) == 1
+            assert store.get_many(["a", "b"]) == {"a": "same text", "b": "same text"}
+
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TranscriptStore(tmp)
+            store.put("a", os.urandom(600).hex())
+            size = store.index["a:en"]["size"]
+            store.max_bytes = size * 5 // 2  # room for two entries
+
+            store.put("b", os.urandom(600).hex())
+            time.sleep(0.01)
+            store.get("a")  # a is now more recent than b
+            store.put("c", os.urandom(600).hex())
+
+            assert store.get("b") is None
+            assert store.get("a") is not None
+            assert store.get("c") is not None
+            assert len(_blob_files(tmp)) == 2
+
+    def test_missing_blob_is_a_miss(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TranscriptStore(tmp)
+            store.put("a", "text")
+            for dirpath, _, files in os.walk(tmp):
+                for name in files:
+                    if name.endswith(".z"):
+                        os.unlink(os.path.join(dirpath, name))
+
+            assert store.get("a") is None
+            assert "a:en" not in store.index
+
+
+    def test_unwritable_blob_is_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "store")
+            with open(root, "w") as f:  # a file where the store directory should be
+                f.write("")
+            store = TranscriptStore(root)
+            store.put("a", "text")
+
+            assert store.index == {}
+            assert store.get("a") is None
+
+
+class TestFetchTranscriptsWithStore:
+    @patch("pipeline.transcript_fetcher._build_api")
+    def test_stored_transcripts_skip_network(self, mock_build):
+        api_instance = MagicMock()
+        mock_build.return_value = api_instance
+        snippet = Mock()
+        snippet.text = "fetched"
+        api_instance.fetch.return_value = Mock(snippets=[snippet])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TranscriptStore(tmp)
+            store.put("a", "stored")
+
+            videos = [{"id": "a"}, {"id": "b"}]
+            fetch_transcripts(videos, max_retries=1, retry_delay=0, store=store)
+
+            api_instance.fetch.assert_called_once_with("b")
+            assert videos[0]["transcript"] == "stored"
+            assert videos[1]["transcript"] == "fetched"
+            assert TranscriptStore(tmp).get("b") == "fetched"
+
+    @patch("pipeline.transcript_fetcher._build_api")
+    def test_fully_stored_batch_makes_no_requests(self, mock_build):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TranscriptStore(tmp)
+            store.put("a", "stored a")
+            store.put("b", "stored b")
+
+            videos = [{"id": "a"}, {"id": "b"}]
+            fetch_transcripts(videos, workers=4, store=store)
+
+            mock_build.assert_not_called()
+            assert all(v["transcriptAvailable"] for v in videos)
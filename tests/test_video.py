@@ -0,0 +1,74 @@
+"""Tests for video module."""
+
+import gc
+import json
+import pickle
+
+import pytest
+
+from pipeline import video as video_module
+from pipeline.video import Video, to_entry_json, to_json
+
+
+def _fields(video_id="abc123", channel_name="Ch1"):
+    return {
+        "id": video_id,
+        "title": f"Video {video_id}",
+        "publishedAt": "2026-02-20T10:00:00+00:00",
+        "duration": None,
+        "thumbnailUrl": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        "videoUrl": f"https://www.youtube.com/watch?v={video_id}",
+        "channelName": channel_name,
+        "channelUrl": f"https://www.youtube.com/@{channel_name}",
+    }
+
+
+class TestVideo:
+    def test_behaves_like_its_dict(self):
+        video = Video(_fields())
+        assert video == _fields()
+        assert list(video) == list(_fields())
+        assert {**video} == _fields()
+        assert video.get("summary") is None
+        assert "summary" not in video
+        with pytest.raises(KeyError):
+            video["summary"]
+
+    def test_set_and_delete_fields(self):
+        video = Video(_fields())
+        video["transcript"] = "text"
+        video["transcriptAvailable"] = True
+        video["summary"] = "A summary"
+        video["extra"] = 1
+        assert video.pop("transcript") == "text"
+        assert dict(video) == {**_fields(), "summary": "A summary", "transcriptAvailable": True, "extra": 1}
+
+    def test_channel_shared_between_videos(self):
+        first, second = Video(_fields("a")), Video(_fields("b"))
+        assert first.channel is second.channel
+        second["channelName"] = "Ch2"
+        assert first["channelName"] == "Ch1"
+        assert second["channelUrl"] == "https://www.youtube.com/@Ch1"
+
+    def test_json_and_pickle(self):
+        video = Video(_fields(), summary="A summary")
+        assert json.loads(json.dumps([video], default=to_json)) == [dict(video)]
+        assert pickle.loads(pickle.dumps(video)) == video
+        with pytest.raises(TypeError):
+            json.dumps(object(), default=to_json)
+
+    def test_entry_drops_channel_fields_and_fills_defaults(self):
+        video = Video(_fields(), transcript="text")
+        entry = json.loads(json.dumps(video, default=to_entry_json))
+        assert entry == {
+            "id": "abc123", "title": "Video abc123", "publishedAt": "2026-02-20T10:00:00+00:00",
+            "duration": None, "thumbnailUrl": "https://i.ytimg.com/vi/abc123/hqdefault.jpg",
+            "videoUrl": "https://www.youtube.com/watch?v=abc123", "summary": "", "transcriptAvailable": False,
+        }
+
+    def test_unused_channels_are_released(self):
+        video = Video(_fields(channel_name="Released"))
+        assert ("Released", "https://www.youtube.com/@Released") in video_module._channels
+        del video
+        gc.collect()
+        assert ("Released", "https://www.youtube.com/@Released") not in video_module._channels
@@ -0,0 +1,106 @@
+"""Tests for work_queue module."""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+from pipeline.history_store import HistoryStore
+from pipeline.work_queue import (
+    WorkQueue,
+    PENDING_TRANSCRIPT,
+    PENDING_SUMMARY,
+    DONE,
+    FAILED,
+)
+
+
+def _video(video_id, published="2026-02-20T10:00:00+00:00"):
+    return {"id": video_id, "publishedAt": published}
+
+
+class TestWorkQueue:
+    def test_new_videos_start_pending_transcript(self):
+        queue = WorkQueue("/nonexistent/queue.json")
+        assert queue.enqueue([_video("a"), _video("b")]) == 2
+        assert queue.enqueue([_video("a")]) == 0
+        assert queue.state("a") == PENDING_TRANSCRIPT
+        assert queue.due() == ["a", "b"]
+
+    def test_success_moves_through_states(self):
+        queue = WorkQueue("/nonexistent/queue.json")
+        queue.enqueue([_video("a")])
+        queue.record_transcript("a", ok=True)
+        assert queue.state("a") == PENDING_SUMMARY
+        queue.record_summary("a", ok=True)
+        assert queue.state("a") == DONE
+        assert queue.due() == []
+
+    @patch("pipeline.work_queue.time.time")
+    def test_failure_backs_off_then_becomes_eligible(self, mock_time):
+        mock_time.return_value = 1_000_000
+        queue = WorkQueue("/nonexistent/queue.json", retry_base_hours=1)
+        queue.enqueue([_video("a")])
+
+        queue.record_transcript("a", ok=False)
+        assert queue.due() == []
+        mock_time.return_value += 3600
+        assert queue.due() == ["a"]
+
+        queue.record_transcript("a", ok=False)
+        mock_time.return_value += 3600
+        assert queue.due() == []  # second failure waits two hours
+        mock_time.return_value += 3600
+        assert queue.due() == ["a"]
+
+    def test_gives_up_after_max_attempts(self):
+        queue = WorkQueue("/nonexistent/queue.json", max_attempts=2)
+        queue.enqueue([_video("a")])
+        queue.record_summary("a", ok=False)
+        queue.record_summary("a", ok=False)
+        assert queue.state("a") == FAILED
+        assert queue.due(now=float("inf")) == []
+
+    def test_priority_order(self):
+        queue = WorkQueue("/nonexistent/queue.json")
+        queue.enqueue([
+            _video("old", "2026-02-18T10:00:00+00:00"),
+            _video("new", "2026-02-21T10:00:00+00:00"),
+            _video("summary", "2026-02-17T10:00:00+00:00"),
+        ])
+        queue.record_transcript("summary", ok=True)
+
+        assert queue.due() == ["summary", "new", "old"]
+
+    def test_select_returns_known_videos_up_to_limit(self):
+        queue = WorkQueue("/nonexistent/queue.json")
+        queue.enqueue([_video("a", "2026-02-21"), _video("b", "2026-02-20"), _video("gone", "2026-02-22")])
+        videos = {"a": _video("a"), "b": _video("b")}
+
+        assert [v["id"] for v in queue.select(videos)] == ["a", "b"]
+        assert [v["id"] for v in queue.select(videos, limit=1)] == ["a"]
+
+    def test_persists_and_prunes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "queue.json")
+            queue = WorkQueue(path)
+            queue.enqueue([_video("a"), _video("b")])
+            queue.record_transcript("a", ok=True)
+            queue.prune(["a"])
+            queue.save()
+
+            reloaded = WorkQueue(path)
+            assert reloaded.state("a") == PENDING_SUMMARY
+            assert reloaded.state("b") is None
+            assert reloaded.stats() == {PENDING_TRANSCRIPT: 0, PENDING_SUMMARY: 1, DONE: 0, FAILED: 0}
+
+
+class TestWorkQueueHistory:
+    def test_entries_saved_in_history_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = HistoryStore(os.path.join(tmp, "history.sqlite"))
+            queue = WorkQueue(None, history=history)
+            queue.enqueue([_video("a")])
+            queue.record_transcript("a", ok=True)
+            queue.save()
+
+            assert WorkQueue(None, history=history).state("a") == PENDING_SUMMARY
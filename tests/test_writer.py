@@ -3,7 +3,11 @@
 import json
 import os
 import tempfile
+from datetime import datetime, timezone
+from unittest.mock import patch
 
+from pipeline.data_stream import load_lazy
+from pipeline.video import Video
 from pipeline.writer import write_data
 
 
@@ -53,6 +57,21 @@ class TestWriteData:
         finally:
             os.unlink(path)
 
+    def test_video_records_written_as_day_entries(self):
+        video = Video(id="v1", title="Video", publishedAt="2026-02-20T10:00:00+00:00", channelName="Ch1",
+                      channelUrl="https://www.youtube.com/@Ch1", transcript="text", summary="Summary")
+        data = {"days": [{"date": "2026-02-20", "channels": [
+            {"channelName": "Ch1", "channelUrl": "https://www.youtube.com/@Ch1", "videos": [video]},
+        ]}]}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            write_data(data, path)
+            with open(path, "r", encoding="utf-8") as f:
+                (entry,) = json.load(f)["days"][0]["channels"][0]["videos"]
+
+        assert entry == {"id": "v1", "title": "Video", "publishedAt": "2026-02-20T10:00:00+00:00", "duration": None,
+                         "thumbnailUrl": "", "videoUrl": "", "summary": "Summary", "transcriptAvailable": False}
+
     def test_preserves_unicode(self):
         data = {"days": [], "summary": "bullet \u2022 point"}
         with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
@@ -64,3 +83,24 @@ class TestWriteData:
             assert "\u2022" in content
         finally:
             os.unlink(path)
+
+    @patch("pipeline.writer.datetime")
+    def test_lazy_days_written_unchanged(self, mock_datetime):
+        mock_datetime.now.return_value = datetime(2026, 2, 20, 10, 0, tzinfo=timezone.utc)
+        day = {"date": "2026-02-20", "dailyDigest": "d\u00e9j\u00e0", "channels": [
+            {"channelName": "Ch1", "channelUrl": "", "videos": [{"id": "v1", "duration": 61}]}]}
+        data = {"lastUpdated": None, "config": {"daysToShow": 7},
+                "days": [day, {**day, "date": "2026-02-19"}], "pipelineStatus": {"status": "ok"}}
+        with tempfile.TemporaryDirectory() as tmp:
+            eager_path, lazy_path = os.path.join(tmp, "eager.json"), os.path.join(tmp, "lazy.json")
+            write_data(data, eager_path)
+            lazy = load_lazy(eager_path)
+            lazy["days"][1]["dailyDigest"] = "updated"
+            data["days"][1] = {**data["days"][1], "dailyDigest": "updated"}
+
+            write_data(data, eager_path)
+            write_data(lazy, lazy_path)
+
+            assert not lazy["days"][0].materialized
+            with open(eager_path, encoding="utf-8") as eager, open(lazy_path, encoding="utf-8") as result:
+                assert result.read() == eager.read()